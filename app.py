@@ -4,18 +4,105 @@ Web UI for Selenium Java to Playwright Converter
 Phase 4: Stylize (UI Layer)
 """
 
+import io
 import os
-from flask import Flask, render_template, request, jsonify
+import json
+import shutil
+import threading
+import uuid
+import zipfile
+from typing import Dict, Optional
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context
 from tools.converter import SeleniumToPlaywrightConverter
+from tools.job_queue import JobQueue, QueueFull
+from tools.llm_scheduler import llm_caller, run_as
+from tools.metrics import REGISTRY
+from tools.model_warmer import ModelWarmer
+from tools.web_server import serve
 
 app = Flask(__name__)
 
-# Ensure output directory exists
-os.makedirs('output', exist_ok=True)
+# Bulk conversion jobs (share the conversion cache with the converters below)
+MAX_JOB_FILES = int(os.environ.get('CONVERTER_MAX_JOB_FILES', '2000'))
+MAX_JOB_BYTES = int(os.environ.get('CONVERTER_MAX_JOB_BYTES', str(50 * 1024 * 1024)))
+# Jobs live in the memory of the worker process that accepted them: 'on' (one
+# worker), 'sticky' (several workers behind routing that sends /api/jobs/<id>
+# back to that worker) or 'off' (the /api/jobs endpoints answer 404)
+JOB_API = os.environ.get('CONVERTER_JOB_API', 'on')
 
-# Global converter instance
-converter_ts = SeleniumToPlaywrightConverter('typescript', 'output')
-converter_js = SeleniumToPlaywrightConverter('javascript', 'output')
+# Synchronous batches (/api/convert/batch)
+MAX_BATCH_FILES = int(os.environ.get('CONVERTER_MAX_BATCH_FILES', '200'))
+BATCH_WORKERS = int(os.environ.get('CONVERTER_BATCH_WORKERS', '4'))
+# Batch output directories kept on disk; older ones are removed as new batches arrive
+MAX_KEPT_BATCHES = int(os.environ.get('CONVERTER_MAX_KEPT_BATCHES', '100'))
+BATCH_DIR = os.path.join('output', 'batches')
+
+# Largest request body (JSON or uploaded archive); larger requests get 413
+MAX_REQUEST_BYTES = int(os.environ.get('CONVERTER_MAX_REQUEST_BYTES', str(64 * 1024 * 1024)))
+app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_BYTES
+
+# Built on first use, so importing the app (e.g. in every server worker) stays cheap
+_converters: Dict[str, SeleniumToPlaywrightConverter] = {}
+_jobs: Optional[JobQueue] = None
+_warmer: Optional[ModelWarmer] = None
+_lock = threading.Lock()
+
+
+def get_converter(language: str = 'typescript') -> SeleniumToPlaywrightConverter:
+    """Shared converter for a target language; all of them share one conversion cache."""
+    language = 'typescript' if language == 'typescript' else 'javascript'
+    with _lock:
+        if language not in _converters:
+            shared = next(iter(_converters.values()), None)
+            _converters[language] = SeleniumToPlaywrightConverter(
+                language, 'output', cache=shared.cache if shared else None
+            )
+        return _converters[language]
+
+
+def get_jobs() -> JobQueue:
+    """The bulk conversion queue; its worker threads start on first use."""
+    global _jobs
+    with _lock:
+        if _jobs is None:
+            _jobs = JobQueue(
+                lambda language, output_dir: SeleniumToPlaywrightConverter(
+                    language, output_dir, cache=get_converter().cache
+                ),
+                output_dir=os.path.join('output', 'jobs'),
+                workers=int(os.environ.get('CONVERTER_JOB_WORKERS', '2')),
+                max_queued=int(os.environ.get('CONVERTER_JOB_QUEUE_SIZE', '16'))
+            )
+        return _jobs
+
+
+# Scrape-time gauges for /metrics (conversion timings and counters are recorded by the converter)
+REGISTRY.gauge('converter_cache_hits', 'Conversion cache hits since start',
+               lambda: get_converter().cache.stats()['hits'])
+REGISTRY.gauge('converter_cache_misses', 'Conversion cache misses since start',
+               lambda: get_converter().cache.stats()['misses'])
+REGISTRY.gauge('converter_cache_hit_ratio', 'Conversion cache hit ratio since start',
+               lambda: get_converter().cache.stats()['hit_rate'])
+REGISTRY.gauge('converter_cache_entries', 'Entries in the conversion cache',
+               lambda: get_converter().cache.stats()['entries'])
+REGISTRY.gauge('converter_cache_bytes', 'Size of cached conversions in bytes',
+               lambda: get_converter().cache.stats()['bytes'])
+REGISTRY.gauge('converter_parse_cache_hits', 'Parse cache hits since start',
+               lambda: get_converter().parses.stats()['hits'])
+REGISTRY.gauge('converter_parse_cache_hit_ratio', 'Parse cache hit ratio since start',
+               lambda: get_converter().parses.stats()['hit_rate'])
+REGISTRY.gauge('converter_parse_cache_bytes', 'Size of parses cached in memory in bytes',
+               lambda: get_converter().parses.stats()['bytes'])
+REGISTRY.gauge('converter_job_queue_depth', 'Bulk jobs waiting for a worker',
+               lambda: _jobs.depth() if _jobs is not None else 0)
+REGISTRY.gauge('converter_llm_in_flight', 'LLM generations running',
+               lambda: sum(backend.stats()['in_flight'] for backend in get_converter().backends()))
+REGISTRY.gauge('converter_llm_warmups', 'Model warm-ups (startup loads and idle pings) since start',
+               lambda: _warmer.warmups if _warmer is not None else 0)
+REGISTRY.gauge('converter_llm_warmup_failures', 'Model warm-ups that failed since start',
+               lambda: _warmer.failures if _warmer is not None else 0)
+REGISTRY.gauge('converter_llm_waiting', 'LLM requests waiting for a generation slot',
+               lambda: sum(backend.stats()['waiting'] for backend in get_converter().backends()))
 
 
 @app.route('/')
@@ -24,6 +111,11 @@ def index():
     return render_template('index.html')
 
 
+def _client() -> str:
+    """Caller the LLM scheduler shares generation slots fairly between: one per client address."""
+    return f'web:{request.remote_addr}'
+
+
 @app.route('/api/convert', methods=['POST'])
 def convert():
     """API endpoint to convert Java code."""
@@ -38,37 +130,334 @@ def convert():
         })
     
     # Select converter based on target language
-    converter = converter_ts if target_lang == 'typescript' else converter_js
+    converter = get_converter(target_lang)
     
     # Convert the code
-    result = converter.convert(java_code, 'UserInput.java')
+    with llm_caller(_client()):
+        result = converter.convert(java_code, data.get('name') or 'UserInput.java')
     
     return jsonify(result)
 
 
+@app.route('/api/convert/stream', methods=['POST'])
+def convert_stream():
+    """
+    Streaming variant of /api/convert (Server-Sent Events).
+    Emits {"type": "chunk", "text": ...} events while the model generates,
+    then one {"type": "done", ...} event with the final result; a request
+    without code gets only a failed "done" event. Errors raised before the
+    endpoint runs (413, 503 while draining) are plain JSON.
+    """
+    data = request.json
+    java_code = data.get('code', '')
+    target_lang = data.get('language', 'typescript')
+    
+    if not java_code.strip():
+        events = iter([{'type': 'done', 'success': False, 'error': 'No Java code provided'}])
+    else:
+        converter = get_converter(target_lang)
+        events = run_as(_client(), converter.convert_stream(java_code, data.get('name') or 'UserInput.java'))
+    
+    def stream():
+        for event in events:
+            yield f"data: {json.dumps(event)}\n\n"
+    
+    return Response(
+        stream_with_context(stream()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/convert/batch', methods=['POST'])
+def convert_batch():
+    """
+    Convert many files in one request.
+    Accepts JSON {"files": [{"name": ..., "code": ...}], "language": ...}.
+    Identical sources are converted once. Outputs go to a directory of their
+    own, output/batches/<batch id>/, with names that are unique within the batch.
+    Returns all results at once, or one JSON line per file as it finishes
+    when the client sends "Accept: application/x-ndjson" (or "stream": true).
+    """
+    data = request.json or {}
+    target_lang = data.get('language', 'typescript')
+    files = [
+        (f.get('name') or f'File{i}.java', f.get('code', ''))
+        for i, f in enumerate(data.get('files', []))
+    ]
+    files = [(name, code) for name, code in files if code.strip()]
+    if not files:
+        return jsonify({'success': False, 'error': 'No Java files provided'}), 400
+    if len(files) > MAX_BATCH_FILES:
+        return jsonify({
+            'success': False,
+            'error': f'At most {MAX_BATCH_FILES} files per batch; use /api/jobs for more'
+        }), 413
+    
+    batch_id = uuid.uuid4().hex
+    _forget_old_batches()
+    converter = SeleniumToPlaywrightConverter(
+        target_lang, os.path.join(BATCH_DIR, batch_id), cache=get_converter().cache
+    )
+    results = run_as(_client(), converter.convert_many(files, BATCH_WORKERS))
+    
+    def summary(index, result):
+        summary = {'index': index, 'file': files[index][0]}
+        summary.update({key: value for key, value in result.items() if key not in ('original_code', 'metadata')})
+        return summary
+    
+    if data.get('stream') or request.accept_mimetypes.best == 'application/x-ndjson':
+        def lines():
+            succeeded = 0
+            for index, result in results:
+                succeeded += result['success']
+                yield json.dumps(summary(index, result)) + '\n'
+            yield json.dumps({'done': True, 'batch_id': batch_id,
+                              'total': len(files), 'succeeded': succeeded}) + '\n'
+        
+        return Response(stream_with_context(lines()), mimetype='application/x-ndjson',
+                        headers={'X-Accel-Buffering': 'no'})
+    
+    ordered = [None] * len(files)
+    for index, result in results:
+        ordered[index] = summary(index, result)
+    return jsonify({
+        'success': all(result['success'] for result in ordered),
+        'batch_id': batch_id,
+        'total': len(files),
+        'succeeded': sum(1 for result in ordered if result['success']),
+        'results': ordered,
+    })
+
+
+@app.before_request
+def job_api_enabled():
+    """Answer every /api/jobs request with 404 while the job API is off."""
+    if JOB_API == 'off' and request.path.startswith('/api/jobs'):
+        return jsonify({'success': False, 'error': 'Bulk jobs are disabled on this server'}), 404
+
+
+def _forget_old_batches():
+    """Remove the oldest batch directories, keeping MAX_KEPT_BATCHES - 1 for the new batch."""
+    try:
+        with os.scandir(BATCH_DIR) as entries:
+            batches = sorted((entry for entry in entries if entry.is_dir()),
+                             key=lambda entry: entry.stat().st_mtime)
+    except FileNotFoundError:
+        return
+    for entry in batches[:max(0, len(batches) - MAX_KEPT_BATCHES + 1)]:
+        # Another request may be removing it at the same time
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """
+    Submit a bulk conversion job.
+    Accepts either a multipart upload with a zip archive in the 'archive'
+    field, or JSON {"files": [{"name": ..., "code": ...}], "language": ...}.
+    """
+    if 'archive' in request.files:
+        target_lang = request.form.get('language', 'typescript')
+        try:
+            files = _read_archive(request.files['archive'])
+        except (zipfile.BadZipFile, ValueError) as e:
+            return jsonify({'success': False, 'error': f'Invalid archive: {e}'}), 400
+    else:
+        data = request.json or {}
+        target_lang = data.get('language', 'typescript')
+        files = [(f.get('name', ''), f.get('code', '')) for f in data.get('files', [])]
+    
+    files = [(name or f'File{i}.java', code) for i, (name, code) in enumerate(files) if code.strip()]
+    if not files:
+        return jsonify({'success': False, 'error': 'No Java files provided'}), 400
+    if len(files) > MAX_JOB_FILES:
+        return jsonify({'success': False, 'error': f'At most {MAX_JOB_FILES} files per job'}), 413
+    
+    try:
+        job = get_jobs().submit(files, target_lang)
+    except QueueFull as e:
+        return jsonify({'success': False, 'error': str(e)}), 429, {'Retry-After': '30'}
+    
+    return jsonify({'success': True, 'job': job.to_dict()}), 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    """Poll a job's progress and per-file results."""
+    job = get_jobs().get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    return jsonify({'success': True, 'job': job.to_dict()})
+
+
+@app.route('/api/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    """Stream a job's progress as Server-Sent Events until it finishes."""
+    job = get_jobs().get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    
+    def events():
+        completed = -1
+        while True:
+            job.wait_for_progress(completed)
+            status = job.to_dict()
+            if status['completed'] != completed or job.finished:
+                completed = status['completed']
+                yield f"data: {json.dumps(status)}\n\n"
+            else:
+                yield ": keep-alive\n\n"
+            if job.finished:
+                return
+    
+    return Response(
+        stream_with_context(run_as(_client(), events())),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+@app.route('/api/jobs/<job_id>/download', methods=['GET'])
+def job_download(job_id):
+    """Download a finished job's converted files as a zip archive."""
+    job = get_jobs().get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Unknown job'}), 404
+    if not job.finished:
+        return jsonify({'success': False, 'error': f'Job is {job.status}'}), 409
+    
+    return send_file(
+        io.BytesIO(job.archive()),
+        mimetype='application/zip',
+        as_attachment=True,
+        download_name=f'playwright-{job.id}.zip'
+    )
+
+
+def _read_archive(upload):
+    """Extract (file name, source) pairs for every .java file in an uploaded zip."""
+    files = []
+    total = 0
+    with zipfile.ZipFile(upload.stream) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.endswith('.java'):
+                continue
+            total += info.file_size
+            if total > MAX_JOB_BYTES:
+                raise ValueError(f'uncompressed size exceeds {MAX_JOB_BYTES} bytes')
+            files.append((info.filename, archive.read(info).decode('utf-8', errors='replace')))
+    return files
+
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint."""
     return jsonify({
         'status': 'ok',
         'ollama': check_ollama(),
+        'llm_load': get_converter().converter.client.stats(),
+        'models': [
+            dict(route, available=converter.client.health()['available'],
+                 idle_seconds=round(converter.client.idle_seconds(), 1))
+            for route, converter in zip(get_converter().router.describe(), get_converter().converters.values())
+        ],
     })
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics: stage timings, conversions, tokens, cache and queue gauges."""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+
 def check_ollama():
-    """Check if Ollama is running."""
-    try:
-        import ollama
-        ollama.list()
-        return True
-    except:
-        return False
+    """Check if the large model's backend is up (cached briefly, so probes never pile up on it)."""
+    return get_converter().converter.client.health()['available']
 
 
-if __name__ == '__main__':
+@app.errorhandler(413)
+def request_too_large(error):
+    """JSON error for bodies over MAX_REQUEST_BYTES."""
+    return jsonify({
+        'success': False,
+        'error': f'Request exceeds {MAX_REQUEST_BYTES} bytes; use /api/jobs with a zip archive'
+    }), 413
+
+
+def start_warmer(interval: float):
+    """Load the converter's models now and keep them loaded (see ModelWarmer)."""
+    global _warmer
+    converters = get_converter().converters.values()
+    with _lock:
+        if _warmer is not None:
+            return
+        _warmer = ModelWarmer(converters, interval)
+    _warmer.start()
+
+
+def drain_jobs(timeout: float):
+    """Let running and queued bulk jobs finish, for at most timeout seconds."""
+    if _jobs is not None and not _jobs.shutdown(timeout=timeout):
+        print(f"Bulk jobs still running after {timeout:.0f}s; stopping anyway")
+
+
+def main():
+    """Serve the web UI."""
+    global JOB_API
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Web UI for the Selenium to Playwright converter')
+    parser.add_argument('--host', default=os.environ.get('CONVERTER_HOST', '0.0.0.0'),
+                        help='Interface to bind (default: CONVERTER_HOST or 0.0.0.0)')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('CONVERTER_PORT', '5000')),
+                        help='Port (default: CONVERTER_PORT or 5000)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('CONVERTER_THREADS', '32')),
+                        help='Concurrent requests per worker (default: CONVERTER_THREADS or 32)')
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('CONVERTER_WORKERS', '1')),
+                        help='Worker processes; more than one runs gunicorn and needs --job-api off '
+                             'or sticky (default: CONVERTER_WORKERS or 1)')
+    parser.add_argument('--job-api', choices=['on', 'off', 'sticky'], default=JOB_API,
+                        help='Bulk jobs live in the worker that accepted them. on: serve /api/jobs '
+                             '(one worker only); sticky: serve it with several workers behind routing '
+                             'that sends /api/jobs/<id> to the same worker; off: disable it '
+                             '(default: CONVERTER_JOB_API or on)')
+    parser.add_argument('--worker-class', default=os.environ.get('CONVERTER_WORKER_CLASS', 'gthread'),
+                        help='gunicorn worker class with --workers > 1, e.g. gevent (default: gthread)')
+    parser.add_argument('--drain-timeout', type=float,
+                        default=float(os.environ.get('CONVERTER_DRAIN_TIMEOUT', '120')),
+                        help='Seconds in-flight conversions get to finish on shutdown (default: 120)')
+    parser.add_argument('--warm-interval', type=float,
+                        default=float(os.environ.get('CONVERTER_LLM_WARM_INTERVAL', str(ModelWarmer.DEFAULT_INTERVAL))),
+                        help='Load the models at startup, and ping them after this many idle seconds '
+                             '(default: CONVERTER_LLM_WARM_INTERVAL or 240; 0: load only; -1: neither)')
+    parser.add_argument('--dev', action='store_true',
+                        help='Flask development server with debugger and reloader')
+    args = parser.parse_args()
+    if args.workers > 1 and args.job_api == 'on':
+        parser.error('bulk jobs are kept in the worker that accepted them, so with --workers > 1 '
+                     'another worker answers 404 for them; pass --job-api off, or --job-api sticky '
+                     'behind routing that sends /api/jobs/<id> to the same worker')
+    JOB_API = args.job_api
+    
     print("=" * 60)
     print("Selenium Java to Playwright Converter")
     print("=" * 60)
-    print("Open your browser and go to: http://localhost:5000")
+    print(f"Open your browser and go to: http://localhost:{args.port}")
     print("=" * 60)
-    app.run(host='0.0.0.0', port=5000, debug=True)
+    if args.workers > 1 and JOB_API == 'sticky':
+        print("Warning: bulk jobs live in the worker that accepted them; /api/jobs/<id> "
+              "requests must be routed back to that worker")
+    
+    if args.dev:
+        app.run(host=args.host, port=args.port, debug=True)
+        return
+    
+    on_started = (lambda: start_warmer(args.warm_interval)) if args.warm_interval >= 0 else None
+    serve(app, args.host, args.port, threads=args.threads, workers=args.workers,
+          worker_class=args.worker_class, drain_timeout=args.drain_timeout, on_drained=drain_jobs,
+          on_started=on_started)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Tool: Benchmark
+Measures conversion throughput, latency, parse vs. LLM time and memory on a
+synthetic corpus against a stub Ollama server.
+Layer 3: Deterministic Tool
+"""
+
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional
+
+from tools.corpus_generator import CorpusGenerator
+from tools.stub_ollama import StubOllamaServer
+
+
+SCENARIOS = ['single', 'directory', 'web']
+
+# Repository root, where startup commands run
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Benchmark:
+    """
+    Runs the converter's three entry points over the same corpus:
+    single-file (convert_file, one at a time), directory (convert_files with
+    jobs) and web (POST /api/convert through the Flask test client).
+    Caching is disabled so every run does the same work. Startup is timed
+    separately, in fresh interpreters.
+    """
+
+    # Runs per startup command; the median is reported
+    STARTUP_RUNS = 5
+
+    def __init__(self, paths: List[str], stub: StubOllamaServer, work_dir: str,
+                 language: str = 'typescript', jobs: int = 4, trace_memory: bool = False):
+        """
+        Args:
+            paths: Java files to convert
+            stub: Running stub server (OLLAMA_HOST must already point at it)
+            work_dir: Scratch directory for outputs
+            language: Target language
+            jobs: Parallel files for the directory and web scenarios
+            trace_memory: Report the tracemalloc peak (slows CPU-bound code)
+        """
+        self.paths = paths
+        self.stub = stub
+        self.work_dir = work_dir
+        self.language = language
+        self.jobs = jobs
+        self.trace_memory = trace_memory
+
+    def parse_times(self) -> List[float]:
+        """Seconds to parse and rule-plan each file, without any LLM call."""
+        from tools.java_parser import JavaParser
+        from tools.rule_converter import RuleConverter
+
+        rules = RuleConverter(self.language)
+        times = []
+        for path in self.paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                source = f.read()
+            started = time.perf_counter()
+            parser = JavaParser(source, path)
+            try:
+                metadata = parser.parse()
+                rules.plan(parser.tree, metadata)
+            except ValueError:
+                pass
+            times.append(time.perf_counter() - started)
+        return times
+
+    def startup_times(self) -> Dict[str, float]:
+        """
+        Seconds from process start to exit, in a fresh interpreter: importing
+        the CLI ('import_cli') and the web app ('import_web'), and a parse-only
+        CLI run on one file ('dry_run'), as CI invoking the converter per module pays.
+        """
+        commands = {
+            'import_cli': ['-c', 'import tools.converter'],
+            'import_web': ['-c', 'import app'],
+            'dry_run': ['-m', 'tools.converter', self.paths[0], '--dry-run', '--no-cache',
+                        '-o', os.path.join(self.work_dir, 'startup')],
+        }
+        times = {}
+        for name, command in commands.items():
+            runs = []
+            for _ in range(self.STARTUP_RUNS):
+                started = time.perf_counter()
+                subprocess.run([sys.executable, *command], cwd=ROOT, check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                runs.append(time.perf_counter() - started)
+            times[name] = _percentile(runs, 50)
+        return times
+
+    def run(self, scenario: str) -> Dict[str, Any]:
+        """Run one scenario and summarize it."""
+        runner = getattr(self, f'_run_{scenario}')
+        self.stub.reset()
+        if self.trace_memory:
+            tracemalloc.start()
+
+        started = time.perf_counter()
+        latencies, failures = runner()
+        elapsed = time.perf_counter() - started
+
+        traced_peak = None
+        if self.trace_memory:
+            traced_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+
+        stub = self.stub.stats()
+        return {
+            'scenario': scenario,
+            'files': len(self.paths),
+            'failures': failures,
+            'seconds': elapsed,
+            'files_per_second': len(self.paths) / elapsed if elapsed else 0.0,
+            'p50': _percentile(latencies, 50),
+            'p95': _percentile(latencies, 95),
+            'llm_requests': stub['requests'],
+            'llm_seconds': stub['busy_seconds'],
+            'peak_rss_mb': _peak_rss_mb(),
+            'traced_peak_mb': traced_peak / (1024 * 1024) if traced_peak is not None else None,
+        }
+
+    def _run_single(self):
+        from tools.converter import SeleniumToPlaywrightConverter
+
+        converter = SeleniumToPlaywrightConverter(
+            self.language, os.path.join(self.work_dir, 'single'), use_cache=False
+        )
+        latencies, failures = [], 0
+        for path in self.paths:
+            started = time.perf_counter()
+            result = converter.convert_file(path)
+            latencies.append(time.perf_counter() - started)
+            failures += not result['success']
+        return latencies, failures
+
+    def _run_directory(self):
+        from tools.converter import SeleniumToPlaywrightConverter
+
+        converter = SeleniumToPlaywrightConverter(
+            self.language, os.path.join(self.work_dir, 'directory'), use_cache=False
+        )
+        # Per-file latency of the LLM stage; parsing runs in worker processes
+        latencies = []
+        convert_parsed = converter.convert_parsed
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return convert_parsed(*args, **kwargs)
+            finally:
+                latencies.append(time.perf_counter() - started)
+
+        converter.convert_parsed = timed
+        failures = sum(
+            not result['success'] for _, result in converter.convert_files(self.paths, self.jobs)
+        )
+        return latencies, failures
+
+    def _run_web(self):
+        app_module = _import_app(os.path.join(self.work_dir, 'web'))
+        client = app_module.app.test_client()
+
+        sources = []
+        for path in self.paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                sources.append(f.read())
+
+        def post(source):
+            started = time.perf_counter()
+            response = client.post('/api/convert', json={'code': source, 'language': self.language})
+            return time.perf_counter() - started, response.status_code == 200 and response.get_json()['success']
+
+        with ThreadPoolExecutor(self.jobs) as pool:
+            outcomes = list(pool.map(post, sources))
+        return [latency for latency, _ in outcomes], sum(not ok for _, ok in outcomes)
+
+
+def _import_app(work_dir: str):
+    """Import the Flask app with uncached converters writing under work_dir."""
+    import app as app_module
+    from tools.converter import SeleniumToPlaywrightConverter
+
+    for language in ('typescript', 'javascript'):
+        app_module._converters[language] = SeleniumToPlaywrightConverter(
+            language, os.path.join(work_dir, 'output'), use_cache=False
+        )
+    return app_module
+
+
+def _percentile(values: List[float], percent: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def _peak_rss_mb() -> float:
+    """High-water mark of this process's resident memory."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def compare(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Regressions of report against baseline.
+
+    Args:
+        report: Current benchmark report
+        baseline: Earlier report (same corpus and stub settings)
+        tolerance: Allowed relative slowdown, e.g. 0.1 for 10%
+
+    Returns:
+        One message per regressed metric
+    """
+    if (report['files'], report['bytes'], report['stub']) != (baseline['files'], baseline['bytes'], baseline['stub']):
+        return ['baseline was measured on a different corpus or stub configuration']
+
+    previous = {result['scenario']: result for result in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        before = previous.get(result['scenario'])
+        if before is None:
+            continue
+        if result['files_per_second'] < before['files_per_second'] * (1 - tolerance):
+            regressions.append(
+                f"{result['scenario']}: {result['files_per_second']:.2f} files/s "
+                f"(baseline {before['files_per_second']:.2f})"
+            )
+        if result['p95'] and before['p95'] and result['p95'] > before['p95'] * (1 + tolerance):
+            regressions.append(
+                f"{result['scenario']}: p95 {result['p95'] * 1000:.0f} ms "
+                f"(baseline {before['p95'] * 1000:.0f} ms)"
+            )
+    parse_now, parse_before = report['parse']['total_seconds'], baseline['parse']['total_seconds']
+    if parse_now > parse_before * (1 + tolerance):
+        regressions.append(f"parse: {parse_now:.3f}s (baseline {parse_before:.3f}s)")
+    for name, seconds in report['startup'].items():
+        before = baseline.get('startup', {}).get(name)
+        if before and seconds > before * (1 + tolerance):
+            regressions.append(f"startup {name}: {seconds * 1000:.0f} ms (baseline {before * 1000:.0f} ms)")
+    return regressions
+
+
+def over_budget(report: Dict[str, Any], budget: float) -> List[str]:
+    """Startup commands of a report that took longer than budget seconds."""
+    return [
+        f"startup {name}: {seconds * 1000:.0f} ms (budget {budget * 1000:.0f} ms)"
+        for name, seconds in report['startup'].items() if seconds > budget
+    ]
+
+
+def print_report(report: Dict[str, Any]):
+    """Human-readable summary."""
+    parse = report['parse']
+    print(f"Corpus: {report['files']} files, {report['bytes'] / 1024:.0f} KB")
+    print(f"Stub:   latency {report['stub']['latency']}s, "
+          f"{report['stub']['tokens_per_second']} tok/s, {report['stub']['tokens']} tokens, "
+          f"{report['stub']['parallel']} parallel")
+    print(f"Parse:  {parse['total_seconds']:.3f}s total, p50 {parse['p50'] * 1000:.1f} ms, "
+          f"p95 {parse['p95'] * 1000:.1f} ms")
+    print("Startup: " + ', '.join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in report['startup'].items()))
+    print()
+    print(f"{'scenario':<10} {'files/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'LLM req':>8} "
+          f"{'LLM s':>8} {'wall s':>8} {'RSS MB':>8} {'fail':>5}")
+    for result in report['results']:
+        print(f"{result['scenario']:<10} {result['files_per_second']:>8.2f} "
+              f"{(result['p50'] or 0) * 1000:>8.0f} {(result['p95'] or 0) * 1000:>8.0f} "
+              f"{result['llm_requests']:>8} {result['llm_seconds']:>8.2f} {result['seconds']:>8.2f} "
+              f"{result['peak_rss_mb']:>8.1f} {result['failures']:>5}")
+        if result['traced_peak_mb'] is not None:
+            print(f"{'':<10} tracemalloc peak {result['traced_peak_mb']:.1f} MB")
+
+
+def main():
+    """CLI entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the converter against a stub Ollama server')
+    parser.add_argument('--corpus', help='Existing directory of .java files (default: generate one)')
+    parser.add_argument('-n', '--files', type=int, default=40, help='Generated test classes (default: 40)')
+    parser.add_argument('--page-objects', type=int, default=4, help='Generated page objects (default: 4)')
+    parser.add_argument('--methods', type=int, default=6, help='@Test methods per class (default: 6)')
+    parser.add_argument('--steps', type=int, default=8, help='Statements per method (default: 8)')
+    parser.add_argument('--llm-ratio', type=float, default=0.3,
+                        help='Fraction of statements the rules cannot map (default: 0.3)')
+    parser.add_argument('--seed', type=int, default=0, help='Corpus seed (default: 0)')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS),
+                        help=f'Comma-separated subset of {",".join(SCENARIOS)}')
+    parser.add_argument('-j', '--jobs', type=int, default=4, help='Parallel files (default: 4)')
+    parser.add_argument('-l', '--language', choices=['javascript', 'typescript'], default='typescript')
+    parser.add_argument('--latency', type=float, default=0.05, help='Stub seconds to first token (default: 0.05)')
+    parser.add_argument('--tokens-per-second', type=float, default=2000.0,
+                        help='Stub generation speed (default: 2000)')
+    parser.add_argument('--tokens', type=int, default=120, help='Stub tokens per response (default: 120)')
+    parser.add_argument('--parallel', type=int, default=4, help='Stub concurrent generations (default: 4)')
+    parser.add_argument('--tracemalloc', action='store_true', help='Also report the tracemalloc peak')
+    parser.add_argument('--json', help='Write the report to this file')
+    parser.add_argument('--baseline', help='Earlier --json report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed slowdown versus the baseline (default: 0.1)')
+    parser.add_argument('--startup-budget-ms', type=float,
+                        help='Fail if a startup command (import_cli, import_web, dry_run) takes longer')
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(',') if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    work_dir = tempfile.mkdtemp(prefix='converter-bench-')
+    try:
+        if args.corpus:
+            paths = sorted(
+                os.path.join(root, name)
+                for root, _, names in os.walk(args.corpus) for name in names if name.endswith('.java')
+            )
+        else:
+            generator = CorpusGenerator(args.seed, args.methods, args.steps, args.llm_ratio)
+            paths = generator.write(os.path.join(work_dir, 'corpus'), args.files, args.page_objects)
+
+        with StubOllamaServer(latency=args.latency, tokens_per_second=args.tokens_per_second,
+                              tokens=args.tokens, parallel=args.parallel) as stub:
+            # Must be set before the shared Ollama client is first created
+            os.environ['OLLAMA_HOST'] = stub.url
+            os.environ.setdefault('CONVERTER_OLLAMA_CONCURRENCY', str(args.parallel))
+
+            benchmark = Benchmark(paths, stub, work_dir, args.language, args.jobs, args.tracemalloc)
+            parse_times = benchmark.parse_times()
+            report = {
+                'files': len(paths),
+                'bytes': sum(os.path.getsize(path) for path in paths),
+                'jobs': args.jobs,
+                'stub': {
+                    'latency': args.latency,
+                    'tokens_per_second': args.tokens_per_second,
+                    'tokens': args.tokens,
+                    'parallel': args.parallel,
+                },
+                'parse': {
+                    'total_seconds': sum(parse_times),
+                    'p50': _percentile(parse_times, 50),
+                    'p95': _percentile(parse_times, 95),
+                },
+                'startup': benchmark.startup_times(),
+                'results': [benchmark.run(scenario) for scenario in scenarios],
+            }
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    regressions = []
+    if args.startup_budget_ms is not None:
+        regressions += over_budget(report, args.startup_budget_ms / 1000)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions += compare(report, json.load(f), args.tolerance)
+    if regressions:
+        print("\nRegressions:")
+        for message in regressions:
+            print(f"  {message}")
+        sys.exit(1)
+    if args.baseline:
+        print("\nNo regressions against the baseline")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,486 @@
+#!/usr/bin/env python3
+"""
+Tool: Code Validator
+Fast checks of generated Playwright code: syntax (a built-in lexer, plus the
+TypeScript parser when Node.js can load it), test/expect imports and
+missing awaits. Imports and awaits are fixed in place; syntax errors are
+located to the test block they occur in, so only that block is re-prompted.
+Layer 3: Deterministic Tool
+"""
+
+import bisect
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class CodeValidator:
+    """Validate and fix converted Playwright files and method blocks."""
+
+    # Bump when checks or fixes change, so incremental runs revalidate
+    VERSION = 1
+
+    IMPORTS = {
+        'typescript': "import {{ {names} }} from '@playwright/test';",
+        'javascript': "const {{ {names} }} = require('@playwright/test');",
+    }
+
+    # Playwright page/locator methods that return promises
+    ASYNC_METHODS = (
+        'goto', 'click', 'dblclick', 'fill', 'type', 'press', 'check', 'uncheck', 'selectOption',
+        'hover', 'focus', 'clear', 'setInputFiles', 'textContent', 'innerText', 'innerHTML',
+        'inputValue', 'getAttribute', 'isVisible', 'isHidden', 'isEnabled', 'isDisabled',
+        'isChecked', 'isEditable', 'waitForTimeout', 'waitForSelector', 'waitForURL',
+        'waitForLoadState', 'reload', 'goBack', 'goForward', 'title', 'screenshot', 'evaluate',
+        'dragTo', 'scrollIntoViewIfNeeded',
+    )
+
+    # Web-first assertions, which return promises too
+    ASYNC_MATCHERS = (
+        'toBeVisible', 'toBeHidden', 'toHaveText', 'toContainText', 'toHaveValue', 'toHaveURL',
+        'toHaveTitle', 'toBeChecked', 'toBeEnabled', 'toBeDisabled', 'toHaveCount',
+        'toHaveAttribute', 'toBeEditable', 'toBeFocused', 'toHaveClass',
+    )
+
+    # Playwright hook -> TestNG annotation, for mapping blocks back to Java methods
+    HOOKS = {
+        'beforeEach': 'BeforeMethod',
+        'afterEach': 'AfterMethod',
+        'beforeAll': 'BeforeClass',
+        'afterAll': 'AfterClass',
+    }
+
+    def __init__(self, target_language: str = 'typescript', use_node: Optional[bool] = None):
+        """
+        Args:
+            target_language: 'typescript' or 'javascript'
+            use_node: Also run the TypeScript parser through Node.js; None uses
+                it when `node` can load the typescript package (CONVERTER_NODE
+                names the binary, 'off' disables it)
+        """
+        self.target_language = target_language
+        self.use_node = use_node
+        self._async_call = re.compile(r'\.(?:%s)\(' % '|'.join(self.ASYNC_METHODS))
+        self._async_expect = re.compile(r'^expect\(.*\)\.(?:not\.)?(?:%s)\(' % '|'.join(self.ASYNC_MATCHERS))
+
+    def syntax_errors(self, code: str) -> List[Dict[str, Any]]:
+        """
+        Syntax errors of a file or method block.
+
+        Returns:
+            [{'kind': 'syntax', 'line': 1-based line, 'message': ...}], empty if the code parses
+        """
+        errors = _scan(code)[1]
+        if not errors and self.use_node is not False:
+            parser = get_typescript_parser()
+            if parser is not None:
+                errors = parser.errors(code, self.target_language)
+        return errors
+
+    def check(self, code: str, fragment: bool = False) -> List[Dict[str, Any]]:
+        """
+        Every problem of the code: syntax errors, test/expect used without
+        being imported (files only) and promises that are not awaited.
+
+        Args:
+            code: Generated code
+            fragment: Method blocks without imports, as inserted into a file
+
+        Returns:
+            Issues with 'kind' ('syntax', 'import' or 'await'), 'line' and 'message'
+        """
+        issues = self.syntax_errors(code)
+        if issues:
+            return issues
+        masked = _scan(code)[0]
+        if not fragment:
+            issues.extend({'kind': 'import', 'line': 1, 'message': f'{name} is used but never imported'}
+                          for name in self._missing_imports(masked))
+        issues.extend({'kind': 'await', 'line': index + 1, 'message': 'promise is not awaited'}
+                      for index, _ in self._unawaited(masked))
+        return issues
+
+    def fix(self, code: str, fragment: bool = False) -> Tuple[str, List[Dict[str, Any]]]:
+        """
+        Add missing awaits and, for files, the missing @playwright/test import.
+        Code with syntax errors is returned unchanged.
+
+        Returns:
+            (fixed code, issues that were fixed)
+        """
+        masked, errors = _scan(code)
+        if errors:
+            return code, []
+
+        fixed = []
+        lines = code.split('\n')
+        for index, column in self._unawaited(masked):
+            lines[index] = lines[index][:column] + 'await ' + lines[index][column:]
+            fixed.append({'kind': 'await', 'line': index + 1, 'message': 'added missing await'})
+
+        missing = [] if fragment else self._missing_imports(masked)
+        if missing:
+            header = [self.IMPORTS[self.target_language].format(names=', '.join(missing))]
+            if lines and not re.match(r'\s*(?:import\b|const\s*\{)', lines[0]):
+                header.append('')
+            lines[:0] = header
+            fixed.append({'kind': 'import', 'line': 1,
+                          'message': f"imported {', '.join(missing)} from @playwright/test"})
+        return '\n'.join(lines), fixed
+
+    def locate(self, code: str, line: int) -> Optional[Dict[str, Any]]:
+        """
+        The top-level test, hook or function block containing a line.
+
+        Returns:
+            {'kind': 'test' | 'hook' | 'function', 'name': ..., 'start': ..., 'end': ...}
+            with 0-based start and exclusive end line indices, or None
+        """
+        for block in self.blocks(code):
+            if block['start'] < line <= block['end']:
+                return block
+        return None
+
+    @staticmethod
+    def blocks(code: str) -> List[Dict[str, Any]]:
+        """
+        Test, hook and function blocks in source order. A block runs until the
+        next one starts, so it can be found even when its brackets are broken.
+        """
+        lines = code.split('\n')
+        blocks = []
+        for index, line in enumerate(lines):
+            match = _BLOCK_START.match(line)
+            if match is None:
+                continue
+            if match.group('hook'):
+                kind, name = 'hook', match.group('hook')
+            elif match.group('function'):
+                kind, name = 'function', match.group('function')
+            else:
+                kind, name = 'test', match.group('title')
+            blocks.append({'kind': kind, 'name': name, 'start': index,
+                           'indent': len(line) - len(line.lstrip())})
+
+        for block, following in zip(blocks, blocks[1:] + [None]):
+            end = following['start'] if following else len(lines)
+            # The last block ends before the closing lines of an enclosing test.describe
+            while following is None and end > block['start'] + 1:
+                last = lines[end - 1]
+                if last.strip() and (len(last) - len(last.lstrip()) >= block['indent']):
+                    break
+                end -= 1
+            block['end'] = end
+            del block['indent']
+        return blocks
+
+    def _missing_imports(self, masked: str) -> List[str]:
+        """test/expect used in (masked) code without a declaration."""
+        missing = []
+        for name in ('test', 'expect'):
+            if not re.search(r'(?<![\w$.])%s\s*[.(]' % name, masked):
+                continue
+            declared = (
+                re.search(r'\bimport\s*\{[^}]*\b%s\b[^}]*\}' % name, masked)
+                or re.search(r'\b(?:const|let|var)\s*\{[^}]*\b%s\b[^}]*\}\s*=\s*require\(' % name, masked)
+                or re.search(r'\bimport\s+%s\b' % name, masked)
+                or re.search(r'\b(?:const|let|var|function)\s+%s\b' % name, masked)
+            )
+            if not declared:
+                missing.append(name)
+        return missing
+
+    def _unawaited(self, masked: str) -> List[Tuple[int, int]]:
+        """(line index, column) where an await is missing, inside async functions only."""
+        lines = masked.split('\n')
+        found = []
+        for index, line in enumerate(lines):
+            stripped = line.strip()
+            if not stripped or stripped.endswith(',') or 'await' in stripped:
+                continue
+            indent = len(line) - len(line.lstrip())
+
+            assignment = _ASSIGNMENT.match(stripped)
+            if assignment:
+                column, expression = indent + assignment.end(), stripped[assignment.end():]
+            elif _KEYWORD.match(stripped):
+                continue
+            else:
+                column, expression = indent, stripped
+
+            if not _CHAIN.match(expression):
+                continue
+            if expression.startswith('expect('):
+                missing = self._async_expect.match(expression) is not None
+            else:
+                missing = self._async_call.search(expression) is not None
+            if missing and _in_async(lines, index, indent):
+                found.append((index, column))
+        return found
+
+
+# test('title', ...), test.beforeEach(...), [async] function name(...)
+_BLOCK_START = re.compile(
+    r"""^\s*(?:test\(\s*(['"`])(?P<title>.*?)\1"""
+    r"""|test\.(?P<hook>beforeEach|afterEach|beforeAll|afterAll)\("""
+    r"""|(?:export\s+)?(?:async\s+)?function\s+(?P<function>[\w$]+)\s*\()"""
+)
+
+_ASSIGNMENT = re.compile(r'^(?:(?:const|let|var)\s+)?[\w$]+(?:\s*:\s*[\w$<>\[\]|. ]+)?\s*=\s*(?!=)')
+
+_KEYWORD = re.compile(
+    r'^(?:return|const|let|var|if|else|for|while|do|switch|case|throw|new|function|async|'
+    r'class|import|export|try|catch|finally|test)\b'
+)
+
+_CHAIN = re.compile(r'^[A-Za-z_$][\w$]*\s*[.(]')
+
+
+def _in_async(lines: List[str], index: int, indent: int) -> bool:
+    """
+    Whether the function enclosing a line is async: the closest less indented
+    line that opens a function (skipping if/for/try/... blocks) declares async.
+    """
+    for line in reversed(lines[:index]):
+        stripped = line.strip()
+        if not stripped or len(line) - len(line.lstrip()) >= indent:
+            continue
+        if not stripped.endswith('{'):
+            return False
+        if _CONTROL.match(stripped):
+            indent = len(line) - len(line.lstrip())
+            continue
+        return bool(re.search(r'\basync\b', stripped))
+    return False
+
+
+_CONTROL = re.compile(r'^(?:\}\s*)?(?:if|else|for|while|do|try|catch|finally|switch)\b')
+
+
+_OPENERS = {'(': ')', '[': ']', '{': '}'}
+_CLOSERS = {')': '(', ']': '[', '}': '{'}
+
+# After these, '/' starts a regular expression rather than a division
+_REGEX_AFTER = set('(,=:[!&|?{};+-*%<>~^') | {
+    '', 'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete', 'void', 'throw',
+    'yield', 'await',
+}
+
+
+def _scan(code: str) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Lex JavaScript/TypeScript far enough to check that comments, strings,
+    template literals and brackets are closed and properly nested.
+
+    Returns:
+        (code with comment, string and regex contents blanked out (newlines
+        kept, so positions stay valid), syntax errors, at most one per kind)
+    """
+    out = list(code)
+    newlines = [index for index, char in enumerate(code) if char == '\n']
+    errors = []
+    stack = []  # (opener, position); '${' marks a template substitution
+    bracket_error = False
+    previous = ''
+    n = len(code)
+
+    def line_of(position: int) -> int:
+        return bisect.bisect_right(newlines, position - 1) + 1
+
+    def error(position: int, message: str):
+        errors.append({'kind': 'syntax', 'line': line_of(position), 'message': message})
+
+    def blank(start: int, end: int):
+        for index in range(start, end):
+            if out[index] != '\n':
+                out[index] = ' '
+
+    def template(start: int) -> Tuple[int, str]:
+        """
+        Skip template literal text from start. Returns the index after the
+        closing backtick, or after '${', and the token to treat as previous.
+        """
+        index = start
+        while index < n:
+            char = code[index]
+            if char == '\\':
+                index += 2
+                continue
+            if char == '`':
+                blank(start, index)
+                return index + 1, 'x'
+            if char == '$' and index + 1 < n and code[index + 1] == '{':
+                blank(start, index)
+                stack.append(('${', index))
+                return index + 2, '{'
+            index += 1
+        error(start - 1, 'unterminated template literal')
+        blank(start, n)
+        return n, 'x'
+
+    i = 0
+    while i < n:
+        char = code[i]
+        following = code[i + 1] if i + 1 < n else ''
+
+        if char.isspace():
+            i += 1
+        elif char == '/' and following == '/':
+            end = code.find('\n', i)
+            end = n if end == -1 else end
+            blank(i, end)
+            i = end
+        elif char == '/' and following == '*':
+            end = code.find('*/', i + 2)
+            if end == -1:
+                error(i, 'unterminated comment')
+                blank(i, n)
+                break
+            blank(i, end + 2)
+            i = end + 2
+        elif char in '\'"':
+            end = i + 1
+            while end < n and code[end] not in (char, '\n'):
+                end += 2 if code[end] == '\\' else 1
+            blank(i + 1, min(end, n))
+            if end >= n or code[end] == '\n':
+                error(i, 'unterminated string literal')
+                i = end
+            else:
+                i = end + 1
+            previous = 'x'
+        elif char == '`':
+            i, previous = template(i + 1)
+        elif char == '/' and previous in _REGEX_AFTER:
+            end, in_class = i + 1, False
+            while end < n and code[end] != '\n':
+                if code[end] == '\\':
+                    end += 2
+                    continue
+                if code[end] == '[':
+                    in_class = True
+                elif code[end] == ']':
+                    in_class = False
+                elif code[end] == '/' and not in_class:
+                    break
+                end += 1
+            if end >= n or code[end] == '\n':
+                # Not a regular expression after all
+                previous = '/'
+                i += 1
+                continue
+            blank(i + 1, end)
+            end += 1
+            while end < n and code[end].isalpha():
+                end += 1
+            i = end
+            previous = 'x'
+        elif char in _OPENERS:
+            stack.append((char, i))
+            previous = char
+            i += 1
+        elif char in _CLOSERS:
+            if not stack:
+                if not bracket_error:
+                    error(i, f"unexpected '{char}'")
+                    bracket_error = True
+            else:
+                opener, position = stack.pop()
+                if opener == '${' and char == '}':
+                    i, previous = template(i + 1)
+                    continue
+                if _CLOSERS[char] != opener and not bracket_error:
+                    error(i, f"'{char}' does not match '{opener[-1]}' opened on line {line_of(position)}")
+                    bracket_error = True
+            previous = char
+            i += 1
+        elif char.isalnum() or char in '_$':
+            end = i
+            while end < n and (code[end].isalnum() or code[end] in '_$'):
+                end += 1
+            previous = code[i:end]
+            i = end
+        else:
+            previous = char
+            i += 1
+
+    if stack and not bracket_error:
+        opener, position = stack[-1]
+        error(position, f"'{opener[-1]}' is never closed")
+
+    return ''.join(out), errors
+
+
+class TypeScriptParser:
+    """
+    The TypeScript compiler's parser in a long-running Node.js process, so
+    each check costs a pipe round trip instead of a process start.
+    """
+
+    SCRIPT = r"""
+const ts = require('typescript');
+const readline = require('readline');
+process.stdout.write(JSON.stringify({ready: true, version: ts.version}) + '\n');
+readline.createInterface({input: process.stdin}).on('line', line => {
+  const request = JSON.parse(line);
+  const kind = request.language === 'typescript' ? ts.ScriptKind.TS : ts.ScriptKind.JS;
+  const file = ts.createSourceFile('converted.' + (kind === ts.ScriptKind.TS ? 'ts' : 'js'),
+                                   request.code, ts.ScriptTarget.Latest, false, kind);
+  const errors = (file.parseDiagnostics || []).slice(0, 5).map(d => ({
+    kind: 'syntax',
+    line: file.getLineAndCharacterOfPosition(d.start).line + 1,
+    message: ts.flattenDiagnosticMessageText(d.messageText, ' ')
+  }));
+  process.stdout.write(JSON.stringify({errors}) + '\n');
+});
+"""
+
+    def __init__(self, node: str):
+        self.version = None
+        self._lock = threading.Lock()
+        self._process = subprocess.Popen(
+            [node, '-e', self.SCRIPT], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL, text=True, encoding='utf-8'
+        )
+        ready = self._process.stdout.readline()
+        if not ready:
+            self._process.wait()
+            raise OSError('node could not load the typescript package')
+        self.version = json.loads(ready)['version']
+
+    def errors(self, code: str, language: str) -> List[Dict[str, Any]]:
+        """Syntax errors reported by the TypeScript parser ([] if the parser has gone away)."""
+        with self._lock:
+            try:
+                self._process.stdin.write(json.dumps({'code': code, 'language': language}) + '\n')
+                self._process.stdin.flush()
+                return json.loads(self._process.stdout.readline())['errors']
+            except (OSError, ValueError):
+                return []
+
+
+_typescript_parser: Optional[TypeScriptParser] = None
+_typescript_checked = False
+_typescript_lock = threading.Lock()
+
+
+def get_typescript_parser() -> Optional[TypeScriptParser]:
+    """
+    Process-wide TypeScript parser, or None when Node.js or the typescript
+    package (npm install typescript, or on NODE_PATH) is not available.
+    """
+    global _typescript_parser, _typescript_checked
+    with _typescript_lock:
+        if not _typescript_checked:
+            _typescript_checked = True
+            node = os.environ.get('CONVERTER_NODE', 'node')
+            if node != 'off' and shutil.which(node):
+                try:
+                    _typescript_parser = TypeScriptParser(node)
+                except (OSError, ValueError, KeyError):
+                    _typescript_parser = None
+        return _typescript_parser
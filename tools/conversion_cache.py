@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Tool: Conversion Cache
+Persistent, content-addressed cache of LLM conversions.
+Layer 3: Deterministic Tool
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+class ConversionCache:
+    """
+    SQLite-backed cache of converted code.
+    Keys are hashes of everything that influences the generated output, so a
+    changed prompt, model or option never serves a stale conversion.
+    """
+
+    SCHEMA_VERSION = 1
+
+    DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+    DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+
+    # Seconds between sweeps of expired entries (expired entries are misses anyway)
+    SWEEP_INTERVAL = 60.0
+
+    # Eviction frees space down to this fraction of max_bytes, so a full cache
+    # does not evict on every put
+    EVICT_TO = 0.9
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_age: float = DEFAULT_MAX_AGE):
+        """
+        Args:
+            path: SQLite database file (parent directories are created)
+            max_bytes: Total size of cached values before LRU eviction
+            max_age: Seconds after which an entry is treated as expired
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS conversions ('
+            ' key TEXT PRIMARY KEY,'
+            ' value TEXT NOT NULL,'
+            ' size INTEGER NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' accessed_at REAL NOT NULL)'
+        )
+        self._db.execute(
+            'CREATE INDEX IF NOT EXISTS idx_conversions_accessed '
+            'ON conversions (accessed_at)'
+        )
+        self._db.commit()
+
+        # Running total of value sizes, so puts do not sum the table. Other
+        # processes may write the same file: each sweep re-reads the total.
+        self._bytes = 0
+        self._swept_at = 0.0
+        self._sweep(time.time())
+
+    @staticmethod
+    def normalize_source(java_source: str) -> str:
+        """Normalize line endings and insignificant whitespace."""
+        text = java_source.lstrip('\ufeff').replace('\r\n', '\n').replace('\r', '\n')
+        lines = [line.rstrip() for line in text.split('\n')]
+        return '\n'.join(lines).strip('\n')
+
+    @classmethod
+    def make_key(cls, java_source: str, **parts: Any) -> str:
+        """
+        Build a cache key.
+
+        Args:
+            java_source: Java source sent to the model
+            **parts: Target language, model, prompts, options, ...
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        payload = {
+            'schema': cls.SCHEMA_VERSION,
+            'source': cls.normalize_source(java_source),
+            'parts': parts,
+        }
+        encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                'SELECT value, created_at, size FROM conversions WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None or now - row[1] > self.max_age:
+                if row is not None:
+                    self._db.execute('DELETE FROM conversions WHERE key = ?', (key,))
+                    self._db.commit()
+                    self._bytes -= row[2]
+                self.misses += 1
+                return None
+
+            self._db.execute(
+                'UPDATE conversions SET accessed_at = ? WHERE key = ?', (now, key)
+            )
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str):
+        """Store value under key and evict old entries if needed."""
+        now = time.time()
+        size = len(value.encode('utf-8'))
+        with self._lock:
+            replaced = self._db.execute(
+                'SELECT size FROM conversions WHERE key = ?', (key,)
+            ).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO conversions '
+                '(key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)',
+                (key, value, size, now, now)
+            )
+            self._bytes += size - (replaced[0] if replaced else 0)
+            if now - self._swept_at >= self.SWEEP_INTERVAL:
+                self._sweep(now)
+            if self._bytes > self.max_bytes:
+                self._evict()
+            self._db.commit()
+
+    def _sweep(self, now: float):
+        """Drop expired entries and re-read the total size."""
+        self._db.execute(
+            'DELETE FROM conversions WHERE created_at < ?', (now - self.max_age,)
+        )
+        self._bytes = self._db.execute(
+            'SELECT COALESCE(SUM(size), 0) FROM conversions'
+        ).fetchone()[0]
+        self._db.commit()
+        self._swept_at = now
+
+    def _evict(self):
+        """Drop least recently used entries until the total is EVICT_TO of max_bytes."""
+        target = self.max_bytes * self.EVICT_TO
+        stale = []
+        # Walks the accessed_at index only as far as needed
+        for key, size in self._db.execute('SELECT key, size FROM conversions ORDER BY accessed_at'):
+            if self._bytes <= target:
+                break
+            stale.append((key,))
+            self._bytes -= size
+        self._db.executemany('DELETE FROM conversions WHERE key = ?', stale)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for this process and current cache size."""
+        with self._lock:
+            entries, size = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM conversions'
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': entries,
+            'bytes': size,
+        }
+
+    def clear(self):
+        """Remove all cached entries."""
+        with self._lock:
+            self._db.execute('DELETE FROM conversions')
+            self._db.commit()
+            self._bytes = 0
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._db.close()
@@ -6,12 +6,26 @@ Layer 3: Deterministic Tool
 """
 
 import os
-import json
-from typing import Dict, Any, Optional
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 
-from tools.java_parser import parse_java_source
+from tools.code_validator import CodeValidator
+from tools.conversion_cache import ConversionCache
 from tools.llm_converter import LLMConverter
+from tools.llm_scheduler import ContextThreadPoolExecutor
+from tools.manifest import ConversionManifest, settings_fingerprint
+from tools.method_shapes import MethodShape
+from tools.metrics import StageTimer, record_conversion
+from tools.model_router import ModelRouter
+from tools.output_writer import OutputWriter
+from tools.parse_cache import get_parse_cache
+from tools.project_index import ProjectIndex, index_source
+from tools.prompt_compactor import PromptCompactor
+from tools.rule_converter import RuleConverter
+from tools.source_classifier import SourceClassifier
+from tools.source_walker import SourceWalker
 
 
 class SeleniumToPlaywrightConverter:
@@ -20,77 +34,274 @@ class SeleniumToPlaywrightConverter:
     Converts Selenium Java test files to Playwright JS/TS.
     """
     
-    def __init__(self, target_language: str = 'typescript', output_dir: str = 'output'):
+    CACHE_FILE = os.path.join('.cache', 'conversions.sqlite')
+    # Next to the conversion cache, whichever directory that is in
+    PARSE_CACHE_FILE = 'parses.sqlite'
+    
+    # Files read, parsed or converted at once per job in convert_files
+    IN_FLIGHT_PER_JOB = 2
+    
+    # Large result fields that convert_files(keep_payloads=False) drops
+    PAYLOAD_KEYS = ('original_code', 'converted_code', 'metadata')
+    
+    def __init__(self, target_language: str = 'typescript', output_dir: str = 'output',
+                 use_cache: bool = True, chunked: Optional[bool] = None, methods_per_chunk: int = 1,
+                 cache: Optional[ConversionCache] = None, router: Optional[ModelRouter] = None,
+                 validate: bool = True, writer: Optional[OutputWriter] = None):
+        """
+        Args:
+            target_language: 'typescript' or 'javascript'
+            output_dir: Directory for converted files
+            use_cache: Reuse cached LLM conversions
+            chunked: Convert classes method by method; None chunks classes
+                with more than LLMConverter.CHUNK_THRESHOLD methods
+            methods_per_chunk: Number of methods per prompt in chunked mode
+            cache: Shared conversion cache (default: one under output_dir)
+            router: Chooses backend and model per file (default: ModelRouter.from_env())
+            validate: Syntax-check generated code, re-prompt the methods that do
+                not parse and add missing awaits and imports
+            writer: Where outputs go (default: flat into output_dir)
+        """
         self.target_language = target_language
         self.output_dir = output_dir
+        self.chunked = chunked
+        self.methods_per_chunk = methods_per_chunk
         self.extension = '.spec.ts' if target_language == 'typescript' else '.spec.js'
-        self.converter = LLMConverter(target_language)
+        self.output = writer or OutputWriter(output_dir)
+        if cache is None and use_cache:
+            cache = ConversionCache(os.path.join(output_dir, self.CACHE_FILE))
+        self.cache = cache
+        self.validator = CodeValidator(target_language) if validate else None
+        self.router = router or ModelRouter.from_env()
+        self.converters = {
+            tier: LLMConverter(target_language, cache=self.cache, backend=route['backend'],
+                               model=route['model'], validator=self.validator)
+            for tier, route in self.router.tiers.items()
+        }
+        # The large model; also converts shared helpers, which every test depends on
+        self.converter = self.converters[ModelRouter.LARGE]
+        self.rules = RuleConverter(target_language)
+        # Parses are cached in memory, and on disk along with the conversion cache
+        self.parses = get_parse_cache(
+            os.path.join(os.path.dirname(self.cache.path), self.PARSE_CACHE_FILE) if self.cache else None
+        )
+        # Set by index_project(); gives prompts the signatures of converted helpers
+        self.project: Optional[ProjectIndex] = None
     
-    def convert(self, java_source: str, file_name: str = '') -> Dict[str, Any]:
+    def convert(self, java_source: str, file_name: str = '',
+                output_name: Optional[str] = None, dry_run: bool = False) -> Dict[str, Any]:
         """
         Convert Java source code to Playwright.
         
         Args:
             java_source: Java source code string
             file_name: Original file name for context
+            output_name: Output file name (default: derived from file_name)
+            dry_run: Only report how it would be converted (see dry_run())
         
         Returns:
             Dictionary with conversion results
         """
-        # Step 1: Parse Java source
+        timer = StageTimer()
+        
+        # Step 1: Parse Java source (or reuse an earlier parse of the same source)
         try:
-            metadata = parse_java_source(java_source, file_name)
+            metadata, plan = self.parses.parse(java_source, file_name, self.rules, timer)
         except ValueError as e:
-            return {
-                'success': False,
-                'error': f'Parse error: {e}',
-                'original_code': java_source,
-                'converted_code': '',
-                'output_file': ''
-            }
+            return self._failure(java_source, f'Parse error: {e}', timer)
+        
+        if dry_run:
+            return self.dry_run(java_source, metadata, file_name, plan, timer, output_name)
+        return self.convert_parsed(java_source, metadata, file_name, plan, timer, output_name)
+    
+    def convert_parsed(self, java_source: str, metadata: Dict[str, Any],
+                       file_name: str = '', plan: Optional[Dict[str, Any]] = None,
+                       timer: Optional[StageTimer] = None,
+                       output_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Convert Java source that has already been parsed.
         
-        # Step 2: Convert using LLM
+        Args:
+            java_source: Java source code string
+            metadata: Parsed metadata from JavaParser
+            file_name: Original file name for context
+            plan: Rule-based conversion plan from RuleConverter.plan
+            timer: Stage timings collected so far (parse, rules)
+            output_name: Output file name (default: derived from file_name)
+        
+        Returns:
+            Dictionary with conversion results, including per-stage
+            'timings' and 'llm' request and token counts
+        """
+        timer = timer or StageTimer()
+        context = self._project_context(java_source, metadata, file_name, output_name)
+        llm = self._llm_for(metadata, java_source)
+        strategy = self._strategy(metadata, java_source, plan, context)
+        
+        # Step 2: Generate mapped methods from rules, everything else via LLM
         try:
-            converted_code = self.converter.convert_with_context(java_source, metadata)
+            if strategy in ('rules', 'hybrid'):
+                pending = [index for index, block in enumerate(plan['blocks']) if block['code'] is None]
+                converted = llm.convert_methods(
+                    [plan['blocks'][index]['source'] for index in pending], plan['class_name'],
+                    timer=timer, context=context['prompt'],
+                    names=[plan['blocks'][index]['locals'] for index in pending]
+                )
+                with timer.stage('postprocess'):
+                    imports = list(dict.fromkeys(
+                        line for name, line in context['imports'].items()
+                        if any(name in code for code in converted)
+                    ))
+                    converted_code = self.rules.render(plan, dict(zip(pending, converted)), imports)
+            elif strategy == 'chunked':
+                converted_code = llm.convert_chunked(
+                    java_source, metadata, self.methods_per_chunk, timer, context['prompt']
+                )
+            else:
+                converted_code = llm.convert_with_context(
+                    java_source, metadata, timer, context['prompt']
+                )
         except RuntimeError as e:
-            return {
-                'success': False,
-                'error': f'Conversion error: {e}',
-                'original_code': java_source,
-                'converted_code': '',
-                'output_file': ''
-            }
+            return self._failure(java_source, f'Conversion error: {e}', timer, strategy, llm.model)
         
-        # Step 3: Prepare output file name
-        if file_name:
-            base_name = Path(file_name).stem
-            # Convert CamelCase to kebab-case
-            output_name = self._camel_to_kebab(base_name) + self.extension
-        else:
-            output_name = 'converted' + self.extension
-        
-        output_path = os.path.join(self.output_dir, output_name)
+        # Step 3: Fix imports and awaits; code that still does not parse is reported as a failure
+        converted_code, validation = self._validate(converted_code, timer)
         
         # Step 4: Save to file
-        os.makedirs(self.output_dir, exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(converted_code)
+        with timer.stage('write'):
+            output_path = self._write_output(converted_code, file_name, output_name)
+        
+        result = {
+            'success': _valid(validation),
+            'error': _validation_error(validation),
+            'original_code': java_source,
+            'converted_code': converted_code,
+            'output_file': output_path,
+            'strategy': strategy,
+            'model': llm.model,
+            'validation': validation,
+            'metadata': metadata
+        }
+        result.update(record_conversion(timer, strategy, result['success'], llm.model, _outcome(validation)))
+        return result
+    
+    def dry_run(self, java_source: str, metadata: Dict[str, Any], file_name: str = '',
+                plan: Optional[Dict[str, Any]] = None, timer: Optional[StageTimer] = None,
+                output_name: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Report how parsed Java source would be converted, without calling
+        the LLM (its backend is not even created) or writing anything.
+        
+        Args:
+            java_source: Java source code string
+            metadata: Parsed metadata from JavaParser
+            file_name: Original file name for context
+            plan: Rule-based conversion plan from RuleConverter.plan
+            timer: Stage timings collected so far (parse, rules)
+            output_name: Output file name (default: derived from file_name)
+        
+        Returns:
+            Dictionary like convert_parsed's, with 'dry_run': True, empty
+            converted_code, the output_file it would get, and 'prompts':
+            LLM prompts it would send before cache hits and repairs
+        """
+        timer = timer or StageTimer()
+        context = self._project_context(java_source, metadata, file_name, output_name)
+        llm = self._llm_for(metadata, java_source)
+        strategy = self._strategy(metadata, java_source, plan, context)
+        if strategy in ('rules', 'hybrid'):
+            prompts = sum(1 for block in plan['blocks'] if block['code'] is None)
+        elif strategy == 'chunked':
+            # The skeleton, then one prompt per group of methods
+            prompts = 1 + -(-len(metadata['methods']) // max(1, self.methods_per_chunk))
+        else:
+            prompts = 1
         
         return {
             'success': True,
             'error': None,
+            'dry_run': True,
             'original_code': java_source,
+            'converted_code': '',
+            'output_file': self.output.path_for(file_name, output_name or self._output_name(file_name)),
+            'strategy': strategy,
+            'model': llm.model,
+            'prompts': prompts,
+            'metadata': metadata,
+            'timings': timer.report()['timings'],
+        }
+    
+    def convert_stream(self, java_source: str, file_name: str = '') -> Iterator[Dict[str, Any]]:
+        """
+        Convert Java source code, streaming the generated code.
+        
+        Whole-file LLM conversions are streamed token by token; rule-based,
+        hybrid and chunked conversions arrive as a single chunk.
+        
+        Args:
+            java_source: Java source code string
+            file_name: Original file name for context
+        
+        Yields:
+            {'type': 'chunk', 'text': ...} events, then one 'done' event
+            carrying the same fields as convert() (without original_code)
+        """
+        timer = StageTimer()
+        try:
+            metadata, plan = self.parses.parse(java_source, file_name, self.rules, timer)
+        except ValueError as e:
+            result = self._failure(java_source, f'Parse error: {e}', timer)
+            result.pop('original_code')
+            yield dict(result, type='done')
+            return
+        
+        context = self._project_context(java_source, metadata, file_name)
+        if self._strategy(metadata, java_source, plan, context) != 'llm':
+            result = self.convert_parsed(java_source, metadata, file_name, plan, timer)
+            if result['success']:
+                yield {'type': 'chunk', 'text': result['converted_code']}
+            result.pop('original_code')
+            yield dict(result, type='done')
+            return
+        
+        llm = self._llm_for(metadata, java_source)
+        parts = []
+        try:
+            for text in llm.convert_stream(java_source, metadata.get('class_name', ''), timer, context['prompt']):
+                parts.append(text)
+                yield {'type': 'chunk', 'text': text}
+        except RuntimeError as e:
+            result = self._failure(java_source, f'Conversion error: {e}', timer, 'llm', llm.model)
+            result.pop('original_code')
+            yield dict(result, type='done')
+            return
+        
+        # Repairs replace the streamed code; clients show the 'done' event's converted_code
+        converted_code = llm.repair(''.join(parts), java_source, metadata, timer, context['prompt'])
+        converted_code, validation = self._validate(converted_code, timer)
+        with timer.stage('write'):
+            output_path = self._write_output(converted_code, file_name)
+        result = {
+            'type': 'done',
+            'success': _valid(validation),
+            'error': _validation_error(validation),
             'converted_code': converted_code,
             'output_file': output_path,
+            'strategy': 'llm',
+            'model': llm.model,
+            'validation': validation,
             'metadata': metadata
         }
+        result.update(record_conversion(timer, 'llm', result['success'], llm.model, _outcome(validation)))
+        yield result
     
-    def convert_file(self, file_path: str) -> Dict[str, Any]:
+    def convert_file(self, file_path: str, dry_run: bool = False) -> Dict[str, Any]:
         """
         Convert a Java file to Playwright.
         
         Args:
             file_path: Path to Java file
+            dry_run: Only report how it would be converted (see dry_run())
         
         Returns:
             Dictionary with conversion results
@@ -98,7 +309,361 @@ class SeleniumToPlaywrightConverter:
         with open(file_path, 'r', encoding='utf-8') as f:
             java_source = f.read()
         
-        return self.convert(java_source, file_path)
+        return self.convert(java_source, file_path, dry_run=dry_run)
+    
+    def convert_files(self, file_paths: Iterable[str], jobs: int = 1, keep_payloads: bool = True,
+                      dry_run: bool = False) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Convert many Java files, yielding results as they finish.
+        
+        With jobs > 1, files are parsed in a process pool (javalang is
+        CPU-bound) and at most `jobs` LLM requests are in flight at once.
+        file_paths is consumed lazily, and at most IN_FLIGHT_PER_JOB * jobs
+        files are read, parsed or converted at a time, so memory does not
+        grow with the number of files.
+        
+        Args:
+            file_paths: Paths to Java files (any iterable, e.g. a SourceWalker)
+            jobs: Number of parallel workers
+            keep_payloads: False drops the source, generated code and metadata
+                from each result once it is written (see PAYLOAD_KEYS)
+            dry_run: Only parse and report how each file would be converted
+        
+        Yields:
+            (index into file_paths, conversion result) in completion order
+        """
+        slim = (lambda result: result) if keep_payloads else _without_payloads
+        convert_parsed = self.dry_run if dry_run else self.convert_parsed
+        
+        if jobs <= 1:
+            for index, file_path in enumerate(file_paths):
+                yield index, slim(self.convert_file(file_path, dry_run))
+            return
+        
+        queued = enumerate(file_paths)
+        window = self.IN_FLIGHT_PER_JOB * jobs
+        parse_workers = min(jobs, os.cpu_count() or 1)
+        with ProcessPoolExecutor(parse_workers) as parse_pool, ContextThreadPoolExecutor(jobs) as llm_pool:
+            pending = {}
+            parsing = set()
+            
+            def fill():
+                while len(pending) < window:
+                    item = next(queued, None)
+                    if item is None:
+                        return
+                    # Claimed in input order, so collision suffixes do not depend on completion order
+                    self.output.claim(item[1], self._output_name(item[1]))
+                    future = parse_pool.submit(_read_and_parse, item[1], self.target_language,
+                                                self.parses.store_path)
+                    pending[future] = item
+                    parsing.add(future)
+            
+            fill()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, file_path = pending.pop(future)
+                    
+                    if future not in parsing:
+                        yield index, slim(future.result())
+                        continue
+                    
+                    parsing.discard(future)
+                    java_source, metadata, plan, timings, error = future.result()
+                    timer = StageTimer()
+                    timer.merge(timings)
+                    if error:
+                        yield index, slim(self._failure(java_source, error, timer))
+                    else:
+                        converted = llm_pool.submit(
+                            convert_parsed, java_source, metadata, file_path, plan, timer
+                        )
+                        pending[converted] = (index, file_path)
+                fill()
+    
+    def index_project(self, file_paths: List[str], jobs: int = 1) -> ProjectIndex:
+        """
+        Index a source tree so that shared page objects and base classes can
+        be converted once (convert_helpers) and referenced by every test.
+        
+        Args:
+            file_paths: All Java files of the project
+            jobs: Parallel parse workers
+        
+        Returns:
+            The project index, also kept for later conversions
+        """
+        self.project = ProjectIndex.build(file_paths, self._helper_extension(), jobs, self.parses.store_path)
+        return self.project
+    
+    def convert_helpers(self, jobs: int = 1, sources: Optional[Dict[str, str]] = None,
+                        dry_run: bool = False) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Convert the indexed project's shared helpers into Playwright modules,
+        in dependency order, and record their signatures for later prompts.
+        
+        Args:
+            jobs: Helpers converted concurrently within a dependency level
+            sources: Helper sources by path (default: read from disk)
+            dry_run: Only report the helpers, recorded with their Java signatures
+        
+        Yields:
+            (helper path, conversion result)
+        """
+        if self.project is None:
+            return
+        
+        if dry_run:
+            for level in self.project.helpers():
+                for path in level:
+                    output_path = self.output.path_for(path, self.project.module_name(path))
+                    self.project.record(path, '', output_path)
+                    yield path, {
+                        'success': True, 'error': None, 'dry_run': True, 'converted_code': '',
+                        'output_file': output_path, 'strategy': 'helper', 'model': self.converter.model,
+                        'prompts': 1,
+                    }
+            return
+        
+        def convert_helper(path: str) -> Dict[str, Any]:
+            if sources is not None:
+                java_source = sources[path]
+            else:
+                with open(path, 'r', encoding='utf-8') as f:
+                    java_source = f.read()
+            
+            timer = StageTimer()
+            entry = self.project.files[path]
+            context = self.project.context_for(
+                java_source, entry['classes'], self.output.path_for(path, self.project.module_name(path))
+            )
+            try:
+                converted_code = self.converter.convert_helper(
+                    java_source, entry['classes'][0], self.project.helper_kind(path), timer, context['prompt']
+                )
+            except RuntimeError as e:
+                return self._failure(java_source, f'Conversion error: {e}', timer, 'helper', self.converter.model)
+            
+            converted_code, validation = self._validate(converted_code, timer)
+            with timer.stage('write'):
+                output_path = self._write_output(converted_code, path, self.project.module_name(path))
+            self.project.record(path, converted_code, output_path)
+            
+            result = {
+                'success': _valid(validation),
+                'error': _validation_error(validation),
+                'original_code': java_source,
+                'converted_code': converted_code,
+                'output_file': output_path,
+                'strategy': 'helper',
+                'model': self.converter.model,
+                'validation': validation,
+                'metadata': {'class_name': entry['classes'][0], 'kind': self.project.helper_kind(path)}
+            }
+            result.update(record_conversion(timer, 'helper', result['success'], self.converter.model,
+                                            _outcome(validation)))
+            return result
+        
+        for level in self.project.helpers():
+            for path in level:
+                self.output.claim(path, self.project.module_name(path))
+            with ContextThreadPoolExecutor(max(1, min(jobs, len(level)))) as pool:
+                for path, result in zip(level, pool.map(convert_helper, level)):
+                    yield path, result
+    
+    def convert_many(self, files: List[Tuple[str, str]], jobs: int = 4,
+                     shared_context: bool = False) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Convert many in-memory sources, yielding results as they finish.
+        
+        Identical sources (after whitespace normalization) are converted once;
+        their duplicates get a copy of the result written under their own
+        name. Output names are made unique within the batch, so files with
+        the same name in different directories do not overwrite each other.
+        
+        Sources are already in memory, so parsing shares the thread pool with
+        the LLM calls instead of forking worker processes (which is unsafe in
+        a multi-threaded web server).
+        
+        Args:
+            files: (file name, Java source) pairs
+            jobs: Number of files converted concurrently
+            shared_context: First convert page objects and base classes that
+                other files in the batch use, then give the tests their signatures
+        
+        Yields:
+            (index into files, conversion result) in completion order;
+            duplicates carry 'duplicate_of' with the converted file's name
+        """
+        output_names = self._unique_output_names([file_name for file_name, _ in files])
+        
+        helpers = set()
+        if shared_context:
+            self.project = ProjectIndex(self._helper_extension())
+            for file_name, java_source in files:
+                entry = index_source(java_source, file_name)
+                if entry is not None:
+                    self.project.add(entry)
+            self.project.resolve()
+            
+            positions = {file_name: index for index, (file_name, _) in enumerate(files)}
+            for path, result in self.convert_helpers(jobs, dict(files)):
+                helpers.add(positions[path])
+                yield positions[path], result
+        
+        groups: Dict[str, List[int]] = {}
+        for index, (_, java_source) in enumerate(files):
+            if index not in helpers:
+                groups.setdefault(ConversionCache.normalize_source(java_source), []).append(index)
+        
+        with ContextThreadPoolExecutor(max(1, min(jobs, len(groups)))) as pool:
+            futures = {
+                pool.submit(self.convert, files[indices[0]][1], files[indices[0]][0],
+                            output_names[indices[0]]): indices
+                for indices in groups.values()
+            }
+            for future in as_completed(futures):
+                indices = futures[future]
+                result = future.result()
+                yield indices[0], result
+                
+                for index in indices[1:]:
+                    # Timings and token counts belong to the converted file only
+                    duplicate = {key: value for key, value in result.items() if key not in ('timings', 'llm')}
+                    duplicate['duplicate_of'] = files[indices[0]][0]
+                    if result['success']:
+                        duplicate['output_file'] = self._write_output(
+                            result['converted_code'], files[index][0], output_names[index]
+                        )
+                    yield index, duplicate
+    
+    def settings_fingerprint(self) -> str:
+        """Fingerprint of every setting that influences the generated code."""
+        return settings_fingerprint({
+            'target_language': self.target_language,
+            'rules': RuleConverter.VERSION,
+            'shapes': MethodShape.VERSION,
+            'models': self.router.settings(),
+            'system': LLMConverter.SYSTEM_PROMPT,
+            'templates': [
+                LLMConverter.PROMPT_TEMPLATE,
+                LLMConverter.METHOD_PROMPT_TEMPLATE,
+                LLMConverter.SKELETON_PROMPT_TEMPLATE,
+                LLMConverter.HELPER_PROMPT_TEMPLATE,
+                LLMConverter.REPAIR_PROMPT_TEMPLATE,
+            ],
+            'options': [LLMConverter.OPTIONS, LLMConverter.CHUNK_OPTIONS],
+            'compaction': PromptCompactor.VERSION if self.converter.compactor else None,
+            'validation': CodeValidator.VERSION if self.validator else None,
+            'token_budget': LLMConverter.PROMPT_TOKEN_BUDGET,
+            'chunked': self.chunked,
+            'methods_per_chunk': self.methods_per_chunk,
+            'layout': 'mirror' if self.output.source_root else 'flat',
+        })
+    
+    def backends(self) -> List[Any]:
+        """The distinct LLM backends this converter's models run on."""
+        return list({id(llm.client): llm.client for llm in self.converters.values()}.values())
+    
+    def _write_output(self, converted_code: str, file_name: str, output_name: Optional[str] = None) -> str:
+        """Write converted code through the output writer; return its path."""
+        return self.output.write(converted_code, file_name, output_name or self._output_name(file_name))
+    
+    def _validate(self, converted_code: str, timer: StageTimer) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """
+        Add missing awaits and @playwright/test imports, then check the result.
+        
+        Returns:
+            (fixed code, {'valid': bool, 'errors': [...], 'fixed': [...]} or None without a validator)
+        """
+        if self.validator is None:
+            return converted_code, None
+        with timer.stage('validate'):
+            converted_code, fixed = self.validator.fix(converted_code)
+            errors = self.validator.check(converted_code)
+        return converted_code, {'valid': not errors, 'errors': errors, 'fixed': fixed}
+    
+    def _project_context(self, java_source: str, metadata: Dict[str, Any], file_name: str = '',
+                         output_name: Optional[str] = None) -> Dict[str, Any]:
+        """Converted helpers used by a file (empty without a project index), imported relative to its output."""
+        if self.project is None:
+            return {'prompt': '', 'imports': {}, 'classes': [], 'base_test': False}
+        return self.project.context_for(
+            java_source, [c['name'] for c in metadata.get('classes', [])],
+            self.output.path_for(file_name, output_name or self._output_name(file_name))
+        )
+    
+    def _strategy(self, metadata: Dict[str, Any], java_source: str, plan: Optional[Dict[str, Any]],
+                  context: Dict[str, Any]) -> str:
+        """
+        How a parsed file is converted: 'rules' (mapping table only), 'hybrid'
+        (rules plus one prompt per unmapped method), 'chunked' or 'llm' (whole file).
+        """
+        if plan and plan['mappable'] and not context['base_test']:
+            return 'hybrid' if any(block['code'] is None for block in plan['blocks']) else 'rules'
+        if self._use_chunks(metadata, java_source):
+            return 'chunked'
+        return 'llm'
+    
+    def _llm_for(self, metadata: Dict[str, Any], java_source: str) -> LLMConverter:
+        """The converter of the model tier the router picks for a file."""
+        if len(self.converters) == 1:
+            return self.converter
+        return self.converters[self.router.route(metadata, self.converter.source_tokens(java_source))]
+    
+    def _helper_extension(self) -> str:
+        return '.ts' if self.target_language == 'typescript' else '.js'
+    
+    def _output_name(self, file_name: str) -> str:
+        """Output file name for a Java file name."""
+        if file_name:
+            base_name = Path(file_name).stem
+            # Convert CamelCase to kebab-case
+            return self._camel_to_kebab(base_name) + self.extension
+        return 'converted' + self.extension
+    
+    def _unique_output_names(self, file_names: List[str]) -> List[str]:
+        """Output names for a batch, numbering repeats: login-test.spec.ts, login-test-2.spec.ts, ..."""
+        seen = set()
+        names = []
+        for file_name in file_names:
+            name = self._output_name(file_name)
+            stem = name[:-len(self.extension)]
+            number = 1
+            while name in seen:
+                number += 1
+                name = f'{stem}-{number}{self.extension}'
+            seen.add(name)
+            names.append(name)
+        return names
+    
+    def _use_chunks(self, metadata: Dict[str, Any], java_source: str = '') -> bool:
+        """
+        Decide whether a class is converted in method-level chunks: many
+        methods, or more source than fits the prompt token budget.
+        """
+        methods = metadata.get('methods', [])
+        if not methods or not all(method.get('body') for method in methods):
+            return False
+        if self.chunked is not None:
+            return self.chunked
+        return (len(methods) > LLMConverter.CHUNK_THRESHOLD
+                or self.converter.source_tokens(java_source) > LLMConverter.PROMPT_TOKEN_BUDGET)
+    
+    def _failure(self, java_source: str, error: str, timer: Optional[StageTimer] = None,
+                 strategy: Optional[str] = None, model: Optional[str] = None) -> Dict[str, Any]:
+        """Build the result dictionary for a failed conversion."""
+        result = {
+            'success': False,
+            'error': error,
+            'original_code': java_source,
+            'converted_code': '',
+            'output_file': ''
+        }
+        if timer is not None:
+            result.update(record_conversion(timer, strategy, False, model))
+        return result
     
     def _camel_to_kebab(self, name: str) -> str:
         """Convert CamelCase to kebab-case."""
@@ -110,6 +675,61 @@ class SeleniumToPlaywrightConverter:
         return ''.join(result)
 
 
+def _valid(validation: Optional[Dict[str, Any]]) -> bool:
+    return validation is None or validation['valid']
+
+
+def _validation_error(validation: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Error message for output that failed validation (None if it passed)."""
+    if _valid(validation):
+        return None
+    return 'Invalid output: ' + '; '.join(
+        f"line {error['line']}: {error['message']}" for error in validation['errors'][:3]
+    )
+
+
+def _outcome(validation: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Validation outcome for metrics: 'valid', 'fixed', 'invalid' (None when disabled)."""
+    if validation is None:
+        return None
+    if not validation['valid']:
+        return 'invalid'
+    return 'fixed' if validation['fixed'] else 'valid'
+
+
+def _without_payloads(result: Dict[str, Any]) -> Dict[str, Any]:
+    """A result without its source, generated code and metadata; the output file has them."""
+    for key in SeleniumToPlaywrightConverter.PAYLOAD_KEYS:
+        result.pop(key, None)
+    return result
+
+
+def _read_and_parse(file_path: str, target_language: str, parse_store: Optional[str] = None):
+    """Read, parse and rule-convert a Java file (runs in a worker process)."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        java_source = f.read()
+    
+    timer = StageTimer()
+    try:
+        metadata, plan = get_parse_cache(parse_store).parse(
+            java_source, file_path, RuleConverter(target_language), timer
+        )
+    except ValueError as e:
+        return java_source, None, None, timer.timings, f'Parse error: {e}'
+    return java_source, metadata, plan, timer.timings, None
+
+
+def _planned(result: Dict[str, Any]) -> str:
+    """One-line description of a dry run result."""
+    if not result['prompts']:
+        return f"{result['strategy']} (no LLM)"
+    return f"{result['strategy']} ({result['model']}, {result['prompts']} prompt{'s' if result['prompts'] > 1 else ''})"
+
+
+# --irrelevant choice -> what the summary says happened to irrelevant files
+IRRELEVANT_ACTIONS = {'skip': 'skipped', 'copy': 'copied', 'convert': 'converted'}
+
+
 def main():
     """CLI entry point."""
     import argparse
@@ -132,38 +752,291 @@ def main():
         default='typescript',
         help='Target language (default: typescript)'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Always call the LLM instead of reusing cached conversions'
+    )
+    parser.add_argument(
+        '--chunked',
+        action='store_true',
+        default=None,
+        help='Convert every class method by method (default: only classes '
+             f'with more than {LLMConverter.CHUNK_THRESHOLD} methods)'
+    )
+    parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=1,
+        help='Methods per prompt in chunked mode (default: 1)'
+    )
+    parser.add_argument(
+        '-j', '--jobs',
+        type=int,
+        default=1,
+        help='Number of files to convert in parallel (default: 1)'
+    )
+    parser.add_argument(
+        '--no-project-context',
+        action='store_true',
+        help='Convert every file in isolation instead of converting shared page '
+             'objects and base classes first (directories only)'
+    )
+    parser.add_argument(
+        '--no-validate',
+        action='store_true',
+        help='Write generated code without syntax checks, repairs or await/import fixes'
+    )
+    parser.add_argument(
+        '--backend',
+        help='LLM backend: ollama, ollama:<url>, openai:<url> (llama.cpp, vLLM, ...) '
+             'or stub (default: CONVERTER_LLM_BACKEND or ollama)'
+    )
+    parser.add_argument(
+        '--model',
+        help='Model for complex files and shared helpers (default: CONVERTER_MODEL or codellama)'
+    )
+    parser.add_argument(
+        '--small-model',
+        help='Faster model for simple files: few methods, few unmapped calls, '
+             'short source (default: CONVERTER_SMALL_MODEL; unset sends every file to --model)'
+    )
+    parser.add_argument(
+        '--small-backend',
+        help='Backend of --small-model (default: --backend)'
+    )
+    parser.add_argument(
+        '--include',
+        action='append',
+        metavar='GLOB',
+        help="Only convert files matching this glob, relative to the input directory, "
+             "e.g. 'src/test/**' (repeatable)"
+    )
+    parser.add_argument(
+        '--exclude',
+        action='append',
+        metavar='GLOB',
+        help="Skip files and directories matching this glob, e.g. '**/generated/**' "
+             "(repeatable; .git, node_modules, target and build are always skipped)"
+    )
+    parser.add_argument(
+        '--irrelevant',
+        choices=['skip', 'copy', 'convert'],
+        default='skip',
+        help='What to do with files that are neither tests, page objects nor helpers, i.e. '
+             'import no Selenium, Appium, TestNG or JUnit (default: skip; copy: copy them '
+             'unchanged into the output directory)'
+    )
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only convert files that changed since the last run and remove '
+             'outputs of deleted sources (directories only)'
+    )
+    parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Parse every file and report how it would be converted (strategy, model, '
+             'prompts) without calling the LLM or writing anything: no outputs, copies, '
+             'caches or manifest'
+    )
+    parser.add_argument(
+        '--flat',
+        action='store_true',
+        help='Write every output directly into the output directory instead of mirroring '
+             'the input tree (colliding names are numbered: login-test-2.spec.ts)'
+    )
+    parser.add_argument(
+        '--archive',
+        metavar='ZIP',
+        help="Write all outputs into one zip file instead of the output directory; "
+             "'-' streams it to stdout (progress goes to stderr)"
+    )
     
     args = parser.parse_args()
+    if args.archive and args.incremental:
+        parser.error('--incremental needs the output directory; it cannot be combined with --archive')
+    if args.archive == OutputWriter.STDOUT:
+        # Keep stdout for the archive bytes; everything printed goes to stderr
+        sys.stdout = sys.__stderr__
     
+    source_root = args.input if os.path.isdir(args.input) and not args.flat else None
+    writer = OutputWriter(args.output, source_root, args.archive)
     converter = SeleniumToPlaywrightConverter(
         target_language=args.language,
-        output_dir=args.output
+        output_dir=args.output,
+        # A dry run creates nothing under the output directory: no conversion
+        # cache, and parses are cached in memory only
+        use_cache=not args.no_cache and not args.dry_run,
+        chunked=args.chunked,
+        methods_per_chunk=args.chunk_size,
+        router=ModelRouter.from_env(args.model, args.backend, args.small_model, args.small_backend),
+        validate=not args.no_validate,
+        writer=writer
     )
+    try:
+        if not _run(args, converter):
+            return
+    finally:
+        writer.close()
     
+    if args.dry_run:
+        return
+    print(f"Output: {writer.written} files written, {writer.unchanged} unchanged"
+          + (f" (archive {args.archive})" if args.archive and args.archive != OutputWriter.STDOUT else ''))
+    if converter.cache is not None:
+        stats = converter.cache.stats()
+        print(f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['entries']} entries)")
+
+
+def _run(args, converter: SeleniumToPlaywrightConverter) -> bool:
+    """Convert the file or directory given on the command line; False if there is none."""
     if os.path.isfile(args.input):
         print(f"Converting: {args.input}")
-        result = converter.convert_file(args.input)
+        result = converter.convert_file(args.input, args.dry_run)
         
-        if result['success']:
-            print(f"Success! Output: {result['output_file']}")
-        else:
+        if not result['success']:
             print(f"Error: {result['error']}")
+        elif args.dry_run:
+            print(f"Dry run: {_planned(result)} -> {result['output_file']}")
+        else:
+            print(f"Success! Output: {result['output_file']}")
     
     elif os.path.isdir(args.input):
-        java_files = list(Path(args.input).glob('**/*.java'))
-        print(f"Found {len(java_files)} Java files")
+        def copy_through(path: str, category: str):
+            converter.output.copy(path)
         
-        for java_file in java_files:
-            print(f"Converting: {java_file}")
-            result = converter.convert_file(str(java_file))
-            
-            if result['success']:
-                print(f"  -> {result['output_file']}")
-            else:
-                print(f"  Error: {result['error']}")
+        exclude = list(args.exclude or [])
+        output_dir = os.path.relpath(args.output, args.input).replace(os.sep, '/')
+        if not output_dir.startswith('..'):
+            # Never pick up copied-through sources from a previous run
+            exclude.append(output_dir + '/**')
+        
+        walker = SourceWalker(
+            args.input, args.include, exclude,
+            skip=() if args.irrelevant == 'convert' else (SourceClassifier.IRRELEVANT,),
+            on_skip=copy_through if args.irrelevant == 'copy' and not args.dry_run else None
+        )
+        
+        manifest = None
+        if args.incremental and args.dry_run:
+            print("Dry run: the incremental manifest is not read, every file is reported")
+        elif args.incremental:
+            manifest = ConversionManifest(args.output, args.input, converter.settings_fingerprint())
+        
+        # The tree is walked (files classified, irrelevant ones copied) once. Pruning
+        # and the project index need every path before the first conversion, so
+        # then the paths are kept; otherwise they stream into the conversions.
+        java_files: Iterable[str] = walker
+        if manifest is not None or not args.no_project_context:
+            java_files = list(walker)
+        if manifest is not None:
+            for removed in manifest.prune(java_files):
+                print(f"Removed stale output: {removed}")
+            # Outputs keep the names earlier runs gave them: skipped, unchanged files
+            # are never claimed again, and a changed file must not take their names
+            for source, output in manifest.outputs():
+                converter.output.reserve(output, source)
+        # LLM prompts a dry run would send, by strategy
+        prompts = 0
+        strategies: Dict[str, int] = {}
+        if not args.no_project_context:
+            project = converter.index_project(java_files, min(args.jobs, os.cpu_count() or 1))
+            helpers = [path for level in project.helpers() for path in level]
+            if helpers:
+                print(f"Converting {len(helpers)} shared page objects and base classes first")
+            # Helpers are always regenerated (cheap with the cache): tests depend on their signatures
+            for finished, (path, result) in enumerate(converter.convert_helpers(args.jobs, dry_run=args.dry_run), 1):
+                if result['success'] and args.dry_run:
+                    print(f"[helper {finished}/{len(helpers)}] {path}: {_planned(result)}")
+                    prompts += result['prompts']
+                elif result['success']:
+                    print(f"[helper {finished}/{len(helpers)}] {path} -> {result['output_file']}")
+                    if manifest is not None:
+                        manifest.record(path, ConversionManifest.hash_file(path), result['output_file'])
+                else:
+                    print(f"[helper {finished}/{len(helpers)}] {path} Error: {result['error']}")
+            java_files = (path for path in java_files if not project.is_helper(path))
+        
+        # Hashes of files queued for conversion, until their result is recorded
+        hashes: Dict[str, str] = {}
+        unchanged = 0
+        
+        def changed(paths: Iterable[str]) -> Iterator[str]:
+            nonlocal unchanged
+            for path in paths:
+                source_hash = ConversionManifest.hash_file(path)
+                if converter.project is not None:
+                    # A test is stale when the helpers it uses changed, too
+                    with open(path, 'r', encoding='utf-8') as f:
+                        context = converter.project.context_for(f.read())['prompt']
+                    source_hash = settings_fingerprint({'source': source_hash, 'context': context})
+                if manifest.is_current(path, source_hash):
+                    unchanged += 1
+                else:
+                    hashes[path] = source_hash
+                    yield path
+        
+        if manifest is not None:
+            java_files = changed(java_files)
+        
+        # Only paths in flight and failures are kept, never whole results
+        in_flight: Dict[int, str] = {}
+        
+        def queued(paths: Iterable[str]) -> Iterator[str]:
+            for index, path in enumerate(paths):
+                in_flight[index] = path
+                yield path
+        
+        finished, failures = 0, []
+        try:
+            for index, result in converter.convert_files(queued(java_files), args.jobs, keep_payloads=False,
+                                                         dry_run=args.dry_run):
+                java_file = in_flight.pop(index)
+                finished += 1
+                if not result['success']:
+                    print(f"[{finished}] {java_file} Error: {result['error']}")
+                    failures.append((java_file, result['error']))
+                elif args.dry_run:
+                    print(f"[{finished}] {java_file}: {_planned(result)}")
+                    prompts += result['prompts']
+                    strategies[result['strategy']] = strategies.get(result['strategy'], 0) + 1
+                else:
+                    print(f"[{finished}] {java_file} -> {result['output_file']}")
+                
+                if manifest is not None:
+                    if result['success']:
+                        manifest.record(java_file, hashes.pop(java_file), result['output_file'])
+                    else:
+                        hashes.pop(java_file)
+                        manifest.forget(java_file)
+        finally:
+            if manifest is not None:
+                manifest.save()
+        
+        stats = walker.stats
+        irrelevant = IRRELEVANT_ACTIONS[args.irrelevant]
+        if args.dry_run and args.irrelevant != 'convert':
+            irrelevant = f'would be {irrelevant}'
+        print(f"\nFound {stats['found']} Java files: {stats['excluded']} excluded by globs, "
+              f"{stats['test']} tests, {stats['page_object']} page objects, {stats['helper']} helpers, "
+              f"{stats['irrelevant']} irrelevant ({irrelevant})")
+        if manifest is not None:
+            print(f"Incremental: {unchanged} unchanged")
+        if args.dry_run:
+            by_strategy = ', '.join(f"{count} {strategy}" for strategy, count in sorted(strategies.items()))
+            print(f"Dry run: {finished - len(failures)}/{finished} parsed ({by_strategy or 'none'}); "
+                  f"{prompts} LLM prompts before cache hits")
+        else:
+            print(f"Summary: {finished - len(failures)}/{finished} converted")
+        for java_file, error in failures:
+            print(f"  FAIL {java_file}: {error}")
     
     else:
         print(f"Error: {args.input} is not a valid file or directory")
+        return False
+    return True
 
 
 if __name__ == '__main__':
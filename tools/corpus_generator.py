@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+Tool: Corpus Generator
+Generates synthetic, realistic Selenium/TestNG sources for benchmarks.
+Layer 3: Deterministic Tool
+"""
+
+import os
+import random
+from typing import Dict, List
+
+
+LOCATOR_KINDS = ['id', 'name', 'className', 'cssSelector', 'xpath', 'linkText']
+
+WORDS = ['login', 'user', 'password', 'submit', 'cart', 'item', 'search', 'result',
+         'checkout', 'address', 'email', 'profile', 'menu', 'order', 'price', 'filter']
+
+
+class CorpusGenerator:
+    """
+    Deterministic (seeded) generator of Selenium test classes and page objects.
+    Tests mix constructs the rule converter maps with ones that need the LLM
+    (explicit waits, loops, page object calls), in a configurable ratio.
+    """
+
+    def __init__(self, seed: int = 0, methods: int = 6, steps: int = 8, llm_ratio: float = 0.3):
+        """
+        Args:
+            seed: Random seed; the same seed yields the same corpus
+            methods: @Test methods per test class
+            steps: Statements per test method
+            llm_ratio: Fraction of statements using constructs the rules do not map
+        """
+        self.random = random.Random(seed)
+        self.methods = methods
+        self.steps = steps
+        self.llm_ratio = llm_ratio
+        self.variables = 0
+
+    def test_class(self, name: str, page_object: str = '') -> str:
+        """Java source of a TestNG test class, optionally driving a page object."""
+        imports = [
+            'org.openqa.selenium.By',
+            'org.openqa.selenium.WebDriver',
+            'org.openqa.selenium.WebElement',
+            'org.openqa.selenium.chrome.ChromeDriver',
+            'org.openqa.selenium.support.ui.ExpectedConditions',
+            'org.openqa.selenium.support.ui.WebDriverWait',
+            'org.testng.Assert',
+            'org.testng.annotations.*',
+            'java.time.Duration',
+        ]
+        if page_object:
+            imports.append(f'com.example.pages.{page_object}')
+
+        methods = [
+            '    @BeforeMethod\n'
+            '    public void setUp() {\n'
+            '        driver = new ChromeDriver();\n'
+            f'        driver.get("https://{self._word()}.example.com/{self._word()}");\n'
+            '    }'
+        ]
+        for index in range(self.methods):
+            description = f'{self._word().capitalize()} {self._word()} scenario {index}'
+            body = '\n'.join(f'        {line}' for line in self._steps(page_object))
+            methods.append(
+                f'    @Test(description = "{description}", priority = {index})\n'
+                f'    public void test{self._word().capitalize()}{index}() {{\n'
+                f'{body}\n'
+                '    }'
+            )
+        methods.append(
+            '    @AfterMethod\n'
+            '    public void tearDown() {\n'
+            '        driver.quit();\n'
+            '    }'
+        )
+
+        fields = ['    private WebDriver driver;']
+        return (
+            'package com.example.tests;\n\n'
+            + ''.join(f'import {path};\n' for path in imports)
+            + f'\npublic class {name} {{\n'
+            + '\n'.join(fields) + '\n\n'
+            + '\n\n'.join(methods)
+            + '\n}\n'
+        )
+
+    def page_object(self, name: str, elements: int = 6) -> str:
+        """Java source of a PageFactory page object."""
+        names = [f'{self._word()}{index}' for index in range(elements)]
+        fields = []
+        for element in names:
+            kind, value = self._locator()
+            kind = 'css' if kind == 'cssSelector' else kind
+            fields.append(f'    @FindBy({kind} = "{value}")\n    private WebElement {element};')
+
+        actions = []
+        for element in names:
+            title = element[0].upper() + element[1:]
+            actions.append(
+                f'    public {name} type{title}(String text) {{\n'
+                f'        {element}.clear();\n'
+                f'        {element}.sendKeys(text);\n'
+                '        return this;\n'
+                '    }'
+            )
+            actions.append(
+                f'    public void click{title}() {{\n'
+                f'        wait.until(ExpectedConditions.elementToBeClickable({element})).click();\n'
+                '    }'
+            )
+
+        return (
+            'package com.example.pages;\n\n'
+            'import org.openqa.selenium.WebDriver;\n'
+            'import org.openqa.selenium.WebElement;\n'
+            'import org.openqa.selenium.support.FindBy;\n'
+            'import org.openqa.selenium.support.PageFactory;\n'
+            'import org.openqa.selenium.support.ui.ExpectedConditions;\n'
+            'import org.openqa.selenium.support.ui.WebDriverWait;\n'
+            'import java.time.Duration;\n\n'
+            f'public class {name} {{\n'
+            '    private final WebDriver driver;\n'
+            '    private final WebDriverWait wait;\n\n'
+            + '\n\n'.join(fields) + '\n\n'
+            f'    public {name}(WebDriver driver) {{\n'
+            '        this.driver = driver;\n'
+            '        this.wait = new WebDriverWait(driver, Duration.ofSeconds(10));\n'
+            '        PageFactory.initElements(driver, this);\n'
+            '    }\n\n'
+            + '\n\n'.join(actions)
+            + '\n}\n'
+        )
+
+    def corpus(self, files: int, page_objects: int = 0) -> Dict[str, str]:
+        """
+        Relative path -> Java source for a whole suite.
+
+        Args:
+            files: Number of test classes
+            page_objects: Number of page objects the tests are spread over
+        """
+        sources = {}
+        pages = [f'{self._word().capitalize()}Page{index}' for index in range(page_objects)]
+        for page in pages:
+            sources[f'pages/{page}.java'] = self.page_object(page)
+        for index in range(files):
+            name = f'{self._word().capitalize()}{index}Test'
+            page = pages[index % len(pages)] if pages else ''
+            sources[f'tests/{name}.java'] = self.test_class(name, page)
+        return sources
+
+    def write(self, output_dir: str, files: int, page_objects: int = 0) -> List[str]:
+        """Write a corpus to disk; return the written paths."""
+        paths = []
+        for relative, source in self.corpus(files, page_objects).items():
+            path = os.path.join(output_dir, relative)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(source)
+            paths.append(path)
+        return paths
+
+    def _steps(self, page_object: str) -> List[str]:
+        lines = []
+        while len(lines) < self.steps:
+            if self.random.random() < self.llm_ratio:
+                lines.extend(self._unmapped_step(page_object))
+            else:
+                lines.extend(self._mapped_step())
+        return lines
+
+    def _mapped_step(self) -> List[str]:
+        kind, value = self._locator()
+        element = f'driver.findElement(By.{kind}("{value}"))'
+        choice = self.random.randrange(5)
+        if choice == 0:
+            return [f'{element}.sendKeys("{self._word()}");']
+        if choice == 1:
+            return [f'{element}.click();']
+        if choice == 2:
+            self.variables += 1
+            variable = f'{self._word()}Text{self.variables}'
+            return [
+                f'String {variable} = {element}.getText();',
+                f'Assert.assertEquals({variable}, "{self._word().capitalize()}");',
+            ]
+        if choice == 3:
+            inner_kind, inner_value = self._locator()
+            return [f'{element}.findElement(By.{inner_kind}("{inner_value}")).click();']
+        return [f'Assert.assertTrue({element}.isDisplayed());']
+
+    def _unmapped_step(self, page_object: str) -> List[str]:
+        kind, value = self._locator()
+        choice = self.random.randrange(3 if page_object else 2)
+        if choice == 0:
+            return [
+                'new WebDriverWait(driver, Duration.ofSeconds(10))',
+                f'    .until(ExpectedConditions.visibilityOfElementLocated(By.{kind}("{value}")));',
+            ]
+        if choice == 1:
+            return [
+                f'for (WebElement row : driver.findElements(By.{kind}("{value}"))) {{',
+                '    Assert.assertFalse(row.getText().isEmpty());',
+                '}',
+            ]
+        element = f'{self._word()}0'
+        title = element[0].upper() + element[1:]
+        return [f'new {page_object}(driver).type{title}("{self._word()}");']
+
+    def _locator(self):
+        kind = self.random.choice(LOCATOR_KINDS)
+        word = self._word()
+        if kind == 'cssSelector':
+            return kind, f'.{word} > [data-test=\'{self._word()}\']'
+        if kind == 'xpath':
+            return kind, f'//div[@class=\'{word}\']//button'
+        if kind == 'linkText':
+            return kind, word.capitalize()
+        return kind, f'{word}-{self.random.randrange(100)}'
+
+    def _word(self) -> str:
+        return self.random.choice(WORDS)
+
+
+def main():
+    """CLI entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate a synthetic Selenium/TestNG corpus')
+    parser.add_argument('output', help='Directory to write the corpus to')
+    parser.add_argument('-n', '--files', type=int, default=50, help='Test classes (default: 50)')
+    parser.add_argument('--page-objects', type=int, default=5, help='Page objects (default: 5)')
+    parser.add_argument('--methods', type=int, default=6, help='@Test methods per class (default: 6)')
+    parser.add_argument('--steps', type=int, default=8, help='Statements per method (default: 8)')
+    parser.add_argument('--llm-ratio', type=float, default=0.3,
+                        help='Fraction of statements the rules cannot map (default: 0.3)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+
+    generator = CorpusGenerator(args.seed, args.methods, args.steps, args.llm_ratio)
+    paths = generator.write(args.output, args.files, args.page_objects)
+    print(f"Wrote {len(paths)} files to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -7,12 +7,18 @@ Layer 3: Deterministic Tool
 
 import javalang
 import json
-from typing import Dict, List, Any
+import textwrap
+from bisect import bisect_left
+from itertools import islice
+from typing import Dict, Any, Tuple
 
 
 class JavaParser:
     """Parse Java source and extract Selenium/TestNG patterns."""
     
+    # Bump when the metadata changes, so cached parses (tools/parse_cache.py) are redone
+    VERSION = 1
+    
     SELENIUM_IMPORTS = [
         'org.openqa.selenium',
         'org.openqa.selenium.chrome',
@@ -24,15 +30,35 @@ class JavaParser:
     
     TESTNG_ANNOTATIONS = ['Test', 'BeforeMethod', 'AfterMethod', 'BeforeClass', 'AfterClass', 'DataProvider']
     
+    CLASS_TYPES = {
+        javalang.tree.ClassDeclaration: 'class',
+        javalang.tree.InterfaceDeclaration: 'interface',
+        javalang.tree.EnumDeclaration: 'enum',
+    }
+    
+    # Nodes that declare a name inside a method (variables, parameters)
+    DECLARATION_TYPES = {
+        javalang.tree.VariableDeclarator,
+        javalang.tree.FormalParameter,
+        javalang.tree.InferredFormalParameter,
+        javalang.tree.CatchClauseParameter,
+    }
+    
     def __init__(self, source_code: str, file_name: str = ""):
         self.source_code = source_code
         self.file_name = file_name
         self.tree = None
+        self.tokens = []
+        self._lines = []
+        self._braces = []
+        self._brace_positions = []
         self.metadata = {
             'file_name': file_name,
             'class_name': '',
             'imports': [],
             'selenium_imports': [],
+            'classes': [],
+            'fields': [],
             'methods': [],
             'is_testng': False
         }
@@ -40,102 +66,184 @@ class JavaParser:
     def parse(self) -> Dict[str, Any]:
         """Parse Java source and return metadata."""
         try:
-            self.tree = javalang.parse.parse(self.source_code)
+            self.tokens = list(javalang.tokenizer.tokenize(self.source_code))
+            self.tree = javalang.parser.Parser(self.tokens).parse()
+            self._lines = self.source_code.splitlines()
+            self._braces = [
+                token for token in self.tokens
+                if isinstance(token, javalang.tokenizer.Separator) and token.value in '{};'
+            ]
+            self._brace_positions = [token.position for token in self._braces]
         except javalang.parser.JavaSyntaxError as e:
             raise ValueError(f"Java syntax error: {e}")
+        except javalang.tokenizer.LexerError as e:
+            raise ValueError(f"Java lexer error: {e}")
         
-        self._extract_imports()
-        self._extract_classes()
+        self._visit(self.tree)
+        self.metadata['class_name'] = self._main_class_name()
         return self.metadata
     
-    def _extract_imports(self):
-        """Extract import statements."""
-        for _, node in self.tree.filter(javalang.tree.Import):
-            import_path = node.path
-            self.metadata['imports'].append(import_path)
-            
-            # Check if it's a Selenium import
-            for sel_import in self.SELENIUM_IMPORTS:
-                if import_path.startswith(sel_import):
-                    self.metadata['selenium_imports'].append(import_path)
+    def _visit(self, root):
+        """
+        Collect imports, classes, fields, methods and invocations in a single
+        pre-order traversal of the tree.
+        """
+        # Stack of (node, enclosing class name, enclosing method info)
+        stack = [(root, '', None)]
+        while stack:
+            node, class_name, method_info = stack.pop()
+            node_type = type(node)
             
-            # Check if it's TestNG
-            if 'org.testng' in import_path:
-                self.metadata['is_testng'] = True
-    
-    def _extract_classes(self):
-        """Extract class and method information."""
-        for _, node in self.tree.filter(javalang.tree.ClassDeclaration):
-            self.metadata['class_name'] = node.name
+            if node_type is javalang.tree.Import:
+                self._add_import(node.path)
+                continue
             
-            for method in node.methods:
-                method_info = self._extract_method(method)
+            if node_type in self.CLASS_TYPES:
+                self._add_class(node, class_name)
+                class_name, method_info = node.name, None
+            elif node_type is javalang.tree.FieldDeclaration and method_info is None:
+                self._add_fields(node, class_name)
+            elif node_type is javalang.tree.MethodDeclaration and method_info is None:
+                method_info = self._extract_method(node)
+                method_info['class'] = class_name
                 self.metadata['methods'].append(method_info)
+            elif node_type is javalang.tree.MethodInvocation and method_info is not None:
+                method_info['selenium_calls'].append(self._extract_call(node))
+            elif node_type in self.DECLARATION_TYPES and method_info is not None:
+                if node.name not in method_info['locals']:
+                    method_info['locals'].append(node.name)
+            
+            children = []
+            for child in node.children:
+                if isinstance(child, javalang.ast.Node):
+                    children.append((child, class_name, method_info))
+                elif isinstance(child, list):
+                    for item in child:
+                        if isinstance(item, javalang.ast.Node):
+                            children.append((item, class_name, method_info))
+            stack.extend(reversed(children))
+    
+    def _add_import(self, import_path: str):
+        """Record an import statement."""
+        self.metadata['imports'].append(import_path)
+        
+        # Check if it's a Selenium import
+        if any(import_path.startswith(sel_import) for sel_import in self.SELENIUM_IMPORTS):
+            self.metadata['selenium_imports'].append(import_path)
+        
+        # Check if it's TestNG
+        if 'org.testng' in import_path:
+            self.metadata['is_testng'] = True
+    
+    def _add_class(self, node, outer: str):
+        """Record a class, interface or enum declaration."""
+        extends = getattr(node, 'extends', None)
+        if isinstance(extends, list):
+            extends = extends[0] if extends else None
+        
+        self.metadata['classes'].append({
+            'name': node.name,
+            'kind': self.CLASS_TYPES[type(node)],
+            'outer': outer,
+            'extends': extends.name if extends is not None else '',
+            'implements': [ref.name for ref in getattr(node, 'implements', None) or []],
+            'annotations': [self._annotation_name(a) for a in node.annotations or []],
+            'line_number': node.position.line if node.position else 0
+        })
+    
+    def _add_fields(self, node, class_name: str):
+        """Record a field declaration (one entry per declared variable)."""
+        annotations = [self._annotation_name(a) for a in node.annotations or []]
+        for declarator in node.declarators:
+            self.metadata['fields'].append({
+                'name': declarator.name,
+                'type': node.type.name,
+                'annotations': annotations,
+                'class': class_name,
+                'line_number': node.position.line if node.position else 0
+            })
+    
+    def _main_class_name(self) -> str:
+        """The top-level class named after the file, else the first top-level class."""
+        top_level = [c['name'] for c in self.metadata['classes'] if not c['outer']]
+        stem = self.file_name.replace('\\', '/').rsplit('/', 1)[-1].rsplit('.', 1)[0]
+        if stem in top_level:
+            return stem
+        return top_level[0] if top_level else ''
     
     def _extract_method(self, method) -> Dict[str, Any]:
-        """Extract method details including annotations and Selenium calls."""
+        """Extract method details; Selenium calls are added by the visitor."""
         method_info = {
             'name': method.name,
             'annotations': [],
             'selenium_calls': [],
-            'body': ''
+            # Names the method declares: itself, parameters, locals (added by the visitor)
+            'locals': [method.name],
+            'body': '',
+            'line_number': 0,
+            'end_line': 0
         }
         
         # Extract annotations
         if method.annotations:
             for annotation in method.annotations:
                 if isinstance(annotation, javalang.tree.Annotation):
-                    name = annotation.name
-                    if isinstance(name, list):
-                        name = '.'.join(name)
-                    method_info['annotations'].append(name)
+                    method_info['annotations'].append(self._annotation_name(annotation))
         
         # Extract method body as string
-        if method.body:
-            for statement in method.body:
-                self._extract_selenium_calls(statement, method_info['selenium_calls'])
+        method_info['line_number'], method_info['end_line'], method_info['body'] = self._method_source(method)
         
         return method_info
     
-    def _extract_selenium_calls(self, statement, calls_list: List[Dict]):
-        """Recursively extract Selenium method invocations."""
-        if statement is None:
-            return
+    def _extract_call(self, node) -> Dict[str, Any]:
+        """Extract a method invocation."""
+        return {
+            'method': node.member,
+            'arguments': [self._node_to_string(arg) for arg in node.arguments or []],
+            'qualifier': node.qualifier,
+            'line_number': node.position.line if node.position else 0
+        }
+    
+    @staticmethod
+    def _annotation_name(annotation) -> str:
+        name = annotation.name
+        if isinstance(name, list):
+            name = '.'.join(name)
+        return name
+    
+    def _method_source(self, method) -> Tuple[int, int, str]:
+        """Slice the full method declaration (annotations to closing brace) out of the source."""
+        if method.position is None:
+            return 0, 0, ''
         
-        # Skip non-node types
-        if isinstance(statement, str):
-            return
+        start = method.position
+        for annotation in method.annotations or []:
+            if annotation.position and annotation.position < start:
+                start = annotation.position
         
-        # Check if this is a method invocation
-        if isinstance(statement, javalang.tree.MethodInvocation):
-            call_info = {
-                'method': statement.member,
-                'arguments': [],
-                'qualifier': statement.qualifier
-            }
-            
-            # Extract arguments
-            if statement.arguments:
-                for arg in statement.arguments:
-                    call_info['arguments'].append(self._node_to_string(arg))
-            
-            calls_list.append(call_info)
-            
-            # Check for chained calls (e.g., driver.findElement().click())
-            if statement.selectors:
-                for selector in statement.selectors:
-                    self._extract_selenium_calls(selector, calls_list)
+        # Find the first '{' or ';' after the signature, then its matching '}'
+        index = bisect_left(self._brace_positions, method.position)
+        depth = 0
+        end = None
+        for token in islice(self._braces, index, None):
+            if token.value == ';':
+                if depth == 0:
+                    end = token.position
+                    break
+            elif token.value == '{':
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    end = token.position
+                    break
         
-        # Recursively check children
-        if hasattr(statement, 'children'):
-            for child in statement.children:
-                if isinstance(child, list):
-                    for item in child:
-                        self._extract_selenium_calls(item, calls_list)
-                elif isinstance(child, str):
-                    continue
-                elif child is not None:
-                    self._extract_selenium_calls(child, calls_list)
+        if end is None:
+            return 0, 0, ''
+        
+        snippet = self._lines[start.line - 1:end.line]
+        snippet[-1] = snippet[-1][:end.column]
+        return start.line, end.line, textwrap.dedent('\n'.join(snippet))
     
     def _node_to_string(self, node) -> str:
         """Convert AST node to string representation."""
@@ -148,6 +256,14 @@ class JavaParser:
             left = self._node_to_string(node.operandl)
             right = self._node_to_string(node.operandr)
             return f"{left} {node.operator} {right}"
+        elif isinstance(node, javalang.tree.MethodInvocation):
+            qualifier = f"{node.qualifier}." if node.qualifier else ""
+            arguments = ', '.join(self._node_to_string(arg) for arg in node.arguments or [])
+            chained = ''.join(f".{self._node_to_string(sel)}" for sel in node.selectors or [])
+            return f"{qualifier}{node.member}({arguments}){chained}"
+        elif isinstance(node, javalang.tree.ClassCreator):
+            arguments = ', '.join(self._node_to_string(arg) for arg in node.arguments or [])
+            return f"new {node.type.name}({arguments})"
         else:
             return str(node)
 
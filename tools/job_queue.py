@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Tool: Job Queue
+In-process worker pool for bulk conversions submitted through the web API.
+Layer 3: Deterministic Tool
+"""
+
+import io
+import os
+import queue
+import threading
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+from tools.llm_scheduler import llm_caller
+
+
+class QueueFull(Exception):
+    """Raised when the job queue cannot accept more work."""
+
+
+class ConversionJob:
+    """A bulk conversion of several Java sources."""
+
+    def __init__(self, files: List[Tuple[str, str]], target_language: str, output_dir: str):
+        self.id = uuid.uuid4().hex
+        self.files = files
+        self.target_language = target_language
+        self.output_dir = os.path.join(output_dir, self.id)
+        self.status = 'queued'
+        self.error = None
+        self.results: List[Dict[str, Any]] = []
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self._changed = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('done', 'failed')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable job status."""
+        with self._changed:
+            return {
+                'id': self.id,
+                'status': self.status,
+                'error': self.error,
+                'language': self.target_language,
+                'total': len(self.files),
+                'completed': len(self.results),
+                'succeeded': sum(1 for result in self.results if result['success']),
+                'results': list(self.results),
+                'created_at': self.created_at,
+                'started_at': self.started_at,
+                'finished_at': self.finished_at,
+            }
+
+    def wait_for_progress(self, completed: int, timeout: float = 15.0) -> bool:
+        """
+        Block until more than `completed` files are done or the job finishes.
+
+        Returns:
+            False if the timeout expired without progress
+        """
+        with self._changed:
+            return self._changed.wait_for(
+                lambda: len(self.results) > completed or self.finished, timeout
+            )
+
+    def archive(self) -> bytes:
+        """Zip archive of all converted files."""
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for result in self.to_dict()['results']:
+                if result['success'] and os.path.exists(result['output_file']):
+                    archive.write(
+                        result['output_file'],
+                        os.path.relpath(result['output_file'], self.output_dir)
+                    )
+        return buffer.getvalue()
+
+    def _update(self, **changes):
+        with self._changed:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self._changed.notify_all()
+
+    def _add_result(self, result: Dict[str, Any]):
+        with self._changed:
+            self.results.append(result)
+            self._changed.notify_all()
+
+
+class JobQueue:
+    """
+    Bounded queue of conversion jobs served by a fixed number of worker threads.
+    Submitting to a full queue raises QueueFull instead of blocking, so the
+    web layer can answer 429 and the client can back off.
+    """
+
+    def __init__(self, converter_factory: Callable[[str, str], Any], output_dir: str = 'output/jobs',
+                 workers: int = 2, max_queued: int = 16, max_finished: int = 100):
+        """
+        Args:
+            converter_factory: Builds a converter for (target_language, output_dir)
+            output_dir: Directory under which each job gets its own folder
+            workers: Number of jobs converted concurrently
+            max_queued: Jobs that may wait for a worker before submit() fails
+            max_finished: Finished jobs kept for status queries and downloads
+        """
+        self.converter_factory = converter_factory
+        self.output_dir = output_dir
+        self.max_finished = max_finished
+        self.jobs: 'OrderedDict[str, ConversionJob]' = OrderedDict()
+        self._queue: 'queue.Queue[Optional[ConversionJob]]' = queue.Queue(maxsize=max_queued)
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._work, name=f'conversion-worker-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def submit(self, files: List[Tuple[str, str]], target_language: str = 'typescript') -> ConversionJob:
+        """
+        Queue a bulk conversion.
+
+        Args:
+            files: (file name, Java source) pairs
+            target_language: 'typescript' or 'javascript'
+
+        Returns:
+            The queued job
+        """
+        job = ConversionJob(files, target_language, self.output_dir)
+        with self._lock:
+            self.jobs[job.id] = job
+            self._forget_finished()
+
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self.jobs[job.id]
+            raise QueueFull(f'Job queue is full ({self._queue.maxsize} jobs waiting)')
+        return job
+
+    def get(self, job_id: str) -> Optional[ConversionJob]:
+        """Look up a job by id."""
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None) -> bool:
+        """
+        Stop the workers once the queued jobs are drained.
+
+        Args:
+            wait: Block until the workers have finished
+            timeout: Most seconds to wait (None: no limit)
+
+        Returns:
+            False if workers were still converting when the timeout expired
+        """
+        for _ in self._workers:
+            self._queue.put(None)
+        if not wait:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in self._workers:
+            worker.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+        return not any(worker.is_alive() for worker in self._workers)
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            self._run(job)
+
+    def _run(self, job: ConversionJob):
+        job._update(status='running', started_at=time.time())
+        try:
+            converter = self.converter_factory(job.target_language, job.output_dir)
+            for file_name, java_source in job.files:
+                # Each job is a caller of its own: it takes turns with web users for LLM slots
+                with llm_caller(f'job:{job.id}'):
+                    result = converter.convert(java_source, file_name)
+                job._add_result({
+                    'file': file_name,
+                    'success': result['success'],
+                    'error': result['error'],
+                    'output_file': result['output_file'],
+                    'timings': result.get('timings', {}),
+                })
+            job._update(status='done', finished_at=time.time())
+        except Exception as e:
+            job._update(status='failed', error=str(e), finished_at=time.time())
+
+    def _forget_finished(self):
+        """Drop the oldest finished jobs beyond max_finished."""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
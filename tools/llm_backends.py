@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Tool: LLM Backends
+Interchangeable text-generation backends behind one interface: Ollama
+(tools/ollama_client.py), OpenAI-compatible servers such as llama.cpp or
+vLLM, and an offline stub. All of them bound concurrent generations, apply
+timeouts, retry transient failures and cache health checks.
+Layer 3: Deterministic Tool
+"""
+
+import abc
+import json
+import random
+import threading
+import time
+from typing import Dict, Any, Iterator, Optional
+
+from tools.llm_scheduler import GenerationScheduler, llm_caller
+
+
+class BackendUnavailable(RuntimeError):
+    """Raised when no generation slot frees up in time or retries are exhausted."""
+
+
+class LLMBackend(abc.ABC):
+    """
+    Base class of every backend. Generations beyond max_concurrency wait for
+    a slot instead of queueing inside the server, where they would only time out;
+    a GenerationScheduler decides which waiting generation goes next.
+
+    Responses and stream chunks use Ollama's field names, which LLMConverter
+    and StageTimer read: 'response', 'done', 'prompt_eval_count',
+    'eval_count' and, where the server reports them, the '*_duration' fields.
+
+    Subclasses implement _generate, _stream and _ping, and _is_transient for
+    the errors worth retrying.
+    """
+
+    # Spec name used by tools.model_router.get_backend
+    NAME = ''
+
+    # Caller warm() generations are scheduled for (see tools.llm_scheduler)
+    WARMUP_CALLER = 'warmup'
+
+    def __init__(self, max_concurrency: int = 2, timeout: float = 300.0,
+                 retries: int = 2, backoff: float = 1.0, health_ttl: float = 10.0,
+                 gather_window: float = 0.0):
+        """
+        Args:
+            max_concurrency: Generations in flight at once; match the server's parallelism
+            timeout: Seconds a generation may take, and may wait for a slot
+            retries: Extra attempts after a transient failure
+            backoff: Base delay in seconds, doubled per attempt, with full jitter
+            health_ttl: Seconds a health check result is reused
+            gather_window: Seconds a burst of generations is gathered before the
+                first is dispatched (see GenerationScheduler)
+        """
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.health_ttl = health_ttl
+
+        self.scheduler = GenerationScheduler(max_concurrency, gather_window)
+        self.last_used = time.monotonic()
+        self._lock = threading.Lock()
+        self._health: Optional[Dict[str, Any]] = None
+        # Held while pinging, so an expired health result is refreshed by one thread only
+        self._probe_lock = threading.Lock()
+
+    def generate(self, **kwargs: Any) -> Dict[str, Any]:
+        """
+        Non-streaming generation with retries.
+
+        Args:
+            **kwargs: model, prompt, system and options (Ollama option names)
+
+        Returns:
+            The response, with Ollama's field names
+        """
+        with self._slot(kwargs):
+            return self._with_retries(lambda: self._generate(kwargs))
+
+    def generate_stream(self, **kwargs: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming generation. Connecting is retried; once the first chunk has
+        arrived a failure is raised, since the caller has already used the output.
+
+        Yields:
+            Response chunks, with Ollama's field names
+        """
+        with self._slot(kwargs):
+            stream = self._with_retries(lambda: self._first_chunk(kwargs))
+            yield from stream
+
+    def warm(self, model: str, system: str = '', prompt: str = '') -> float:
+        """
+        Load a model and prefill a prompt prefix: a one-token generation, so
+        that a cold load happens here instead of in a user's request, and a
+        server with a prefix cache keeps the prefix's KV entries.
+
+        Args:
+            model: Model to load
+            system: System prompt of the requests to come
+            prompt: Static head of their prompts
+
+        Returns:
+            Seconds the generation took (a cold load shows up here)
+        """
+        started = time.perf_counter()
+        with llm_caller(self.WARMUP_CALLER):
+            self.generate(model=model, prompt=prompt, system=system,
+                          options={'temperature': 0, 'num_predict': 1})
+        return time.perf_counter() - started
+
+    def idle_seconds(self) -> float:
+        """Seconds since the last generation finished (0 while one is running)."""
+        if self.scheduler.stats()['in_flight']:
+            return 0.0
+        return time.monotonic() - self.last_used
+
+    def health(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Reachability of the server, cached for health_ttl seconds. One thread
+        pings at a time; the others wait for its result instead of pinging too.
+
+        Returns:
+            {'available': bool, 'error': str or None, 'checked_at': float}
+        """
+        requested = time.time()
+        cached = self._cached_health(requested, force)
+        if cached is not None:
+            return cached
+
+        with self._probe_lock:
+            # Another thread may have pinged while this one waited for the lock
+            cached = self._cached_health(requested, force)
+            if cached is not None:
+                return cached
+            status = self._probe()
+            with self._lock:
+                self._health = status
+            return status
+
+    def _cached_health(self, requested: float, force: bool) -> Optional[Dict[str, Any]]:
+        """The stored health result if still fresh, or (forced) checked since `requested`."""
+        with self._lock:
+            cached = self._health
+        if cached is None:
+            return None
+        if cached['checked_at'] >= requested:
+            return cached
+        if not force and time.time() - cached['checked_at'] < self.health_ttl:
+            return cached
+        return None
+
+    def _probe(self) -> Dict[str, Any]:
+        now = time.time()
+        try:
+            self._ping()
+            return {'available': True, 'error': None, 'checked_at': now}
+        except Exception as e:
+            return {'available': False, 'error': str(e), 'checked_at': now}
+
+    def stats(self) -> Dict[str, int]:
+        """Current load: generations running, generations waiting for a slot and their callers."""
+        return dict(self.scheduler.stats(), max_concurrency=self.max_concurrency)
+
+    def describe(self) -> str:
+        """Backend spec for logs and health output, e.g. 'openai:http://localhost:8080/v1'."""
+        return self.NAME
+
+    @abc.abstractmethod
+    def _generate(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """One non-streaming generation (Ollama /api/generate response fields)."""
+
+    @abc.abstractmethod
+    def _stream(self, kwargs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Chunks of one streaming generation, the last with done=True."""
+
+    @abc.abstractmethod
+    def _ping(self):
+        """Raise if the server is unreachable."""
+
+    def _is_transient(self, error: Exception) -> bool:
+        return False
+
+    def _slot(self, kwargs: Dict[str, Any]):
+        return _Slot(self, len(kwargs.get('prompt') or '') + len(kwargs.get('system') or ''))
+
+    def _first_chunk(self, kwargs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Open a stream and read its first chunk, so connection errors surface here."""
+        stream = iter(self._stream(kwargs))
+        try:
+            first = next(stream)
+        except StopIteration:
+            return iter(())
+
+        def chain():
+            yield first
+            yield from stream
+
+        return chain()
+
+    def _with_retries(self, call):
+        attempt = 0
+        while True:
+            try:
+                return call()
+            except Exception as e:
+                if attempt >= self.retries or not self._is_transient(e):
+                    raise
+                # Full jitter keeps simultaneous retries from arriving together
+                time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+                attempt += 1
+
+
+class _Slot:
+    """Context manager holding one of the backend's generation slots."""
+
+    def __init__(self, backend: LLMBackend, cost: int):
+        """
+        Args:
+            backend: Backend whose scheduler grants the slot
+            cost: Prompt length in characters, to order waiting generations
+        """
+        self.backend = backend
+        self.cost = cost
+
+    def __enter__(self):
+        backend = self.backend
+        if not backend.scheduler.acquire(self.cost, backend.timeout):
+            raise BackendUnavailable(
+                f'No {backend.NAME} generation slot freed up within {backend.timeout:.0f}s '
+                f'({backend.max_concurrency} in flight)'
+            )
+        return self
+
+    def __exit__(self, *exc_info):
+        self.backend.last_used = time.monotonic()
+        self.backend.scheduler.release()
+        return False
+
+
+class OpenAICompatibleBackend(LLMBackend):
+    """
+    Any server speaking the OpenAI chat completions API: llama.cpp's
+    llama-server, vLLM, LM Studio, LocalAI, ... One pooled HTTP client per backend.
+    """
+
+    NAME = 'openai'
+
+    RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+    # Ollama option name -> chat completions parameter; other options are dropped
+    OPTIONS = {
+        'temperature': 'temperature',
+        'num_predict': 'max_tokens',
+        'top_p': 'top_p',
+        'seed': 'seed',
+        'stop': 'stop',
+    }
+
+    def __init__(self, base_url: str = 'http://localhost:8080/v1', api_key: Optional[str] = None,
+                 max_concurrency: int = 2, timeout: float = 300.0, connect_timeout: float = 5.0,
+                 retries: int = 2, backoff: float = 1.0,
+                 health_ttl: float = 10.0, health_timeout: float = 2.0, gather_window: float = 0.0):
+        """
+        Args:
+            base_url: API root, including /v1
+            api_key: Sent as a bearer token (most local servers ignore it)
+            max_concurrency: Generations in flight at once; match the server's slots
+            timeout: Seconds a generation may take, and may wait for a slot
+            connect_timeout: Seconds to establish a connection
+            retries: Extra attempts after a transient failure
+            backoff: Base delay in seconds, doubled per attempt, with full jitter
+            health_ttl: Seconds a health check result is reused
+            health_timeout: Seconds a health check may take
+            gather_window: Seconds a burst of generations is gathered before dispatching
+        """
+        # Imported here: httpx takes a tenth of a second, wasted on runs that never generate
+        import httpx
+
+        super().__init__(max_concurrency, timeout, retries, backoff, health_ttl, gather_window)
+        self.base_url = base_url.rstrip('/')
+        headers = {'Authorization': f'Bearer {api_key}'} if api_key else {}
+        self._client = httpx.Client(
+            base_url=self.base_url,
+            headers=headers,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_concurrency + 2,
+                                max_keepalive_connections=max_concurrency + 2)
+        )
+        self.health_timeout = health_timeout
+
+    def describe(self) -> str:
+        return f'{self.NAME}:{self.base_url}'
+
+    def _generate(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        response = self._client.post('/chat/completions', json=self._request(kwargs, stream=False))
+        response.raise_for_status()
+        body = response.json()
+        usage = body.get('usage') or {}
+        return {
+            'model': body.get('model', kwargs.get('model')),
+            'response': body['choices'][0]['message'].get('content') or '',
+            'done': True,
+            'prompt_eval_count': usage.get('prompt_tokens', 0),
+            'eval_count': usage.get('completion_tokens', 0),
+        }
+
+    def _stream(self, kwargs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        request = self._request(kwargs, stream=True)
+        with self._client.stream('POST', '/chat/completions', json=request) as response:
+            response.raise_for_status()
+            usage = {}
+            for line in response.iter_lines():
+                if not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                event = json.loads(data)
+                usage = event.get('usage') or usage
+                for choice in event.get('choices') or []:
+                    text = (choice.get('delta') or {}).get('content')
+                    if text:
+                        yield {'model': request['model'], 'response': text, 'done': False}
+            yield {
+                'model': request['model'],
+                'response': '',
+                'done': True,
+                'prompt_eval_count': usage.get('prompt_tokens', 0),
+                'eval_count': usage.get('completion_tokens', 0),
+            }
+
+    def _request(self, kwargs: Dict[str, Any], stream: bool) -> Dict[str, Any]:
+        messages = []
+        if kwargs.get('system'):
+            messages.append({'role': 'system', 'content': kwargs['system']})
+        messages.append({'role': 'user', 'content': kwargs['prompt']})
+        request = {'model': kwargs['model'], 'messages': messages, 'stream': stream}
+        for option, value in (kwargs.get('options') or {}).items():
+            if option in self.OPTIONS:
+                request[self.OPTIONS[option]] = value
+        if stream:
+            request['stream_options'] = {'include_usage': True}
+        return request
+
+    def _ping(self):
+        self._client.get('/models', timeout=self.health_timeout).raise_for_status()
+
+    def _is_transient(self, error: Exception) -> bool:
+        import httpx
+
+        if isinstance(error, httpx.HTTPStatusError):
+            return error.response.status_code in self.RETRY_STATUSES
+        return isinstance(error, (httpx.TransportError, ConnectionError))
+
+
+class StubBackend(LLMBackend):
+    """
+    Offline backend for tests and dry runs: answers every prompt with a
+    plausible Playwright file (or test blocks, for method prompts) shaped
+    like the stub Ollama server's, without any network access.
+    """
+
+    NAME = 'stub'
+
+    def __init__(self, tokens: int = 120, latency: float = 0.0, max_concurrency: int = 8):
+        """
+        Args:
+            tokens: Approximate tokens per response
+            latency: Seconds each generation takes
+            max_concurrency: Generations in flight at once
+        """
+        super().__init__(max_concurrency, timeout=300.0, retries=0)
+        self.tokens = tokens
+        self.latency = latency
+        self.requests = 0
+
+    def _generate(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        pieces = self._pieces(kwargs)
+        return {'model': kwargs.get('model'), 'response': ''.join(pieces), 'done': True,
+                'prompt_eval_count': len(kwargs.get('prompt', '')) // 4, 'eval_count': len(pieces)}
+
+    def _stream(self, kwargs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        pieces = self._pieces(kwargs)
+        for piece in pieces:
+            yield {'model': kwargs.get('model'), 'response': piece, 'done': False}
+        yield {'model': kwargs.get('model'), 'response': '', 'done': True,
+               'prompt_eval_count': len(kwargs.get('prompt', '')) // 4, 'eval_count': len(pieces)}
+
+    def _pieces(self, kwargs: Dict[str, Any]):
+        # The stub server module brings http.server along; only stub runs need it
+        from tools.stub_ollama import response_pieces
+
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.requests += 1
+        return response_pieces(kwargs.get('prompt', ''), self.tokens)
+
+    def _ping(self):
+        pass
@@ -1,17 +1,30 @@
 #!/usr/bin/env python3
 """
 Tool: LLM Converter
-Uses Ollama CodeLlama for intelligent code conversion.
+Uses an LLM backend (Ollama CodeLlama by default) for intelligent code conversion.
 Layer 3: Deterministic Tool
 """
 
-import ollama
-from typing import Dict, Any
+import string
+import textwrap
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from tools.code_validator import CodeValidator
+from tools.conversion_cache import ConversionCache
+from tools.llm_backends import LLMBackend
+from tools.llm_scheduler import ContextThreadPoolExecutor
+from tools.method_shapes import MethodShape, method_signature
+from tools.metrics import StageTimer
+from tools.prompt_compactor import PromptCompactor, estimate_tokens
 
 
 class LLMConverter:
-    """Convert Selenium Java to Playwright JS/TS using CodeLlama."""
+    """Convert Selenium Java to Playwright JS/TS using CodeLlama (or another model)."""
     
+    # Default model; ModelRouter picks others per file
     MODEL = 'codellama'
     
     SYSTEM_PROMPT = """You are an expert in test automation migration.
@@ -36,82 +49,747 @@ Selenium to Playwright mappings:
 - Assert.assertEquals(a,b) -> expect(a).toBe(b)
 """
 
-    def __init__(self, target_language: str = 'typescript'):
+    # Prompts start with their static instructions and end with what differs
+    # per request, so that consecutive requests share a byte-identical prefix
+    # (system prompt + instructions) that servers with a prompt/KV cache reuse.
+    PROMPT_TEMPLATE = """Convert Selenium Java code to Playwright {lang}.
+Provide ONLY the converted Playwright {lang} code. No explanations.
+
+Requirements:
+- Use @playwright/test
+- Include proper imports
+- Use async/await
+- Convert all Selenium calls to Playwright equivalents
+- Replace TestNG annotations with Playwright test structure
+
+Original Java code:
+```java
+{java_code}
+```
+{context}"""
+
+    METHOD_PROMPT_TEMPLATE = """Convert Selenium Java methods of one class to Playwright {lang}.
+Provide ONLY the converted Playwright {lang} blocks. No explanations, no imports
+and no test.describe wrapper: the blocks are inserted into an existing
+test.describe('<class name>', ...) body.
+
+Requirements:
+- @Test methods become test('name', async ({{ page }}) => {{ ... }});
+- @BeforeMethod/@AfterMethod become test.beforeEach/test.afterEach
+- @BeforeClass/@AfterClass become test.beforeAll/test.afterAll
+- Methods without TestNG annotations become async functions taking page as
+  their first parameter; calls to them pass page as the first argument
+- Use async/await
+- Convert all Selenium calls to Playwright equivalents
+
+Class: {class_name}
+
+All methods of the class:
+{signatures}
+{context}
+Original Java methods:
+```java
+{java_code}
+```
+"""
+
+    SKELETON_PROMPT_TEMPLATE = """Convert the skeleton of a Selenium Java class to a Playwright {lang} file skeleton.
+The method bodies were removed; they are converted separately.
+Provide ONLY the Playwright {lang} code. No explanations.
+
+Requirements:
+- Use @playwright/test and include proper imports
+- Produce one test.describe('<class name>', () => {{ ... }}); block
+- Inside it, declare only what the fields and constructors need
+- Do NOT write any test(), hooks or functions for the removed methods
+
+Class: {class_name}
+
+Original Java class:
+```java
+{java_code}
+```
+{context}"""
+
+    HELPER_PROMPT_TEMPLATE = """Convert a shared Selenium Java class to a reusable Playwright {lang} module.
+Provide ONLY the Playwright {lang} module. No explanations.
+
+Requirements:
+- Page objects and helpers: export a class with the Java class's name whose
+  constructor takes the Playwright page; WebElement fields and @FindBy become
+  Locator properties
+- Base test classes: export `test` (test.extend from @playwright/test with the
+  setup/teardown as fixtures) and `expect`, for tests to import instead of
+  @playwright/test
+- Keep public method names so callers can be converted independently
+- {export_rule}
+- Use async/await
+- Convert all Selenium calls to Playwright equivalents
+
+Class: {class_name} ({kind})
+
+Original Java class:
+```java
+{java_code}
+```
+{context}"""
+
+    REPAIR_PROMPT_TEMPLATE = """Fix Playwright {lang} code converted from Selenium Java that does not parse.
+Provide ONLY the corrected Playwright {lang} code. No explanations.
+
+Syntax errors:
+{errors}
+
+Broken Playwright {lang} code:
+```
+{broken}
+```
+
+Original Java code:
+```java
+{java_code}
+```
+{context}
+Return the corrected code {form}.
+"""
+
+    # What the repaired code must look like, by kind of code being repaired
+    REPAIR_FORMS = {
+        'file': 'as a complete file with its imports',
+        'block': 'as the same test(...), hook or function blocks, without imports or a test.describe wrapper',
+    }
+
+    OPTIONS = {
+        'temperature': 0.1,
+        'num_predict': 2048
+    }
+
+    # Per-chunk generations are short; a tight limit keeps latency bounded
+    CHUNK_OPTIONS = {
+        'temperature': 0.1,
+        'num_predict': 1024
+    }
+
+    # Files with more methods than this are converted in chunks
+    CHUNK_THRESHOLD = 8
+
+    # Concurrent prompts issued for the chunks of a single file
+    CHUNK_WORKERS = 4
+
+    # Files whose compacted source exceeds this many tokens are converted in chunks
+    PROMPT_TOKEN_BUDGET = 3000
+
+    # Re-prompts per file for syntax errors that could not be pinned to one method
+    REPAIR_ATTEMPTS = 1
+
+    # Templates whose prefixes warm() prefills: every file uses one of them
+    WARM_TEMPLATES = (PROMPT_TEMPLATE, METHOD_PROMPT_TEMPLATE)
+
+    def __init__(self, target_language: str = 'typescript',
+                 cache: Optional[ConversionCache] = None,
+                 client: Optional[LLMBackend] = None,
+                 compact: bool = True, model: Optional[str] = None,
+                 validator: Optional[CodeValidator] = None, backend: str = 'ollama'):
+        """
+        Args:
+            target_language: 'typescript' or 'javascript'
+            cache: Conversion cache (None disables caching)
+            client: LLM backend (default: the backend spec `backend`, created on first use)
+            compact: Strip comments, unused imports and whitespace from the
+                Java code before it goes into a prompt
+            model: Model name on the backend (default: MODEL)
+            validator: Syntax-checks generated code; code that does not parse
+                is re-prompted once with the errors (None disables repairs)
+            backend: Backend spec for tools.model_router.get_backend, used without a client
+        """
         self.target_language = target_language
         self.extension = '.ts' if target_language == 'typescript' else '.js'
+        self.cache = cache
+        self.backend = backend
+        self._client = client
+        self.model = model or self.MODEL
+        self.validator = validator
+        self.compactor = PromptCompactor() if compact else None
+    
+    @property
+    def client(self) -> LLMBackend:
+        """
+        The LLM backend. Without one passed in, it is created on first use,
+        so parse-only and fully cached runs never import an HTTP client.
+        """
+        if self._client is None:
+            from tools.model_router import get_backend
+            self._client = get_backend(self.backend)
+        return self._client
+    
+    def source_tokens(self, java_code: str) -> int:
+        """Estimated tokens of java_code as it is sent in a prompt."""
+        if self.compactor is not None:
+            java_code = self.compactor.compact(java_code)
+        return estimate_tokens(java_code)
+    
+    def prompt_prefix(self, template: Optional[str] = None) -> str:
+        """The static head of a template's prompts: its text up to the first per-request field."""
+        lang = 'TypeScript' if self.target_language == 'typescript' else 'JavaScript'
+        parts = []
+        for literal, field, _, _ in string.Formatter().parse(template or self.PROMPT_TEMPLATE):
+            parts.append(literal)
+            if field is None:
+                continue
+            if field != 'lang':
+                break
+            parts.append(lang)
+        return ''.join(parts)
+    
+    def warm(self) -> float:
+        """
+        Load the model on its backend and prefill the system prompt with the
+        static prefix of each of WARM_TEMPLATES.
+        
+        Returns:
+            Seconds it took
+        """
+        return sum(self.client.warm(self.model, self.SYSTEM_PROMPT, self.prompt_prefix(template))
+                   for template in self.WARM_TEMPLATES)
     
-    def convert(self, java_code: str, class_name: str = '') -> str:
+    def convert(self, java_code: str, class_name: str = '', timer: Optional[StageTimer] = None,
+                context: str = '') -> str:
         """
         Convert Java code to Playwright using LLM.
         
         Args:
             java_code: The Java source code to convert
             class_name: Optional class name for context
+            timer: Collects stage timings and token counts
+            context: Signatures of already converted helpers the code uses
         
         Returns:
             Converted Playwright code
         """
-        lang = 'TypeScript' if self.target_language == 'typescript' else 'JavaScript'
+        return self._generate(self.PROMPT_TEMPLATE, java_code, timer=timer, context=_context(context))
+    
+    def convert_method(self, method_code: str, class_name: str = '', signatures: str = '',
+                       timer: Optional[StageTimer] = None, context: str = '',
+                       names: Optional[List[str]] = None) -> str:
+        """
+        Convert one method (or a small group of methods) using LLM.
         
-        prompt = f"""Convert this Selenium Java code to Playwright {lang}.
-
-Original Java code:
-```java
-{java_code}
-```
-
-Provide ONLY the converted Playwright {lang} code. No explanations.
-
-Requirements:
-- Use @playwright/test
-- Include proper imports
-- Use async/await
-- Convert all Selenium calls to Playwright equivalents
-- Replace TestNG annotations with Playwright test structure
-"""
+        With the names the methods declare, the prompt carries their
+        MethodShape instead: methods that only differ in string literals and
+        declared names share one cached conversion, with their own values
+        put back in. If the model drops a literal, the method is converted as is.
         
-        try:
-            response = ollama.generate(
-                model=self.MODEL,
-                prompt=prompt,
-                system=self.SYSTEM_PROMPT,
-                options={
-                    'temperature': 0.1,
-                    'num_predict': 2048
-                }
-            )
-            
-            converted_code = response['response'].strip()
+        Args:
+            method_code: Java source of the method(s), including annotations
+            class_name: Name of the enclosing class
+            signatures: Signatures of all methods in the class, one per line
+            timer: Collects stage timings and token counts
+            context: Signatures of already converted helpers the code uses
+            names: Names the methods declare (JavaParser metadata 'locals')
+        
+        Returns:
+            Playwright blocks (test(...), test.beforeEach(...), ...)
+        """
+        timer = timer or StageTimer()
+        shape = MethodShape.of(method_code, names, class_name) if names is not None and self.cache else None
+        if shape is not None:
+            converted = self._generate(self.METHOD_PROMPT_TEMPLATE, shape.code, self.CHUNK_OPTIONS, timer,
+                                       class_name=MethodShape.CLASS,
+                                       signatures=shape.referenced(signatures) or '(not listed)',
+                                       context=_context(context))
+            if shape.complete(converted):
+                return self._checked(shape.restore(converted), method_code, 'block', timer, context)
+            timer.count('shape_misses')
+        
+        converted = self._generate(self.METHOD_PROMPT_TEMPLATE, method_code, self.CHUNK_OPTIONS, timer,
+                                   class_name=class_name or 'ConvertedTest',
+                                   signatures=signatures or '(not listed)',
+                                   context=_context(context))
+        return self._checked(converted, method_code, 'block', timer, context)
+    
+    def convert_methods(self, method_codes: List[str], class_name: str = '', signatures: str = '',
+                        timer: Optional[StageTimer] = None, context: str = '',
+                        names: Optional[List[List[str]]] = None) -> List[str]:
+        """
+        Convert several methods concurrently, one prompt each.
+        
+        Args:
+            method_codes: Java sources of the methods (or method groups)
+            class_name: Name of the enclosing class
+            signatures: Signatures of all methods in the class, one per line
+            timer: Collects stage timings and token counts
+            context: Signatures of already converted helpers the code uses
+            names: Names each method (group) declares, in the same order
+        
+        Returns:
+            Converted blocks, in the same order as method_codes
+        """
+        names = names or [None] * len(method_codes)
+        
+        def convert(code, declared):
+            return self.convert_method(code, class_name, signatures, timer, context, declared)
+        
+        if len(method_codes) <= 1:
+            return [convert(code, declared) for code, declared in zip(method_codes, names)]
+        
+        with ContextThreadPoolExecutor(min(self.CHUNK_WORKERS, len(method_codes))) as pool:
+            return list(pool.map(convert, method_codes, names))
+    
+    def convert_helper(self, java_code: str, class_name: str, kind: str = 'page_object',
+                       timer: Optional[StageTimer] = None, context: str = '') -> str:
+        """
+        Convert a shared page object, helper or base test class into a
+        Playwright module that tests import.
+        
+        Args:
+            java_code: The Java source code
+            class_name: Name of the class to export
+            kind: 'page_object' or 'base_test'
+            timer: Collects stage timings and token counts
+            context: Signatures of already converted helpers this class uses
+        
+        Returns:
+            Converted Playwright module
+        """
+        if self.target_language == 'typescript':
+            export_rule = 'Use ES module named exports (export class / export const)'
+        else:
+            export_rule = 'Export with module.exports = { ... } (CommonJS)'
+        timer = timer or StageTimer()
+        converted = self._generate(self.HELPER_PROMPT_TEMPLATE, java_code, timer=timer,
+                                   class_name=class_name,
+                                   kind='base test class' if kind == 'base_test' else 'page object / helper class',
+                                   export_rule=export_rule,
+                                   context=_context(context))
+        return self._checked(converted, java_code, 'file', timer, context)
+    
+    def convert_chunked(self, java_code: str, metadata: Dict[str, Any], methods_per_chunk: int = 1,
+                        timer: Optional[StageTimer] = None, context: str = '') -> str:
+        """
+        Convert a large class as concurrent prompts: one for the class
+        skeleton and one per group of methods, stitched into one file.
+        
+        Args:
+            java_code: The Java source code
+            metadata: Parsed metadata from JavaParser
+            methods_per_chunk: Number of methods per prompt
+            timer: Collects stage timings and token counts
+            context: Signatures of already converted helpers the code uses
+        
+        Returns:
+            Converted Playwright code
+        """
+        timer = timer or StageTimer()
+        methods = metadata.get('methods', [])
+        class_name = metadata.get('class_name') or 'ConvertedTest'
+        signatures = '\n'.join(f'- {method_signature(method["body"])}' for method in methods)
+        size = max(1, methods_per_chunk)
+        groups = [
+            '\n\n'.join(method['body'] for method in methods[i:i + size])
+            for i in range(0, len(methods), size)
+        ]
+        names = [
+            [name for method in methods[i:i + size] for name in method.get('locals', [])]
+            for i in range(0, len(methods), size)
+        ]
+        
+        with ContextThreadPoolExecutor(min(self.CHUNK_WORKERS, len(groups) + 1)) as pool:
+            skeleton = pool.submit(self._convert_skeleton, _skeleton(java_code, methods), class_name, timer, context)
+            blocks = list(pool.map(
+                lambda group, declared: self.convert_method(group, class_name, signatures, timer, context, declared),
+                groups, names
+            ))
+            header = skeleton.result()
+        
+        with timer.stage('postprocess'):
+            return _stitch(header, blocks, class_name)
+    
+    def _convert_skeleton(self, skeleton: str, class_name: str, timer: StageTimer, context: str) -> str:
+        converted = self._generate(self.SKELETON_PROMPT_TEMPLATE, skeleton, self.CHUNK_OPTIONS, timer,
+                                   class_name=class_name, context=_context(context))
+        return self._checked(converted, skeleton, 'file', timer, context)
+    
+    def repair(self, converted_code: str, java_code: str, metadata: Dict[str, Any],
+               timer: Optional[StageTimer] = None, context: str = '') -> str:
+        """
+        Fix a whole-file conversion that does not parse. The test or hook
+        block containing the first error is re-prompted on its own, with the
+        error and its Java method; errors outside any block re-prompt the file.
+        
+        Args:
+            converted_code: Generated Playwright file
+            java_code: The Java source it was converted from
+            metadata: Parsed metadata from JavaParser
+            timer: Collects stage timings and token counts
+            context: Signatures of already converted helpers the code uses
+        
+        Returns:
+            The repaired code (unchanged when it parses, or without a validator)
+        """
+        if self.validator is None:
+            return converted_code
+        timer = timer or StageTimer()
+        repaired = set()
+        file_repairs = 0
+        while True:
+            with timer.stage('validate'):
+                errors = self.validator.syntax_errors(converted_code)
+            if not errors:
+                return converted_code
             
-            # Clean up the response (remove markdown code blocks if present)
-            if converted_code.startswith('```'):
+            block = self.validator.locate(converted_code, errors[0]['line'])
+            method = _java_method(block, metadata) if block else None
+            if method is not None and block['start'] not in repaired:
+                repaired.add(block['start'])
                 lines = converted_code.split('\n')
-                # Remove first line (```typescript or ```javascript)
-                if lines[0].startswith('```'):
-                    lines = lines[1:]
-                # Remove last line (```)
-                if lines and lines[-1].strip() == '```':
-                    lines = lines[:-1]
-                converted_code = '\n'.join(lines).strip()
-            
+                broken = '\n'.join(lines[block['start']:block['end']])
+                block_errors = [dict(error, line=error['line'] - block['start']) for error in errors
+                                if block['start'] < error['line'] <= block['end']]
+                fixed = self._repaired(broken, method['body'], block_errors, 'block', timer, context)
+                indent = lines[block['start']][:len(lines[block['start']]) - len(lines[block['start']].lstrip())]
+                fixed_lines = textwrap.indent(textwrap.dedent(fixed).strip(), indent).split('\n')
+                if block['end'] < len(lines) and lines[block['end'] - 1].strip() == '':
+                    fixed_lines.append('')
+                converted_code = '\n'.join(lines[:block['start']] + fixed_lines + lines[block['end']:])
+            elif file_repairs < self.REPAIR_ATTEMPTS:
+                file_repairs += 1
+                converted_code = self._repaired(converted_code, java_code, errors, 'file', timer, context)
+            else:
+                return converted_code
+    
+    def _checked(self, converted_code: str, java_code: str, form: str, timer: StageTimer,
+                 context: str = '') -> str:
+        """Return converted code, re-prompted once with its errors if it does not parse."""
+        if self.validator is None or not converted_code:
             return converted_code
-            
+        with timer.stage('validate'):
+            errors = self.validator.syntax_errors(converted_code)
+        if not errors:
+            return converted_code
+        return self._repaired(converted_code, java_code, errors, form, timer, context)
+    
+    def _repaired(self, broken: str, java_code: str, errors: List[Dict[str, Any]], form: str,
+                  timer: StageTimer, context: str = '') -> str:
+        """Re-prompt broken code with its syntax errors; keep it if the repair fails."""
+        timer.count('repairs')
+        try:
+            return self._generate(
+                self.REPAIR_PROMPT_TEMPLATE, java_code,
+                self.CHUNK_OPTIONS if form == 'block' else self.OPTIONS, timer,
+                broken=broken,
+                errors='\n'.join(f"- line {error['line']}: {error['message']}" for error in errors),
+                form=self.REPAIR_FORMS[form],
+                context=_context(context)
+            ) or broken
+        except RuntimeError:
+            return broken
+    
+    def convert_stream(self, java_code: str, class_name: str = '',
+                       timer: Optional[StageTimer] = None, context: str = '') -> Iterator[str]:
+        """
+        Convert Java code to Playwright, yielding code as the model generates it.
+        
+        Markdown fences are stripped incrementally, so the concatenated
+        chunks equal the result of convert().
+        
+        Args:
+            java_code: The Java source code to convert
+            class_name: Optional class name for context
+            timer: Collects stage timings and token counts
+            context: Signatures of already converted helpers the code uses
+        
+        Yields:
+            Pieces of converted Playwright code
+        """
+        timer = timer or StageTimer()
+        with timer.stage('prompt'):
+            prompt, cache_key = self._prepare(self.PROMPT_TEMPLATE, java_code, self.OPTIONS,
+                                              {'context': _context(context)}, timer)
+        cached = self._cached(cache_key, timer)
+        if cached is not None:
+            yield cached
+            return
+        
+        stripper = _FenceStripper()
+        parts = []
+        started = time.perf_counter()
+        first_token = None
+        try:
+            for chunk in self.client.generate_stream(
+                model=self.model,
+                prompt=prompt,
+                system=self.SYSTEM_PROMPT,
+                options=self.OPTIONS
+            ):
+                if first_token is None:
+                    first_token = time.perf_counter()
+                    timer.add('first_token', first_token - started)
+                if chunk.get('done'):
+                    timer.record_response(chunk, durations=False)
+                text = stripper.feed(chunk['response'])
+                if text:
+                    parts.append(text)
+                    yield text
+            text = stripper.finish()
         except Exception as e:
             raise RuntimeError(f"LLM conversion failed: {e}")
+        finally:
+            finished = time.perf_counter()
+            timer.add('llm', finished - started)
+            if first_token is not None:
+                timer.add('generation', finished - first_token)
+        
+        if text:
+            parts.append(text)
+            yield text
+        
+        converted_code = ''.join(parts)
+        if cache_key is not None and converted_code:
+            self._store(cache_key, converted_code)
+    
+    def _generate(self, template: str, java_code: str, options: Optional[Dict[str, Any]] = None,
+                  timer: Optional[StageTimer] = None, **fields: str) -> str:
+        """Fill a prompt template, then return the cached or freshly generated code."""
+        options = options or self.OPTIONS
+        timer = timer or StageTimer()
+        with timer.stage('prompt'):
+            prompt, cache_key = self._prepare(template, java_code, options, fields, timer)
+        cached = self._cached(cache_key, timer)
+        if cached is not None:
+            return cached
+        
+        # Identical prompts in flight at once (e.g. methods of the same shape) share one generation
+        with _in_flight_lock:
+            shared = _in_flight.get(cache_key) if cache_key is not None else None
+            if shared is None and cache_key is not None:
+                _in_flight[cache_key] = owned = Future()
+            else:
+                owned = None
+        if shared is not None:
+            with timer.stage('llm'):
+                converted_code = shared.result()
+            timer.count('cache_hits')
+            return converted_code
+        
+        try:
+            with timer.stage('llm'):
+                response = self.client.generate(
+                    model=self.model,
+                    prompt=prompt,
+                    system=self.SYSTEM_PROMPT,
+                    options=options
+                )
+            timer.record_response(response)
+            with timer.stage('postprocess'):
+                converted_code = _strip_fences(response['response'])
+        except Exception as e:
+            error = RuntimeError(f"LLM conversion failed: {e}")
+            if owned is not None:
+                owned.set_exception(error)
+            raise error
+        except BaseException as e:
+            # Interrupted: callers sharing this generation must not wait forever either
+            if owned is not None:
+                owned.set_exception(e)
+            raise
+        else:
+            if owned is not None:
+                owned.set_result(converted_code)
+        finally:
+            if owned is not None:
+                with _in_flight_lock:
+                    _in_flight.pop(cache_key, None)
+        
+        if cache_key is not None and converted_code:
+            self._store(cache_key, converted_code)
+        return converted_code
+    
+    def _store(self, cache_key: str, converted_code: str):
+        """Cache a conversion; a failed write (locked database, full disk) only costs a later regeneration."""
+        try:
+            self.cache.put(cache_key, converted_code)
+        except Exception as e:
+            print(f"Conversion cache write failed: {e}")
+    
+    def _cached(self, cache_key: Optional[str], timer: StageTimer) -> Optional[str]:
+        """Look up a conversion in the cache, counting hits."""
+        if cache_key is None:
+            return None
+        with timer.stage('cache'):
+            cached = self.cache.get(cache_key)
+        if cached is not None:
+            timer.count('cache_hits')
+        return cached
+    
+    def _prepare(self, template: str, java_code: str, options: Dict[str, Any],
+                 fields: Dict[str, str], timer: Optional[StageTimer] = None) -> Tuple[str, Optional[str]]:
+        """Build the prompt and, when caching is enabled, its cache key."""
+        if self.compactor is not None:
+            compacted = self.compactor.compact(java_code)
+            if timer is not None:
+                timer.count('compacted_tokens', estimate_tokens(java_code) - estimate_tokens(compacted))
+            java_code = compacted
+        
+        lang = 'TypeScript' if self.target_language == 'typescript' else 'JavaScript'
+        prompt = template.format(lang=lang, java_code=java_code, **fields)
+        
+        if self.cache is None:
+            return prompt, None
+        
+        cache_key = self.cache.make_key(
+            java_code,
+            target_language=self.target_language,
+            model=self.model,
+            system=self.SYSTEM_PROMPT,
+            template=template,
+            fields=fields,
+            options=options
+        )
+        return prompt, cache_key
     
-    def convert_with_context(self, java_code: str, metadata: Dict[str, Any]) -> str:
+    def convert_with_context(self, java_code: str, metadata: Dict[str, Any],
+                             timer: Optional[StageTimer] = None, context: str = '') -> str:
         """
         Convert with additional context from parser.
         
         Args:
             java_code: The Java source code
             metadata: Parsed metadata from JavaParser
+            timer: Collects stage timings and token counts
+            context: Signatures of already converted helpers the code uses
         
         Returns:
             Converted Playwright code
         """
+        timer = timer or StageTimer()
         class_name = metadata.get('class_name', 'ConvertedTest')
-        return self.convert(java_code, class_name)
+        converted_code = self.convert(java_code, class_name, timer, context)
+        return self.repair(converted_code, java_code, metadata, timer, context)
+
+
+# Futures of generations in progress, by cache key (shared by all converters)
+_in_flight: Dict[str, Future] = {}
+_in_flight_lock = threading.Lock()
+
+
+def _context(context: str) -> str:
+    """Prompt section for helper signatures ('' when there are none)."""
+    return f"\n{context.strip()}\n" if context.strip() else ''
+
+
+def _java_method(block: Dict[str, Any], metadata: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """The Java method a generated test, hook or function block was converted from."""
+    methods = [method for method in metadata.get('methods', []) if method.get('body')]
+    if block['kind'] == 'hook':
+        annotation = CodeValidator.HOOKS[block['name']]
+        matches = [method for method in methods if annotation in method['annotations']]
+    else:
+        matches = [method for method in methods if method['name'] == block['name']]
+    return matches[0] if len(matches) == 1 else None
+
+
+def _strip_fences(response: str) -> str:
+    """Clean up the response (remove markdown code blocks if present)."""
+    converted_code = response.strip()
+    
+    if converted_code.startswith('```'):
+        lines = converted_code.split('\n')
+        # Remove first line (```typescript or ```javascript)
+        if lines[0].startswith('```'):
+            lines = lines[1:]
+        # Remove last line (```)
+        if lines and lines[-1].strip() == '```':
+            lines = lines[:-1]
+        converted_code = '\n'.join(lines).strip()
+    
+    return converted_code
+
+
+class _FenceStripper:
+    """
+    Streaming counterpart of _strip_fences.
+    Holds back only the text that could still turn out to be a fence or
+    trailing whitespace; everything else is released immediately.
+    """
+    
+    def __init__(self):
+        self.buffer = ''
+        self.fenced = None  # Unknown until the first line is complete
+        self.emitted = False
+    
+    def feed(self, text: str) -> str:
+        """Add streamed text; return the part that is safe to emit."""
+        self.buffer += text
+        
+        if self.fenced is None:
+            head = self.buffer.lstrip()
+            if '\n' not in head and '```'.startswith(head[:3]):
+                return ''
+            self.fenced = head.startswith('```')
+            self.buffer = head.split('\n', 1)[1] if self.fenced else head
+        
+        # Hold back the partial last line and any blank or fence lines before it
+        end = self.buffer.rfind('\n') + 1
+        while end > 0:
+            start = self.buffer.rfind('\n', 0, end - 1) + 1
+            if self.buffer[start:end].strip() not in ('', '```'):
+                break
+            end = start
+        
+        # Keep the newline too, in case nothing but whitespace follows
+        return self._emit(max(end - 1, 0))
+    
+    def finish(self) -> str:
+        """Return the remaining text once the stream has ended."""
+        if self.fenced is None:
+            head = self.buffer.strip()
+            self.fenced = head.startswith('```')
+            self.buffer = '' if self.fenced else head
+        
+        text = self.buffer.rstrip()
+        if self.fenced:
+            lines = text.split('\n')
+            if lines and lines[-1].strip() == '```':
+                lines = lines[:-1]
+            text = '\n'.join(lines).rstrip()
+        
+        self.buffer = text
+        return self._emit(len(text))
+    
+    def _emit(self, length: int) -> str:
+        text, self.buffer = self.buffer[:length], self.buffer[length:]
+        if not self.emitted:
+            text = text.lstrip()
+            self.emitted = bool(text)
+        return text
+
+
+def _skeleton(java_code: str, methods: List[Dict[str, Any]]) -> str:
+    """Remove method declarations from the source, keeping fields and class structure."""
+    lines = java_code.splitlines()
+    removed = set()
+    for method in methods:
+        if method.get('line_number'):
+            removed.update(range(method['line_number'] - 1, method['end_line']))
+    kept = []
+    for index, line in enumerate(lines):
+        if index in removed or (not line.strip() and kept and not kept[-1].strip()):
+            continue
+        kept.append(line)
+    return '\n'.join(kept)
+
+
+def _stitch(header: str, blocks: List[str], class_name: str) -> str:
+    """Insert converted method blocks at the end of the skeleton's test.describe body."""
+    body = '\n\n'.join(
+        textwrap.indent(textwrap.dedent(block).strip(), '  ') for block in blocks if block.strip()
+    )
+    end = header.rfind('});')
+    if 'test.describe' in header and end != -1:
+        head = header[:end].rstrip()
+        separator = '\n' if head.endswith('{') else '\n\n'
+        return f"{head}{separator}{body}\n}});"
+    return f"{header}\n\ntest.describe('{class_name}', () => {{\n{body}\n}});"
 
 
 def convert_code(java_code: str, target_language: str = 'typescript') -> str:
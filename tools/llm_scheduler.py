@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tool: LLM Scheduler
+Decides which waiting generation gets a backend's next free slot: shortest
+prompt first within a caller, round-robin between callers, so the server
+stays saturated and one large submission cannot starve interactive users.
+Layer 3: Deterministic Tool
+"""
+
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+
+# Who a generation is for: a CLI run, a web client, a bulk job, ...
+_caller: contextvars.ContextVar = contextvars.ContextVar('llm_caller', default='default')
+
+
+def current_caller() -> str:
+    """The caller generations of this context are scheduled for."""
+    return _caller.get()
+
+
+@contextmanager
+def llm_caller(name: str):
+    """Schedule the generations started in this block for caller `name`."""
+    token = _caller.set(name)
+    try:
+        yield
+    finally:
+        _caller.reset(token)
+
+
+def run_as(name: str, iterable: Iterable) -> Iterator:
+    """
+    Iterate a lazy iterable (e.g. a streamed response's generator) with its
+    generations scheduled for caller `name`, wherever it is consumed.
+    """
+    context = contextvars.copy_context()
+    context.run(_caller.set, name)
+    iterator = context.run(iter, iterable)
+    while True:
+        try:
+            item = context.run(next, iterator)
+        except StopIteration:
+            return
+        yield item
+
+
+class ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Thread pool whose tasks run in the submitter's context, so they keep its caller."""
+
+    def submit(self, fn, /, *args, **kwargs):
+        return super().submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+class _Request:
+    __slots__ = ('caller', 'granted', 'cancelled', 'event')
+
+    def __init__(self, caller: str):
+        self.caller = caller
+        self.granted = False
+        self.cancelled = False
+        self.event = threading.Event()
+
+
+class GenerationScheduler:
+    """
+    Admission control for one backend: at most `slots` generations run at
+    once (the sequences the server decodes together). The rest wait in one
+    queue per caller.
+
+    When a slot frees up, callers take turns (round-robin), and each caller's
+    cheapest waiting prompt goes first: short prompts stop queueing behind
+    long ones, and a repository submitting hundreds of prompts gets one turn
+    per round like a user converting a single file. With a gather window,
+    a request arriving at an idle queue waits that long for others, so that
+    a burst is ordered as a whole instead of first come, first served.
+    """
+
+    def __init__(self, slots: int, window: float = 0.0):
+        """
+        Args:
+            slots: Generations in flight at once
+            window: Seconds to gather a burst before dispatching (0: none)
+        """
+        self.slots = slots
+        self.window = window
+        self.in_flight = 0
+        self.waiting = 0
+        self._queues: Dict[str, List] = {}
+        self._turns: deque = deque()
+        self._order = itertools.count()
+        self._gathering = False
+        self._lock = threading.Lock()
+
+    def acquire(self, cost: int = 0, timeout: Optional[float] = None) -> bool:
+        """
+        Wait for a slot.
+
+        Args:
+            cost: Estimated prompt size; cheaper requests of a caller go first
+            timeout: Most seconds to wait (None: no limit)
+
+        Returns:
+            False if no slot was granted within the timeout
+        """
+        request = _Request(current_caller())
+        with self._lock:
+            if self.in_flight < self.slots and not self.waiting and not self.window:
+                self.in_flight += 1
+                return True
+            queue = self._queues.get(request.caller)
+            if queue is None:
+                queue = self._queues[request.caller] = []
+                self._turns.append(request.caller)
+            heapq.heappush(queue, (cost, next(self._order), request))
+            self.waiting += 1
+            gather = self.window and not self._gathering and self.in_flight < self.slots
+            if gather:
+                self._gathering = True
+            else:
+                self._dispatch()
+
+        if gather:
+            time.sleep(self.window)
+            with self._lock:
+                self._gathering = False
+                self._dispatch()
+
+        if request.event.wait(timeout):
+            return True
+        with self._lock:
+            if request.granted:
+                return True
+            request.cancelled = True
+            self.waiting -= 1
+            return False
+
+    def release(self):
+        """Free a slot acquired with acquire()."""
+        with self._lock:
+            self.in_flight -= 1
+            self._dispatch()
+
+    def stats(self) -> Dict[str, Any]:
+        """Generations running, requests waiting and callers they belong to."""
+        with self._lock:
+            return {'in_flight': self.in_flight, 'waiting': self.waiting, 'callers': len(self._turns)}
+
+    def _dispatch(self):
+        """Grant free slots, one per caller in turn (call with the lock held)."""
+        while self.in_flight < self.slots and self._turns and not self._gathering:
+            caller = self._turns.popleft()
+            queue = self._queues[caller]
+            request = heapq.heappop(queue)[2]
+            if queue:
+                self._turns.append(caller)
+            else:
+                del self._queues[caller]
+            if request.cancelled:
+                continue
+            request.granted = True
+            self.in_flight += 1
+            self.waiting -= 1
+            request.event.set()
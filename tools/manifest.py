@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tool: Conversion Manifest
+Tracks which sources have been converted, with which settings, so that
+repository re-runs only convert what changed.
+Layer 3: Deterministic Tool
+"""
+
+import hashlib
+import json
+import os
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
+
+
+class ConversionManifest:
+    """
+    JSON manifest stored in the output directory.
+    Maps each input path (relative to the input root) to its content hash,
+    the converter settings fingerprint and the output path.
+    """
+
+    FILE_NAME = '.manifest.json'
+
+    VERSION = 1
+
+    def __init__(self, output_dir: str, root: str, settings: str):
+        """
+        Args:
+            output_dir: Output directory holding the manifest
+            root: Input root the keys are relative to (as given by the user)
+            settings: Fingerprint of everything that influences the output
+        """
+        self.path = os.path.join(output_dir, self.FILE_NAME)
+        self.root = os.path.normpath(root)
+        self.settings = settings
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == self.VERSION:
+                self.entries = data.get('entries', {})
+
+    @staticmethod
+    def hash_file(file_path: str) -> str:
+        """SHA-256 of a file's bytes."""
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 16), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def key(self, file_path: str) -> str:
+        """Manifest key for an input file: its path relative to the root."""
+        return os.path.relpath(file_path, self.root).replace(os.sep, '/')
+
+    def is_current(self, file_path: str, source_hash: str) -> bool:
+        """True if file_path was converted from identical content with identical settings."""
+        entry = self.entries.get(self._entry_key(file_path))
+        return (
+            entry is not None
+            and entry['hash'] == source_hash
+            and entry['settings'] == self.settings
+            and os.path.exists(entry['output'])
+        )
+
+    def record(self, file_path: str, source_hash: str, output_path: str):
+        """Remember a successful conversion."""
+        self.entries[self._entry_key(file_path)] = {
+            'root': self.root,
+            'source': self.key(file_path),
+            'hash': source_hash,
+            'settings': self.settings,
+            'output': output_path,
+        }
+
+    def forget(self, file_path: str):
+        """Drop the entry for a file that failed to convert, so it is retried."""
+        self.entries.pop(self._entry_key(file_path), None)
+
+    def outputs(self) -> Iterator[Tuple[str, str]]:
+        """(source path, output path) of every recorded conversion, of any root."""
+        for entry in self.entries.values():
+            yield os.path.join(entry['root'], entry['source']), entry['output']
+
+    def prune(self, seen_paths: Iterable[str]) -> List[str]:
+        """
+        Delete outputs whose sources under this root no longer exist.
+
+        Args:
+            seen_paths: Every input file found in this run
+
+        Returns:
+            Output files that were removed
+        """
+        seen = {self._entry_key(path) for path in seen_paths}
+        stale = {
+            key for key, entry in self.entries.items()
+            if entry['root'] == self.root and key not in seen
+        }
+
+        live_outputs = {
+            entry['output'] for key, entry in self.entries.items() if key not in stale
+        }
+        removed = []
+        for key in stale:
+            output = self.entries.pop(key)['output']
+            if output not in live_outputs and os.path.exists(output):
+                os.remove(output)
+                removed.append(output)
+        return removed
+
+    def save(self):
+        """Write the manifest atomically."""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'entries': self.entries}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def _entry_key(self, file_path: str) -> str:
+        return f'{self.root}:{self.key(file_path)}'
+
+
+def settings_fingerprint(settings: Dict[str, Any]) -> str:
+    """Stable hash of converter settings."""
+    encoded = json.dumps(settings, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()[:16]
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Tool: Method Shapes
+Canonical form of Java methods with their string literals and the names
+they declare replaced by placeholders, so that structurally identical
+methods share one LLM conversion.
+Layer 3: Deterministic Tool
+"""
+
+import re
+from typing import Dict, Iterable, List, Optional
+
+import javalang
+
+
+# Placeholders: __s<n>__ string literal, __n<n>__ declared name, __c__ class name
+_PLACEHOLDER = re.compile(r'__(?:[sn]\d+|c)__')
+
+# Literal contents that come out unchanged in a JS/TS string of any quote style
+_PLAIN_TEXT = re.compile(r'[^\'"`\\$\n]*')
+
+_SIGNATURE_NAME = re.compile(r'(\w+)\s*\(')
+
+
+class MethodShape:
+    """
+    A method (or group of methods) with placeholders for what varies between
+    copies of the same steps: each distinct string literal becomes "__s0__",
+    "__s1__", ..., each name the method declares (its own name, parameters,
+    locals; JavaParser's 'locals') becomes __n0__, __n1__, ... and the class
+    name becomes __c__, numbered by first occurrence.
+
+    Two methods that differ only in those have the same code, hence the same
+    prompt and cache key; restore() puts a method's own values back into the
+    shared conversion. Literals containing quotes, backslashes, '$' or '`'
+    are left in place, since they may be written differently in the output.
+    """
+
+    VERSION = 1
+
+    CLASS = '__c__'
+
+    def __init__(self, code: str, bindings: Dict[str, str]):
+        """
+        Args:
+            code: Java code with placeholders
+            bindings: Placeholder -> the text it stands for
+        """
+        self.code = code
+        self.bindings = bindings
+
+    @classmethod
+    def of(cls, method_code: str, names: Iterable[str], class_name: str = '') -> Optional['MethodShape']:
+        """
+        Shape of Java method code.
+
+        Args:
+            method_code: Java source of one or more methods
+            names: Names the methods declare (JavaParser metadata 'locals')
+            class_name: Name of the enclosing class
+
+        Returns:
+            The shape, or None if the code does not tokenize
+        """
+        try:
+            tokens = list(javalang.tokenizer.tokenize(method_code))
+        except (javalang.tokenizer.LexerError, TypeError):
+            return None
+
+        names = set(names)
+        placeholders: Dict[str, str] = {}
+        bindings: Dict[str, str] = {}
+        replacements = []
+        for token in tokens:
+            if isinstance(token, javalang.tokenizer.String):
+                text = token.value[1:-1]
+                if token.value.startswith('"""') or not _PLAIN_TEXT.fullmatch(text):
+                    continue
+                kind = 's'
+            elif isinstance(token, javalang.tokenizer.Identifier) and token.value in names:
+                text = token.value
+                kind = 'n'
+            else:
+                continue
+
+            placeholder = placeholders.get(kind + text)
+            if placeholder is None:
+                placeholder = f'__{kind}{sum(1 for key in placeholders if key[0] == kind)}__'
+                placeholders[kind + text] = placeholder
+                bindings[placeholder] = text
+            replacements.append((token.position, len(token.value),
+                                 f'"{placeholder}"' if kind == 's' else placeholder))
+
+        if class_name:
+            bindings[cls.CLASS] = class_name
+        return cls(_replace(method_code, replacements), bindings)
+
+    def complete(self, converted: str) -> bool:
+        """True if every string placeholder survived conversion, so restore() loses no literal."""
+        found = set(_PLACEHOLDER.findall(converted))
+        return all(placeholder in found for placeholder in self.bindings if placeholder.startswith('__s'))
+
+    def restore(self, converted: str) -> str:
+        """Replace the placeholders in converted code with this method's values."""
+        return _PLACEHOLDER.sub(lambda match: self.bindings.get(match.group(0), match.group(0)), converted)
+
+    def referenced(self, signatures: str) -> str:
+        """The signature lines (one per method) of methods this code calls."""
+        identifiers = set(re.findall(r'\w+', self.code))
+        return '\n'.join(
+            line for line in signatures.splitlines()
+            if (match := _SIGNATURE_NAME.search(line)) and match.group(1) in identifiers
+        )
+
+
+def method_signature(method_code: str) -> str:
+    """One-line method signature: the declaration without annotations and body."""
+    lines = [line.strip() for line in method_code.splitlines() if not line.strip().startswith('@')]
+    return ' '.join(' '.join(lines).split('{', 1)[0].split())
+
+
+def _replace(code: str, replacements: List) -> str:
+    """Apply (position, length, text) replacements, positions from the javalang tokenizer."""
+    line_starts = [0]
+    for line in code.split('\n'):
+        line_starts.append(line_starts[-1] + len(line) + 1)
+
+    parts = []
+    end = len(code)
+    for position, length, text in reversed(replacements):
+        start = line_starts[position.line - 1] + position.column - 1
+        parts.append(code[start + length:end])
+        parts.append(text)
+        end = start
+    parts.append(code[:end])
+    return ''.join(reversed(parts))
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Tool: Metrics
+Per-conversion stage timings and a process-wide registry rendered in the
+Prometheus text exposition format.
+Layer 3: Deterministic Tool
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Any, Iterable, List, Optional, Tuple
+
+
+class StageTimer:
+    """
+    Collects how long one conversion spends in each stage, and what its LLM
+    calls cost. Stages of concurrent prompts (chunked and hybrid conversions)
+    are summed, so they can add up to more than the wall-clock total.
+
+    Stages: parse, rules, prompt, cache, llm (whole request, including waiting
+    for a generation slot), first_token, generation, postprocess, validate, write.
+    """
+
+    # compacted_tokens: estimated source tokens removed by prompt compaction
+    # repairs: re-prompts for generated code that did not parse
+    # shape_misses: method conversions that lost a literal placeholder and were re-prompted as written
+    COUNTS = ('requests', 'cache_hits', 'prompt_tokens', 'completion_tokens', 'compacted_tokens', 'repairs',
+              'shape_misses')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+        self.counts: Dict[str, int] = dict.fromkeys(self.COUNTS, 0)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage `name`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float):
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def count(self, name: str, amount: int = 1):
+        with self._lock:
+            self.counts[name] += amount
+
+    def merge(self, timings: Dict[str, float]):
+        """Add stages measured elsewhere (e.g. in a parse worker) to this timer and its total."""
+        for name, seconds in timings.items():
+            self.add(name, seconds)
+        self.started -= sum(timings.values())
+
+    def record_response(self, response: Any, durations: bool = True):
+        """
+        Count one Ollama response's tokens and, when the server reports them,
+        its time to first token (load + prompt evaluation) and generation time.
+        """
+        self.count('requests')
+        self.count('prompt_tokens', _field(response, 'prompt_eval_count'))
+        self.count('completion_tokens', _field(response, 'eval_count'))
+        if durations:
+            first_token = _field(response, 'load_duration') + _field(response, 'prompt_eval_duration')
+            generation = _field(response, 'eval_duration')
+            if first_token:
+                self.add('first_token', first_token / 1e9)
+            if generation:
+                self.add('generation', generation / 1e9)
+
+    def report(self) -> Dict[str, Any]:
+        """{'timings': {stage: seconds, 'total': seconds}, 'llm': counts}"""
+        with self._lock:
+            timings = {name: round(seconds, 6) for name, seconds in self.timings.items()}
+            counts = dict(self.counts)
+        timings['total'] = round(time.perf_counter() - self.started, 6)
+        return {'timings': timings, 'llm': counts}
+
+
+def _field(response: Any, name: str) -> int:
+    """Numeric field of an Ollama response (dict or response object), 0 if absent."""
+    try:
+        value = response[name]
+    except (KeyError, TypeError, IndexError):
+        value = getattr(response, name, None)
+    return value or 0
+
+
+class _Metric:
+    """Base for labelled metrics."""
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(label, '')) for label in self.labels)
+
+    def _format_labels(self, key: Tuple[str, ...], extra: str = '') -> str:
+        pairs = [f'{label}="{_escape(value)}"' for label, value in zip(self.labels, key)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter(_Metric):
+    TYPE = 'counter'
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = ()):
+        super().__init__(name, help, labels)
+        self.values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f'{self.name}{self._format_labels(key)} {_number(value)}'
+                    for key, value in sorted(self.values.items())]
+
+
+class Histogram(_Metric):
+    TYPE = 'histogram'
+
+    DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+    def __init__(self, name: str, help: str, labels: Iterable[str] = (),
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # key -> (per-bucket counts, sum, count)
+        self.values: Dict[Tuple[str, ...], List] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            counts, total, count = self.values.get(key) or ([0] * len(self.buckets), 0.0, 0)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self.values[key] = [counts, total + value, count + 1]
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self.values.items()):
+                for bound, bucket in zip(self.buckets, counts):
+                    labels = self._format_labels(key, f'le="{_number(bound)}"')
+                    lines.append(f'{self.name}_bucket{labels} {bucket}')
+                labels = self._format_labels(key, 'le="+Inf"')
+                lines.append(f'{self.name}_bucket{labels} {count}')
+                lines.append(f'{self.name}_sum{self._format_labels(key)} {_number(total)}')
+                lines.append(f'{self.name}_count{self._format_labels(key)} {count}')
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at scrape time."""
+
+    TYPE = 'gauge'
+
+    def __init__(self, name: str, help: str, callback: Callable[[], float]):
+        super().__init__(name, help)
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        return [] if value is None else [f'{self.name} {_number(value)}']
+
+
+class MetricsRegistry:
+    """Named metrics of one process, rendered for a Prometheus scrape."""
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, help: str, labels: Iterable[str] = ()) -> Counter:
+        return self._register(Counter(name, help, labels))
+
+    def histogram(self, name: str, help: str, labels: Iterable[str] = (),
+                  buckets: Iterable[float] = Histogram.DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, buckets))
+
+    def gauge(self, name: str, help: str, callback: Callable[[], float]) -> Gauge:
+        """Register (or replace) a callback gauge."""
+        gauge = Gauge(name, help, callback)
+        with self._lock:
+            self.metrics[name] = gauge
+        return gauge
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            samples = metric.samples()
+            if not samples:
+                continue
+            lines.append(f'# HELP {metric.name} {metric.help}')
+            lines.append(f'# TYPE {metric.name} {metric.TYPE}')
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self.metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self.metrics[metric.name] = metric
+            return metric
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _number(value: float) -> str:
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    'converter_stage_seconds', 'Seconds spent per conversion stage', ['stage']
+)
+CONVERSIONS = REGISTRY.counter(
+    'converter_conversions_total', 'Conversions by strategy and outcome', ['strategy', 'outcome']
+)
+LLM_REQUESTS = REGISTRY.counter(
+    'converter_llm_requests_total', 'LLM prompts answered by the model or the cache', ['source']
+)
+VALIDATIONS = REGISTRY.counter(
+    'converter_validations_total', 'Converted files by validation outcome', ['outcome']
+)
+REPAIRS = REGISTRY.counter(
+    'converter_repairs_total', 'Re-prompts issued for generated code that did not parse'
+)
+MODEL_REQUESTS = REGISTRY.counter(
+    'converter_model_requests_total', 'LLM prompts answered per model (after routing)', ['model']
+)
+LLM_TOKENS = REGISTRY.counter(
+    'converter_llm_tokens_total', 'Tokens reported by the model (compacted: estimated tokens saved)', ['kind']
+)
+
+
+def record_conversion(timer: StageTimer, strategy: Optional[str], success: bool,
+                      model: Optional[str] = None, validation: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Publish one finished conversion to the registry.
+    `model` is the model its LLM prompts were routed to, if any, and
+    `validation` the outcome of validating its output: 'valid', 'fixed' or 'invalid'.
+
+    Returns:
+        The timer's report, for inclusion in the result
+    """
+    report = timer.report()
+    for stage, seconds in report['timings'].items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+    CONVERSIONS.inc(strategy=strategy or 'none', outcome='success' if success else 'failure')
+    counts = report['llm']
+    LLM_REQUESTS.inc(counts['requests'], source='model')
+    LLM_REQUESTS.inc(counts['cache_hits'], source='cache')
+    if model:
+        MODEL_REQUESTS.inc(counts['requests'], model=model)
+    if validation:
+        VALIDATIONS.inc(outcome=validation)
+    REPAIRS.inc(counts['repairs'])
+    LLM_TOKENS.inc(counts['prompt_tokens'], kind='prompt')
+    LLM_TOKENS.inc(counts['completion_tokens'], kind='completion')
+    LLM_TOKENS.inc(counts['compacted_tokens'], kind='compacted')
+    return report
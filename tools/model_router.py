@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tool: Model Router
+Creates the process-wide LLM backends from backend specs and sends each
+file to a small, fast model or the large one, based on parser metrics.
+Layer 3: Deterministic Tool
+"""
+
+import os
+import threading
+from typing import Dict, Any, List, Optional
+
+from tools.llm_backends import LLMBackend, OpenAICompatibleBackend, StubBackend
+from tools.rule_converter import RuleConverter
+
+
+class ModelRouter:
+    """
+    Pick a model tier per file. A file goes to the 'small' tier when it is
+    simple on every metric: few methods, few calls the mapping table does not
+    cover, and little source. Everything else, and everything when no small
+    model is configured, goes to the 'large' tier.
+    """
+
+    LARGE = 'large'
+    SMALL = 'small'
+
+    # Default limits for the small tier (inclusive)
+    MAX_METHODS = 6
+    MAX_UNMAPPED_CALLS = 5
+    MAX_SOURCE_TOKENS = 1000
+
+    def __init__(self, model: str = 'codellama', backend: str = 'ollama',
+                 small_model: Optional[str] = None, small_backend: Optional[str] = None,
+                 max_methods: int = MAX_METHODS, max_unmapped_calls: int = MAX_UNMAPPED_CALLS,
+                 max_source_tokens: int = MAX_SOURCE_TOKENS):
+        """
+        Args:
+            model: Large model, used for complex files and shared helpers
+            backend: Backend spec of the large model (see get_backend)
+            small_model: Small model for simple files (None disables routing)
+            small_backend: Backend spec of the small model (default: backend)
+            max_methods: Most methods a file may have to use the small model
+            max_unmapped_calls: Most calls outside the mapping table
+            max_source_tokens: Most estimated tokens of compacted source
+        """
+        self.tiers = {self.LARGE: {'model': model, 'backend': backend}}
+        if small_model:
+            self.tiers[self.SMALL] = {'model': small_model, 'backend': small_backend or backend}
+        self.max_methods = max_methods
+        self.max_unmapped_calls = max_unmapped_calls
+        self.max_source_tokens = max_source_tokens
+
+    @classmethod
+    def from_env(cls, model: Optional[str] = None, backend: Optional[str] = None,
+                 small_model: Optional[str] = None, small_backend: Optional[str] = None) -> 'ModelRouter':
+        """
+        Router configured from CONVERTER_MODEL, CONVERTER_LLM_BACKEND,
+        CONVERTER_SMALL_MODEL and CONVERTER_SMALL_LLM_BACKEND; arguments that
+        are not None take precedence.
+        """
+        return cls(
+            model=model or os.environ.get('CONVERTER_MODEL', 'codellama'),
+            backend=backend or os.environ.get('CONVERTER_LLM_BACKEND', 'ollama'),
+            small_model=small_model or os.environ.get('CONVERTER_SMALL_MODEL') or None,
+            small_backend=small_backend or os.environ.get('CONVERTER_SMALL_LLM_BACKEND') or None
+        )
+
+    def route(self, metadata: Dict[str, Any], source_tokens: int) -> str:
+        """
+        Choose the tier for a parsed file.
+
+        Args:
+            metadata: Parsed metadata from JavaParser
+            source_tokens: Estimated tokens of the source as sent in a prompt
+
+        Returns:
+            'small' or 'large'
+        """
+        if self.SMALL not in self.tiers:
+            return self.LARGE
+        metrics = self.metrics(metadata, source_tokens)
+        if (metrics['methods'] <= self.max_methods
+                and metrics['unmapped_calls'] <= self.max_unmapped_calls
+                and metrics['source_tokens'] <= self.max_source_tokens):
+            return self.SMALL
+        return self.LARGE
+
+    @staticmethod
+    def metrics(metadata: Dict[str, Any], source_tokens: int) -> Dict[str, int]:
+        """Complexity metrics the routing decision is based on."""
+        calls = [call for method in metadata.get('methods', []) for call in method.get('selenium_calls', [])]
+        return {
+            'methods': len(metadata.get('methods', [])),
+            'unmapped_calls': sum(1 for call in calls if call['method'] not in RuleConverter.MAPPED_CALLS),
+            'source_tokens': source_tokens,
+        }
+
+    def settings(self) -> Dict[str, Any]:
+        """Everything that influences which model converts a file, for fingerprints."""
+        return {
+            'tiers': {tier: route['model'] for tier, route in self.tiers.items()},
+            'limits': [self.max_methods, self.max_unmapped_calls, self.max_source_tokens],
+        }
+
+    def describe(self) -> List[Dict[str, str]]:
+        """Tiers with their model and backend, for health output."""
+        return [dict(route, tier=tier) for tier, route in self.tiers.items()]
+
+
+_backends: Dict[str, LLMBackend] = {}
+_backends_lock = threading.Lock()
+
+
+def get_backend(spec: str = 'ollama') -> LLMBackend:
+    """
+    Process-wide backend for a spec, created on first use:
+
+    - 'ollama': the shared client from get_default_client (OLLAMA_HOST)
+    - 'ollama:http://host:11434': an Ollama server
+    - 'openai:http://host:8080/v1': an OpenAI-compatible server (llama.cpp,
+      vLLM, ...); CONVERTER_LLM_API_KEY is sent as bearer token if set
+    - 'stub': offline StubBackend, for tests and dry runs
+
+    Concurrency, timeout, retries and gather window come from
+    CONVERTER_OLLAMA_CONCURRENCY, CONVERTER_OLLAMA_TIMEOUT, CONVERTER_OLLAMA_RETRIES
+    and CONVERTER_LLM_GATHER_MS for every backend; the keep-alive of Ollama
+    backends from CONVERTER_LLM_KEEP_ALIVE.
+    """
+    # Imported on first use: the ollama package and its HTTP stack are most of the startup time
+    from tools.ollama_client import OllamaClient, get_default_client, parse_keep_alive
+
+    kind, _, url = spec.partition(':')
+    if kind == OllamaClient.NAME and not url:
+        return get_default_client()
+
+    with _backends_lock:
+        backend = _backends.get(spec)
+        if backend is None:
+            settings = {
+                'max_concurrency': int(os.environ.get('CONVERTER_OLLAMA_CONCURRENCY', '2')),
+                'timeout': float(os.environ.get('CONVERTER_OLLAMA_TIMEOUT', '300')),
+                'retries': int(os.environ.get('CONVERTER_OLLAMA_RETRIES', '2')),
+                'gather_window': float(os.environ.get('CONVERTER_LLM_GATHER_MS', '0')) / 1000,
+            }
+            if kind == OllamaClient.NAME:
+                backend = OllamaClient(host=url, keep_alive=parse_keep_alive(os.environ.get('CONVERTER_LLM_KEEP_ALIVE')),
+                                       **settings)
+            elif kind == OpenAICompatibleBackend.NAME:
+                backend = OpenAICompatibleBackend(url or 'http://localhost:8080/v1',
+                                                  os.environ.get('CONVERTER_LLM_API_KEY'), **settings)
+            elif kind == StubBackend.NAME:
+                backend = StubBackend()
+            else:
+                raise ValueError(f"Unknown LLM backend '{spec}' (use ollama, openai:<url> or stub)")
+            _backends[spec] = backend
+        return backend
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tool: Model Warmer
+Keeps the models a converter uses resident on their servers: loads them
+(and prefills the static prompt prefix) at startup, then pings the ones
+that have been idle, so no user request pays a cold model load.
+Layer 3: Deterministic Tool
+"""
+
+import threading
+from typing import Dict, Iterable, Optional
+
+from tools.llm_converter import LLMConverter
+
+
+class ModelWarmer:
+    """
+    Warm-up of every distinct (backend, model) of a set of LLM converters.
+
+    warm() loads each model with a one-token generation carrying the system
+    prompt and static prompt prefixes (LLMConverter.warm). start() does that
+    in a background thread, then every `interval` seconds re-warms the
+    models whose backend has been idle that long: set it below the server's
+    keep-alive (Ollama: 5 minutes unless CONVERTER_LLM_KEEP_ALIVE says
+    otherwise), and a model is unloaded neither for idleness nor, for long,
+    when another client's model pushed it out.
+    """
+
+    DEFAULT_INTERVAL = 240.0
+
+    def __init__(self, converters: Iterable[LLMConverter], interval: float = DEFAULT_INTERVAL):
+        """
+        Args:
+            converters: LLM converters whose models to keep loaded
+            interval: Idle seconds after which a model is pinged (0: warm once, no pings)
+        """
+        self.targets = list({(id(converter.client), converter.model): converter
+                             for converter in converters}.values())
+        self.interval = interval
+        self.warmups = 0
+        self.failures = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def warm(self, idle_only: bool = False) -> Dict[str, Optional[float]]:
+        """
+        Warm every model (or only those idle for `interval` seconds).
+
+        Returns:
+            Seconds each warm-up took by 'backend/model', None where it failed
+        """
+        results = {}
+        for converter in self.targets:
+            if idle_only and converter.client.idle_seconds() < self.interval:
+                continue
+            name = f'{converter.client.describe()}/{converter.model}'
+            try:
+                results[name] = converter.warm()
+                self.warmups += 1
+            except Exception:
+                # The server may be down for now; health checks report that, the next ping retries
+                results[name] = None
+                self.failures += 1
+        return results
+
+    def start(self):
+        """Warm all models in a background thread, then keep pinging idle ones."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='model-warmer', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop pinging (a warm-up in progress finishes in the background)."""
+        self._stop.set()
+
+    def _run(self):
+        for name, seconds in self.warm().items():
+            if seconds is None:
+                print(f"Model {name} could not be loaded; retrying when idle")
+            else:
+                print(f"Model {name} loaded in {seconds:.1f}s")
+        if not self.interval:
+            return
+        # Check four times per interval, so a model is pinged at most a quarter interval late
+        while not self._stop.wait(self.interval / 4):
+            self.warm(idle_only=True)
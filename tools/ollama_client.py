@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Tool: Ollama Client
+Shared, connection-pooled Ollama client that bounds concurrent generations,
+applies timeouts, retries transient failures and caches health checks.
+Layer 3: Deterministic Tool
+"""
+
+import os
+import threading
+from typing import Dict, Any, Iterator, Optional, Union
+
+import httpx
+import ollama
+
+from tools.llm_backends import BackendUnavailable, LLMBackend
+
+# Kept for callers that catch the Ollama-specific name
+OllamaUnavailable = BackendUnavailable
+
+
+class OllamaClient(LLMBackend):
+    """
+    One HTTP connection pool per process, shared by every converter.
+    Generations beyond max_concurrency wait for a slot instead of queueing
+    inside the Ollama server, where they would only time out.
+
+    Every generation carries keep_alive when set, so the model stays loaded
+    for that long after it (Ollama unloads idle models after 5 minutes by
+    default, and the next request pays the load).
+    """
+
+    NAME = 'ollama'
+
+    # HTTP statuses worth retrying: overloaded, or the model is still loading
+    RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+    def __init__(self, host: Optional[str] = None, max_concurrency: int = 2,
+                 timeout: float = 300.0, connect_timeout: float = 5.0,
+                 retries: int = 2, backoff: float = 1.0,
+                 health_ttl: float = 10.0, health_timeout: float = 2.0, gather_window: float = 0.0,
+                 keep_alive: Union[float, str, None] = None):
+        """
+        Args:
+            host: Ollama URL (defaults to OLLAMA_HOST or http://localhost:11434)
+            max_concurrency: Generations in flight at once; match OLLAMA_NUM_PARALLEL
+            timeout: Seconds a generation may take, and may wait for a slot
+            connect_timeout: Seconds to establish a connection
+            retries: Extra attempts after a transient failure
+            backoff: Base delay in seconds, doubled per attempt, with full jitter
+            health_ttl: Seconds a health check result is reused
+            health_timeout: Seconds a health check may take
+            gather_window: Seconds a burst of generations is gathered before dispatching
+            keep_alive: How long the model stays loaded after a generation: seconds
+                (-1: forever) or a duration such as '30m' (None: the server's default)
+        """
+        super().__init__(max_concurrency, timeout, retries, backoff, health_ttl, gather_window)
+        self.host = host
+        self.keep_alive = keep_alive
+
+        limits = httpx.Limits(max_connections=max_concurrency + 2,
+                              max_keepalive_connections=max_concurrency + 2)
+        self._client = ollama.Client(
+            host=host,
+            timeout=httpx.Timeout(timeout, connect=connect_timeout),
+            limits=limits
+        )
+        self._health_client = ollama.Client(
+            host=host,
+            timeout=httpx.Timeout(health_timeout, connect=health_timeout)
+        )
+
+    def describe(self) -> str:
+        return f'{self.NAME}:{self.host}' if self.host else self.NAME
+
+    def _generate(self, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        return self._client.generate(stream=False, keep_alive=self.keep_alive, **kwargs)
+
+    def _stream(self, kwargs: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        return self._client.generate(stream=True, keep_alive=self.keep_alive, **kwargs)
+
+    def _ping(self):
+        self._health_client.list()
+
+    def _is_transient(self, error: Exception) -> bool:
+        if isinstance(error, ollama.ResponseError):
+            return error.status_code in self.RETRY_STATUSES
+        return isinstance(error, (httpx.TransportError, ConnectionError))
+
+
+def parse_keep_alive(value: Optional[str]) -> Union[float, str, None]:
+    """Keep-alive setting from the environment: a number of seconds, a duration ('30m') or unset."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+_default_client: Optional[OllamaClient] = None
+_default_lock = threading.Lock()
+
+
+def get_default_client() -> OllamaClient:
+    """
+    Process-wide client configured from the environment:
+    OLLAMA_HOST, CONVERTER_OLLAMA_CONCURRENCY, CONVERTER_OLLAMA_TIMEOUT,
+    CONVERTER_OLLAMA_RETRIES, CONVERTER_LLM_GATHER_MS and CONVERTER_LLM_KEEP_ALIVE.
+    """
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = OllamaClient(
+                host=os.environ.get('OLLAMA_HOST'),
+                max_concurrency=int(os.environ.get('CONVERTER_OLLAMA_CONCURRENCY', '2')),
+                timeout=float(os.environ.get('CONVERTER_OLLAMA_TIMEOUT', '300')),
+                retries=int(os.environ.get('CONVERTER_OLLAMA_RETRIES', '2')),
+                gather_window=float(os.environ.get('CONVERTER_LLM_GATHER_MS', '0')) / 1000,
+                keep_alive=parse_keep_alive(os.environ.get('CONVERTER_LLM_KEEP_ALIVE'))
+            )
+        return _default_client
+
+
+if __name__ == '__main__':
+    client = get_default_client()
+    print(client.health())
+    print(client.stats())
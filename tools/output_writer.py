@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Tool: Output Writer
+Writes converted files: mirroring the input tree, with collision-safe
+names, atomically (temp file + rename) and only when the content changed,
+or into a single zip archive (a file or stdout) instead.
+Layer 3: Deterministic Tool
+"""
+
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import zipfile
+from typing import Dict, Optional
+
+
+# Temporary files are created 0600; outputs get the permissions a plain open() would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class OutputWriter:
+    """
+    Destination of every file a converter produces.
+
+    With a source root, an output keeps its source's directory relative to
+    the root (src/a/LoginTest.java -> <output>/src/a/login-test.spec.ts);
+    without one, or for sources outside it, outputs go flat into the output
+    directory. The first source to claim or write an output path owns it:
+    another source mapping to the same path gets login-test-2.spec.ts and so
+    on, instead of silently overwriting it.
+
+    Files are written to a temporary file in the target directory and
+    renamed over the target, so readers and concurrent runs never see a
+    partial file; a target that already holds the same bytes is left
+    untouched (no rewrite, no mtime change for watchers and build tools).
+
+    With an archive ('-' for stdout), outputs become entries of one zip
+    file instead; close() finishes it.
+    """
+
+    STDOUT = '-'
+
+    def __init__(self, output_dir: str, source_root: Optional[str] = None,
+                 archive: Optional[str] = None):
+        """
+        Args:
+            output_dir: Directory outputs are written under
+            source_root: Input directory whose layout outputs mirror (None: flat)
+            archive: Zip file to write instead of files, or '-' for stdout
+        """
+        self.output_dir = output_dir
+        self.source_root = os.path.abspath(source_root) if source_root else None
+        self.archive = archive
+        self.written = 0
+        self.unchanged = 0
+        self._owners: Dict[str, str] = {}
+        self._directories = set()
+        self._zip: Optional[zipfile.ZipFile] = None
+        self._entries: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def path_for(self, source: str, name: str) -> str:
+        """
+        Where the output `name` of a source goes, before any collision suffix.
+
+        Args:
+            source: Source file path (or the name a web client gave)
+            name: Output file name, e.g. login-test.spec.ts
+        """
+        relative = name
+        if self.source_root and source:
+            directory = os.path.relpath(os.path.dirname(os.path.abspath(source)), self.source_root)
+            if not directory.startswith(os.pardir):
+                relative = os.path.normpath(os.path.join(directory, name))
+        return self._location(relative)
+
+    def claim(self, source: str, name: str) -> str:
+        """
+        Reserve the output `name` of a source before it is written.
+
+        Parallel conversions claim their outputs in the order they are
+        submitted, so which source gets a collision suffix does not depend
+        on which one finishes first; write() then returns the same path.
+
+        Returns:
+            The path the output will be written to
+        """
+        return self._claim(self.path_for(source, name), source)
+
+    def reserve(self, path: str, source: str):
+        """
+        Give a source the output path an earlier run wrote it to, so no other
+        source's output takes that name (the first reservation of a path wins).
+        """
+        owner = os.path.abspath(source) if source else ''
+        with self._lock:
+            self._owners.setdefault(path, owner)
+
+    def write(self, content: str, source: str, name: str) -> str:
+        """
+        Write the output `name` of a source.
+
+        Returns:
+            The path written (or archive entry name)
+        """
+        path = self._claim(self.path_for(source, name), source)
+        self._put(path, content.encode('utf-8'))
+        return path
+
+    def copy(self, source: str) -> str:
+        """Copy a source file unchanged to its mirrored place; return the path written."""
+        path = self._claim(self.path_for(source, os.path.basename(source)), source)
+        if self.archive is not None:
+            with open(source, 'rb') as f:
+                self._put(path, f.read())
+        elif _same_file_content(source, path):
+            self._count(False)
+        else:
+            self._replace(path, lambda temp: shutil.copyfile(source, temp))
+        return path
+
+    def close(self):
+        """Finish the archive, if any."""
+        with self._lock:
+            if self._zip is not None:
+                self._zip.close()
+                self._zip = None
+                if self.archive == self.STDOUT:
+                    sys.__stdout__.buffer.flush()
+
+    def _location(self, relative: str) -> str:
+        if self.archive is not None:
+            return relative.replace(os.sep, '/')
+        return os.path.join(self.output_dir, relative)
+
+    def _claim(self, path: str, source: str) -> str:
+        """The path itself if free or owned by source, else the first free numbered variant."""
+        owner = os.path.abspath(source) if source else ''
+        stem, extension = _split_extension(path)
+        candidate, number = path, 1
+        with self._lock:
+            while self._owners.setdefault(candidate, owner) != owner:
+                number += 1
+                candidate = f'{stem}-{number}{extension}'
+        return candidate
+
+    def _put(self, path: str, data: bytes):
+        if self.archive is None:
+            if _same_content(path, data):
+                self._count(False)
+            else:
+                self._replace(path, lambda temp: _write_bytes(temp, data))
+            return
+
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            if self._entries.get(path) == digest:
+                self.unchanged += 1
+                return
+            if self._zip is None:
+                # The process's real stdout, even while prints are redirected to stderr
+                target = sys.__stdout__.buffer if self.archive == self.STDOUT else self.archive
+                if self.archive != self.STDOUT and os.path.dirname(target):
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                self._zip = zipfile.ZipFile(target, 'w', zipfile.ZIP_DEFLATED)
+            self._zip.writestr(path, data)
+            self._entries[path] = digest
+            self.written += 1
+
+    def _replace(self, path: str, fill):
+        """Create the file through a temporary sibling and an atomic rename."""
+        directory = os.path.dirname(path) or '.'
+        with self._lock:
+            known = directory in self._directories
+        if not known:
+            os.makedirs(directory, exist_ok=True)
+            with self._lock:
+                self._directories.add(directory)
+
+        descriptor, temp = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp', dir=directory)
+        os.close(descriptor)
+        try:
+            fill(temp)
+            os.chmod(temp, 0o666 & ~_UMASK)
+            os.replace(temp, path)
+        except BaseException:
+            if os.path.exists(temp):
+                os.remove(temp)
+            raise
+        self._count(True)
+
+    def _count(self, written: bool):
+        with self._lock:
+            if written:
+                self.written += 1
+            else:
+                self.unchanged += 1
+
+
+def _split_extension(path: str):
+    """('dir/login-test', '.spec.ts') for 'dir/login-test.spec.ts'."""
+    directory, name = os.path.split(path)
+    stem, dot, extension = name.partition('.')
+    return os.path.join(directory, stem), dot + extension
+
+
+def _write_bytes(path: str, data: bytes):
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def _same_content(path: str, data: bytes) -> bool:
+    """True if path exists and holds exactly data (the size is compared first)."""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except OSError:
+        return False
+
+
+def _same_file_content(source: str, path: str) -> bool:
+    try:
+        if os.path.getsize(source) != os.path.getsize(path):
+            return False
+        with open(source, 'rb') as f:
+            return _same_content(path, f.read())
+    except OSError:
+        return False
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Tool: Parse Cache
+Content-addressed cache of JavaParser metadata and RuleConverter plans, so
+that a file is tokenized and parsed once per change: in memory for the
+process, and optionally on disk across runs.
+Layer 3: Deterministic Tool
+"""
+
+import base64
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from tools.conversion_cache import ConversionCache
+from tools.java_parser import JavaParser
+from tools.metrics import StageTimer
+from tools.rule_converter import RuleConverter
+
+
+class ParseCache:
+    """
+    Parse results by source hash: an LRU of compressed JSON (about a fifth
+    of the plain size; decoding takes ~0.1 ms against ~10 ms for a parse)
+    bounded by max_bytes, in front of an optional SQLite store (a
+    ConversionCache file) holding the same encoding.
+
+    Keys hash the exact source with JavaParser.VERSION, and for plans with
+    RuleConverter.VERSION and the target language, so a parser or rules
+    change never serves a stale result. Every lookup decodes a fresh copy:
+    callers may modify what they get. Sources that do not parse are not cached.
+    """
+
+    DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, store_path: Optional[str] = None):
+        """
+        Args:
+            max_bytes: Size of the in-memory entries before LRU eviction
+            store_path: SQLite file persisting entries across runs (None: memory only)
+        """
+        self.max_bytes = max_bytes
+        self.store_path = store_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._store: Optional[ConversionCache] = None
+        self._store_pid = None
+
+    @staticmethod
+    def make_key(java_source: str, *parts: Any) -> str:
+        """Hex SHA-256 digest of a source and what its parse result depends on."""
+        digest = hashlib.sha256(json.dumps(parts, default=str).encode('utf-8'))
+        digest.update(java_source.encode('utf-8', errors='surrogatepass'))
+        return digest.hexdigest()
+
+    def parse(self, java_source: str, file_name: str = '', rules: Optional[RuleConverter] = None,
+              timer: Optional[StageTimer] = None) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """
+        Parse Java source, or look up its earlier parse.
+
+        Args:
+            java_source: Java source code
+            file_name: File name recorded in the metadata
+            rules: Also return the rule-based plan of this converter
+            timer: Times the 'parse' and 'rules' stages
+
+        Returns:
+            (JavaParser metadata, RuleConverter plan or None without rules)
+
+        Raises:
+            ValueError: The source does not parse
+        """
+        timer = timer or StageTimer()
+        metadata_key = self.make_key(java_source, 'metadata', JavaParser.VERSION)
+        plan_key = rules and self.make_key(java_source, 'plan', JavaParser.VERSION,
+                                           RuleConverter.VERSION, rules.target_language)
+
+        with timer.stage('parse'):
+            metadata = self.get(metadata_key)
+        plan = self.get(plan_key) if rules else None
+        if metadata is not None and (plan is not None or not rules):
+            metadata['file_name'] = file_name
+            return metadata, plan
+
+        parser = JavaParser(java_source, file_name)
+        with timer.stage('parse'):
+            metadata = parser.parse()
+        self.put(metadata_key, metadata)
+        if rules:
+            with timer.stage('rules'):
+                plan = rules.plan(parser.tree, metadata)
+            self.put(plan_key, plan)
+        return metadata, plan
+
+    def get(self, key: str) -> Optional[Any]:
+        """Decoded entry for key, or None on a miss."""
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if value is None:
+            store = self._open_store()
+            value = store.get(key) if store is not None else None
+            if value is not None:
+                self._remember(key, value)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(zlib.decompress(base64.b64decode(value)))
+
+    def put(self, key: str, value: Any):
+        """Store a JSON-serializable value in memory and, if configured, on disk."""
+        encoded = base64.b64encode(
+            zlib.compress(json.dumps(value, separators=(',', ':')).encode('utf-8'))
+        ).decode('ascii')
+        self._remember(key, encoded)
+        store = self._open_store()
+        if store is not None:
+            store.put(key, encoded)
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for this process and the in-memory size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+    def _remember(self, key: str, encoded: str):
+        size = len(encoded)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._entries[key] = encoded
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def _open_store(self) -> Optional[ConversionCache]:
+        """The on-disk store, reopened in a forked worker process (SQLite connections do not survive fork)."""
+        if self.store_path is None:
+            return None
+        with self._lock:
+            if self._store is None or self._store_pid != os.getpid():
+                self._store = ConversionCache(self.store_path)
+                self._store_pid = os.getpid()
+            return self._store
+
+
+_cache: Optional[ParseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache(store_path: Optional[str] = None) -> ParseCache:
+    """
+    The process-wide parse cache (size from CONVERTER_PARSE_CACHE_BYTES).
+
+    Args:
+        store_path: On-disk store to use if none is attached yet
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ParseCache(int(os.environ.get('CONVERTER_PARSE_CACHE_BYTES', ParseCache.DEFAULT_MAX_BYTES)))
+        if store_path and _cache.store_path is None:
+            _cache.store_path = store_path
+        return _cache
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Tool: Project Index
+Project-wide index of Java classes, used to convert shared page objects and
+base classes once and give every test prompt compact signatures instead.
+Layer 3: Deterministic Tool
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Any, Iterable, List, Optional, Set
+
+from tools.method_shapes import method_signature
+from tools.parse_cache import get_parse_cache
+
+
+HOOK_ANNOTATIONS = {'BeforeMethod', 'AfterMethod', 'BeforeClass', 'AfterClass',
+                    'BeforeSuite', 'AfterSuite', 'BeforeTest', 'AfterTest'}
+
+_IDENTIFIER = re.compile(r'\b[A-Z][A-Za-z0-9_]*\b')
+
+# Playwright output: exported classes, functions and constants, and class members
+_EXPORT = re.compile(
+    r'^(?:export\s+(?:default\s+)?|module\.exports\s*=\s*)?'
+    r'((?:abstract\s+)?class\s+\w+(?:\s+extends\s+[\w.]+)?'
+    r'|(?:async\s+)?function\s+\w+\s*\([^)]*\)(?:\s*:\s*[^{]+)?'
+    r'|(?:const|let)\s+\w+\s*(?::\s*[^=]+)?=\s*[\w.]+\.extend(?:<[^>]*>)?)'
+)
+_MEMBER = re.compile(
+    r'^\s+((?:(?:public|private|protected|readonly|static|async)\s+)*'
+    r'(?!if\b|for\b|while\b|switch\b|catch\b|return\b|await\b)'
+    r'\w+\s*\([^)]*\)(?:\s*:\s*[^{]+)?)\s*\{'
+)
+_FIELD = re.compile(r'^\s+((?:readonly\s+|public\s+|private\s+)*\w+\s*:\s*[\w<>\[\]]+);')
+
+
+class ProjectIndex:
+    """
+    Classes of a whole source tree: which files declare them, which are
+    tests, and which other classes each file references.
+
+    Shared helpers are non-test classes that other files reference, e.g.
+    page objects and BasePage/BaseTest. They are converted once (in dependency
+    order) before the tests; each test prompt then only carries the converted
+    helpers' signatures and import lines.
+
+    Only helpers are kept: a test adds the names it uses to one set and is
+    dropped, and resolve() drops the non-test files nobody references, so
+    memory grows with the helpers and the distinct class names used, not
+    with the number of tests.
+    """
+
+    def __init__(self, extension: str = '.ts'):
+        """
+        Args:
+            extension: Extension of converted helper modules ('.ts' or '.js')
+        """
+        self.extension = extension
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.classes: Dict[str, str] = {}
+        self.converted: Dict[str, Dict[str, Any]] = {}
+        # Names other files use, until resolve()
+        self._referenced: Set[str] = set()
+
+    @classmethod
+    def build(cls, file_paths: Iterable[str], extension: str = '.ts', jobs: int = 1,
+              parse_store: Optional[str] = None) -> 'ProjectIndex':
+        """
+        Index Java files, parsing them in a process pool when jobs > 1.
+
+        Files that fail to parse are left out of the index. Parses are cached
+        (see ParseCache), on disk in parse_store if given. Entries are added
+        as the workers finish them, so only helper candidates stay in memory.
+        """
+        file_paths = list(file_paths)
+        index = cls(extension)
+        if jobs > 1 and len(file_paths) > 1:
+            with ProcessPoolExecutor(jobs) as pool:
+                entries = pool.map(_index_file, file_paths, [parse_store] * len(file_paths), chunksize=16)
+                for entry in entries:
+                    if entry is not None:
+                        index.add(entry)
+        else:
+            for path in file_paths:
+                entry = _index_file(path, parse_store)
+                if entry is not None:
+                    index.add(entry)
+        index.resolve()
+        return index
+
+    def add(self, entry: Dict[str, Any]):
+        """Add the result of index_source(); tests only contribute the names they use."""
+        own = set(entry['classes'])
+        self._referenced.update(name for name in entry['identifiers'] if name not in own)
+        if entry['is_test']:
+            return
+        self.files[entry['path']] = entry
+        for name in entry['classes']:
+            self.classes.setdefault(name, entry['path'])
+
+    def resolve(self):
+        """Keep only shared helpers, with their references to each other."""
+        self.files = {
+            path: entry for path, entry in self.files.items()
+            if set(entry['classes']) & self._referenced
+        }
+        self.classes = {name: path for name, path in self.classes.items() if path in self.files}
+        self._referenced = set()
+
+        for entry in self.files.values():
+            own = set(entry['classes'])
+            entry['references'] = sorted(
+                name for name in entry.pop('identifiers', entry.get('references', []))
+                if name in self.classes and name not in own
+            )
+            entry['shared'] = True
+
+    def helpers(self) -> List[List[str]]:
+        """
+        Paths of shared helper files in dependency order: each level only
+        references helpers of earlier levels (cycles end up in one level).
+        """
+        pending = {path for path, entry in self.files.items() if entry['shared']}
+        done: Set[str] = set()
+        levels = []
+        while pending:
+            level = sorted(
+                path for path in pending
+                if all(self.classes[name] in done or self.classes[name] == path
+                       or self.classes[name] not in pending
+                       for name in self.files[path]['references'])
+            ) or sorted(pending)
+            levels.append(level)
+            done.update(level)
+            pending.difference_update(level)
+        return levels
+
+    def is_helper(self, file_path: str) -> bool:
+        entry = self.files.get(file_path)
+        return entry is not None and entry['shared']
+
+    def helper_kind(self, file_path: str) -> str:
+        """'base_test' for shared classes with TestNG hooks, else 'page_object'."""
+        return 'base_test' if self.files[file_path]['has_hooks'] else 'page_object'
+
+    def module_name(self, file_path: str) -> str:
+        """Output file name of a converted helper, e.g. login-page.ts."""
+        return _kebab(Path(file_path).stem) + self.extension
+
+    def record(self, file_path: str, converted_code: str, output_path: Optional[str] = None):
+        """
+        Remember a converted helper and extract its signatures.
+
+        Args:
+            file_path: Java source of the helper
+            converted_code: Its Playwright module
+            output_path: Where the module was written (default: module_name, flat)
+        """
+        entry = self.files[file_path]
+        module = os.path.splitext(output_path or self.module_name(file_path))[0]
+        kind = self.helper_kind(file_path)
+        signatures = module_signatures(converted_code) or entry['signatures']
+
+        for name in entry['classes']:
+            self.converted[name] = {
+                'kind': kind,
+                'module': module,
+                'signatures': signatures,
+            }
+
+    def import_line(self, name: str, importer: Optional[str] = None) -> str:
+        """
+        Import statement of a converted helper class.
+
+        Args:
+            name: Helper class name
+            importer: Output path of the importing file (default: next to the helper)
+        """
+        info = self.converted[name]
+        if importer is None:
+            specifier = os.path.basename(info['module'])
+        else:
+            specifier = os.path.relpath(info['module'], os.path.dirname(importer) or '.')
+        specifier = specifier.replace(os.sep, '/')
+        if not specifier.startswith('.'):
+            specifier = './' + specifier
+
+        members = 'test, expect' if info['kind'] == 'base_test' else name
+        if self.extension == '.ts':
+            return f"import {{ {members} }} from '{specifier}';"
+        return f"const {{ {members} }} = require('{specifier}');"
+
+    def context_for(self, java_source: str, own_classes: Iterable[str] = (),
+                    importer: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Prompt context for a file: the converted helpers it uses, directly
+        or through their superclasses.
+
+        Args:
+            java_source: Java source of the file
+            own_classes: Classes the file declares itself
+            importer: Output path of the file, which import paths are relative to
+
+        Returns:
+            {'prompt': text for the prompt ('' if none), 'imports': import
+            line by directly used class, 'classes': all helper classes
+            involved, 'base_test': whether the file extends a base test}
+        """
+        own = set(own_classes)
+        names = [name for name in sorted(set(_IDENTIFIER.findall(java_source)))
+                 if name in self.classes and name not in own]
+
+        # Follow references of the helpers themselves (e.g. LoginPage -> BasePage)
+        used: List[str] = []
+        queue = list(names)
+        while queue:
+            name = queue.pop(0)
+            if name in used or name not in self.converted:
+                continue
+            used.append(name)
+            queue.extend(self.files[self.classes[name]]['references'])
+
+        if not used:
+            return {'prompt': '', 'imports': {}, 'classes': [], 'base_test': False}
+
+        direct = [name for name in used if name in names]
+        imports = {name: self.import_line(name, importer) for name in direct}
+
+        lines = [
+            'Helper modules already converted to Playwright. Import them exactly as',
+            'shown and call their members; do not redefine or inline them.',
+        ]
+        for line in dict.fromkeys(imports.values()):
+            lines.append(line)
+        for name in used:
+            info = self.converted[name]
+            lines.append('')
+            if info['kind'] == 'base_test':
+                lines.append(f'// {name} (base test class): its module exports `test` and `expect`,')
+                lines.append('// which replace the ones from @playwright/test')
+            lines.extend(info['signatures'])
+
+        return {
+            'prompt': '\n'.join(lines),
+            'imports': imports,
+            'classes': used,
+            'base_test': any(self.converted[name]['kind'] == 'base_test' for name in direct),
+        }
+
+
+def index_source(java_source: str, file_path: str) -> Optional[Dict[str, Any]]:
+    """
+    Index entry of one Java file, or None if it does not parse.
+
+    Returns:
+        {'path', 'classes', 'identifiers', 'is_test', 'has_hooks', 'signatures'}
+    """
+    try:
+        metadata, _ = get_parse_cache().parse(java_source, file_path)
+    except ValueError:
+        return None
+
+    top_level = [c['name'] for c in metadata['classes'] if not c['outer']]
+    annotations = {name for method in metadata['methods'] for name in method['annotations']}
+    signatures = [f"class {metadata['class_name']} {{"] + [
+        f"  {method_signature(method['body'])}" for method in metadata['methods']
+        if method['class'] == metadata['class_name'] and method['body']
+    ] + ['}']
+
+    return {
+        'path': file_path,
+        'classes': top_level,
+        'identifiers': sorted(set(_IDENTIFIER.findall(java_source))),
+        'is_test': 'Test' in annotations,
+        'has_hooks': bool(annotations & HOOK_ANNOTATIONS),
+        'signatures': signatures,
+    }
+
+
+def _index_file(file_path: str, parse_store: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """Read and index a Java file (runs in a worker process)."""
+    get_parse_cache(parse_store)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return index_source(f.read(), file_path)
+
+
+def module_signatures(code: str) -> List[str]:
+    """
+    Compact outline of a converted Playwright module: exported classes,
+    functions and fixtures, with class fields and method signatures but no
+    bodies.
+    """
+    lines = []
+    in_class = False
+    depth = 0
+    for line in code.splitlines():
+        stripped = line.strip()
+        if depth == 0:
+            match = _EXPORT.match(stripped)
+            if match:
+                declaration = match.group(1).strip()
+                lines.append(declaration + (' {' if declaration.startswith(('class', 'abstract')) else ''))
+                in_class = declaration.startswith(('class', 'abstract'))
+        elif depth == 1 and in_class:
+            match = _MEMBER.match(line) or _FIELD.match(line)
+            if match:
+                lines.append('  ' + ' '.join(match.group(1).split()))
+
+        depth += line.count('{') - line.count('}')
+        if depth <= 0:
+            if in_class and lines and stripped.startswith('}'):
+                lines.append('}')
+            depth = max(depth, 0)
+            in_class = False
+    return lines
+
+
+def _kebab(name: str) -> str:
+    """CamelCase to kebab-case (same rule as the converter's output names)."""
+    return ''.join(f'-{char.lower()}' if char.isupper() and i > 0 else char.lower()
+                   for i, char in enumerate(name))
+
+
+if __name__ == '__main__':
+    import sys
+
+    paths = [str(path) for path in Path(sys.argv[1] if len(sys.argv) > 1 else '.').glob('**/*.java')]
+    project = ProjectIndex.build(paths)
+    for level, helpers in enumerate(project.helpers()):
+        for path in helpers:
+            print(f"level {level}: {path} ({project.helper_kind(path)})")
+    print(f"{len(project.files)} shared helpers, {len(project.classes)} helper classes indexed")
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Tool: Prompt Compactor
+Shrinks Java sources before they are put into a prompt: comments, the package
+declaration, irrelevant imports and redundant whitespace are removed.
+Layer 3: Deterministic Tool
+"""
+
+import re
+from typing import List, Set
+
+
+# Imports the model needs to recognize the framework (TestNG vs. JUnit, ...)
+FRAMEWORK_IMPORTS = ('org.openqa.selenium', 'org.testng', 'org.junit', 'io.appium')
+
+# JDK imports say nothing about the Playwright output
+JDK_IMPORTS = ('java.', 'javax.')
+
+_IMPORT = re.compile(r'^\s*import\s+(static\s+)?([\w.]+)(\.\*)?\s*;\s*$')
+_PACKAGE = re.compile(r'^\s*package\s+[\w.]+\s*;\s*$')
+_WORD = re.compile(r'\b[A-Za-z_$][\w$]*\b')
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of a prompt (about four characters per token for code).
+    Ollama reports the exact count after the fact (prompt_eval_count).
+    """
+    return (len(text) + 3) // 4
+
+
+class PromptCompactor:
+    """
+    Compacts Java code for prompts. The result is still valid Java with the
+    same tokens apart from comments, the package line and dropped imports.
+
+    Kept imports: framework imports (Selenium, TestNG, JUnit, Appium) and
+    project imports whose name the code uses, e.g. page objects. JDK imports
+    and unused imports are dropped.
+    """
+
+    # Part of conversion settings: bump when the compacted text changes
+    VERSION = 1
+
+    def compact(self, java_code: str) -> str:
+        """
+        Compact Java source for a prompt.
+
+        Args:
+            java_code: Java source, a whole file or single methods
+
+        Returns:
+            Compacted source
+        """
+        code = strip_comments(java_code)
+        lines = self._drop_imports(code.splitlines())
+        return normalize_whitespace(lines, reindent='"""' not in code)
+
+    def _drop_imports(self, lines: List[str]) -> List[str]:
+        """Remove the package declaration and imports the model does not need."""
+        body = '\n'.join(line for line in lines if not _IMPORT.match(line) and not _PACKAGE.match(line))
+        used = set(_WORD.findall(body))
+
+        kept = []
+        for line in lines:
+            if _PACKAGE.match(line):
+                continue
+            match = _IMPORT.match(line)
+            if match and not self._keep_import(match.group(2), bool(match.group(3)), used):
+                continue
+            kept.append(line)
+        return kept
+
+    @staticmethod
+    def _keep_import(path: str, wildcard: bool, used: Set[str]) -> bool:
+        if path.startswith(JDK_IMPORTS):
+            return False
+        if wildcard:
+            return path.startswith(FRAMEWORK_IMPORTS)
+        return path.rsplit('.', 1)[-1] in used
+
+
+def strip_comments(java_code: str) -> str:
+    """
+    Remove // and /* */ comments (including Javadoc and license headers),
+    leaving string, character and text block literals untouched. A block
+    comment between two tokens becomes a single space.
+    """
+    out = []
+    i = 0
+    length = len(java_code)
+    while i < length:
+        char = java_code[i]
+        if char == '/' and java_code.startswith('//', i):
+            end = java_code.find('\n', i)
+            i = length if end == -1 else end
+        elif char == '/' and java_code.startswith('/*', i):
+            end = java_code.find('*/', i + 2)
+            end = length if end == -1 else end + 2
+            # Keep the line structure, so line-based steps still see one statement per line
+            newlines = java_code.count('\n', i, end)
+            out.append('\n' * newlines if newlines else ' ')
+            i = end
+        elif java_code.startswith('"""', i):
+            end = java_code.find('"""', i + 3)
+            while end != -1 and _escaped(java_code, end):
+                end = java_code.find('"""', end + 1)
+            end = length if end == -1 else end + 3
+            out.append(java_code[i:end])
+            i = end
+        elif char in '"\'':
+            end = i + 1
+            while end < length and java_code[end] != char and java_code[end] != '\n':
+                end += 2 if java_code[end] == '\\' else 1
+            end = min(end + 1, length)
+            out.append(java_code[i:end])
+            i = end
+        else:
+            out.append(char)
+            i += 1
+    return ''.join(out)
+
+
+def _escaped(text: str, index: int) -> bool:
+    """Whether the character at index is preceded by an odd number of backslashes."""
+    count = 0
+    while index > count and text[index - count - 1] == '\\':
+        count += 1
+    return count % 2 == 1
+
+
+def normalize_whitespace(lines: List[str], reindent: bool = True) -> str:
+    """
+    Strip trailing whitespace, drop blank lines next to braces, collapse runs
+    of blank lines and (with reindent) halve indentation: 4 spaces or a tab
+    per level become 2 spaces.
+
+    Args:
+        lines: Source lines
+        reindent: Rewrite leading indentation (off for sources with text blocks)
+    """
+    kept: List[str] = []
+    for line in lines:
+        line = line.rstrip()
+        if not line:
+            if kept and kept[-1] and not kept[-1].endswith('{'):
+                kept.append('')
+            continue
+        if reindent:
+            stripped = line.lstrip()
+            indent = line[:len(line) - len(stripped)].expandtabs(4)
+            line = ' ' * (len(indent) // 2) + stripped
+        if kept and not kept[-1] and line.lstrip().startswith('}'):
+            kept.pop()
+        kept.append(line)
+
+    while kept and not kept[-1]:
+        kept.pop()
+    return '\n'.join(_dedent(kept))
+
+
+def _dedent(lines: List[str]) -> List[str]:
+    """Remove indentation common to all non-blank lines (e.g. of a lone method)."""
+    margins = [len(line) - len(line.lstrip()) for line in lines if line]
+    margin = min(margins) if margins else 0
+    return [line[margin:] for line in lines] if margin else lines
+
+
+if __name__ == '__main__':
+    import sys
+
+    path = sys.argv[1] if len(sys.argv) > 1 else None
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            source = f.read()
+    else:
+        source = '''/*
+ * Copyright (c) Example Corp. All rights reserved.
+ */
+package com.example.tests;
+
+import java.util.List;
+import java.time.Duration;
+import org.openqa.selenium.By;
+import org.openqa.selenium.WebDriver;
+import org.openqa.selenium.Keys;
+import org.testng.annotations.*;
+
+public class LoginTest {
+    private WebDriver driver; // set up in @BeforeMethod
+
+    /**
+     * Logs in with a valid user.
+     */
+    @Test
+    public void testLogin() {
+        driver.get("https://example.com/login"); // not a // comment: "http://..."
+
+        driver.findElement(By.id("username")).sendKeys("admin");
+    }
+}
+'''
+
+    compactor = PromptCompactor()
+    compacted = compactor.compact(source)
+    print(compacted)
+    print(f"\n~{estimate_tokens(source)} -> ~{estimate_tokens(compacted)} tokens")
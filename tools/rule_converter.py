@@ -0,0 +1,589 @@
+#!/usr/bin/env python3
+"""
+Tool: Rule Converter
+Deterministic Selenium -> Playwright code generation straight from the
+javalang tree, following architecture/02_selenium_to_playwright_mapping_sop.md.
+Layer 3: Deterministic Tool
+"""
+
+import javalang
+import textwrap
+from typing import Dict, Any, List, Optional, Tuple
+
+
+class UnmappedConstruct(Exception):
+    """Raised when a Java construct has no entry in the mapping table."""
+
+
+class RuleConverter:
+    """
+    Emit Playwright code for methods whose every construct is covered by the
+    mapping table. Methods that are not covered are left for the LLM.
+    """
+
+    # Bump when the generated code changes, so incremental runs regenerate
+    VERSION = 2
+
+    IMPORTS = {
+        'typescript': "import { test, expect } from '@playwright/test';",
+        'javascript': "const { test, expect } = require('@playwright/test');",
+    }
+
+    HOOKS = {
+        'Test': 'test',
+        'BeforeMethod': 'test.beforeEach',
+        'AfterMethod': 'test.afterEach',
+        'BeforeClass': 'test.beforeAll',
+        'AfterClass': 'test.afterAll',
+    }
+
+    # By.xxx("value") -> (Playwright method, selector prefix, selector suffix, extra args)
+    LOCATORS = {
+        'id': ('locator', '#', '', ''),
+        'name': ('locator', '[name="', '"]', ''),
+        'className': ('locator', '.', '', ''),
+        'cssSelector': ('locator', '', '', ''),
+        'xpath': ('locator', 'xpath=', '', ''),
+        'tagName': ('locator', '', '', ''),
+        'linkText': ('getByText', '', '', ''),
+        'partialLinkText': ('getByText', '', '', ', { exact: false }'),
+    }
+
+    # element.xxx(...) -> Playwright locator method (all return promises)
+    ELEMENT_ACTIONS = {
+        'sendKeys': 'fill',
+        'click': 'click',
+        'clear': 'clear',
+        'getText': 'textContent',
+        'getAttribute': 'getAttribute',
+        'isDisplayed': 'isVisible',
+        'isEnabled': 'isEnabled',
+        'isSelected': 'isChecked',
+    }
+
+    NAVIGATION = {
+        'to': 'goto',
+        'back': 'goBack',
+        'forward': 'goForward',
+        'refresh': 'reload',
+    }
+
+    # Assert.xxx(...) -> (matcher, number of compared arguments)
+    ASSERTIONS = {
+        'assertEquals': ('toBe', 2),
+        'assertTrue': ('toBeTruthy', 1),
+        'assertFalse': ('toBeFalsy', 1),
+        'assertNull': ('toBeNull', 1),
+        'assertNotNull': ('not.toBeNull', 1),
+    }
+
+    # Classes the assertions are called on (Assert.xxx, or statically imported)
+    ASSERTION_CLASSES = {'Assert', 'Assertions'}
+
+    # Package of the assertion class -> argument order, first match wins:
+    # 'actual': (actual, expected[, message]), TestNG
+    # 'expected': (expected, actual[, message]), JUnit 5
+    # 'message_first': ([message, ]expected, actual), JUnit 4 and 3
+    ASSERTION_ORDERS = (
+        ('org.testng.', 'actual'),
+        ('org.junit.jupiter.', 'expected'),
+        ('org.junit.', 'message_first'),
+        ('junit.framework.', 'message_first'),
+    )
+
+    DRIVER_TYPES = {'WebDriver', 'RemoteWebDriver', 'ChromeDriver', 'FirefoxDriver', 'EdgeDriver', 'SafariDriver'}
+
+    # Fields that Playwright fixtures make redundant
+    IGNORED_FIELD_TYPES = DRIVER_TYPES | {'WebDriverWait'}
+
+    TEST_ELEMENTS = {'description', 'priority', 'groups'}
+
+    # Every method name the mapping table knows how to convert
+    MAPPED_CALLS = (
+        set(LOCATORS) | set(ELEMENT_ACTIONS) | set(NAVIGATION) | set(ASSERTIONS)
+        | {'get', 'navigate', 'getCurrentUrl', 'getTitle', 'findElement', 'submit',
+           'quit', 'close', 'manage', 'sleep'}
+    )
+
+    def __init__(self, target_language: str = 'typescript'):
+        self.target_language = target_language
+
+    def plan(self, tree, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert every method the mapping table covers.
+
+        Args:
+            tree: javalang CompilationUnit
+            metadata: Parsed metadata from JavaParser for the same source
+
+        Returns:
+            Conversion plan: class name, whether the class structure can be
+            assembled from per-method blocks, and one block per method with
+            either generated code or the reason it needs the LLM
+        """
+        plan = {
+            'class_name': metadata.get('class_name') or 'ConvertedTest',
+            'mappable': False,
+            'reason': None,
+            'blocks': [],
+        }
+
+        try:
+            class_node, driver_names = self._check_class(tree)
+        except UnmappedConstruct as e:
+            plan['reason'] = str(e)
+            return plan
+
+        plan['mappable'] = True
+        orders = self._assertion_orders(tree)
+        parsed = [
+            method for method in metadata.get('methods', [])
+            if method.get('class', class_node.name) == class_node.name
+        ]
+
+        for index, method in enumerate(class_node.methods):
+            info = parsed[index] if index < len(parsed) else {}
+            block = {
+                'name': method.name,
+                'code': None,
+                'source': info.get('body', ''),
+                'locals': info.get('locals', []),
+                'reason': None,
+            }
+            try:
+                block['code'] = _MethodGenerator(self, driver_names, orders).generate(method)
+            except UnmappedConstruct as e:
+                block['reason'] = str(e)
+            plan['blocks'].append(block)
+
+        return plan
+
+    def render(self, plan: Dict[str, Any], fallback: Optional[Dict[int, str]] = None,
+               imports: Optional[List[str]] = None) -> str:
+        """
+        Assemble a plan into one Playwright test file.
+
+        Args:
+            plan: Result of plan()
+            fallback: Code for blocks the rules could not convert, by block index
+            imports: Extra import lines, e.g. for converted page objects
+
+        Returns:
+            Playwright test file content
+        """
+        fallback = fallback or {}
+        blocks = []
+        for index, block in enumerate(plan['blocks']):
+            code = block['code'] if block['code'] is not None else fallback.get(index, '')
+            if code:
+                blocks.append(textwrap.indent(textwrap.dedent(code).strip(), '  '))
+
+        header = '\n'.join([self.IMPORTS[self.target_language]] + (imports or []))
+        return (
+            f"{header}\n"
+            f"\n"
+            f"test.describe('{plan['class_name']}', () => {{\n"
+            + '\n\n'.join(blocks) +
+            f"\n}});"
+        )
+
+    def _assertion_orders(self, tree) -> Dict[str, Optional[str]]:
+        """
+        Argument order of each assertion name the file can call unqualified
+        ('assertEquals') or qualified ('Assert.assertEquals'), from its imports;
+        None where the imports are ambiguous or name an unknown framework.
+        """
+        orders: Dict[str, Optional[str]] = {}
+
+        def add(name: str, path: str):
+            order = next((order for prefix, order in self.ASSERTION_ORDERS if path.startswith(prefix)), None)
+            orders[name] = order if orders.get(name, order) == order else None
+
+        for node in tree.imports:
+            if node.static:
+                # import static org.testng.Assert.assertEquals; or import static org.testng.Assert.*;
+                owner, member = (node.path, None) if node.wildcard else node.path.rsplit('.', 1)
+                if owner.rsplit('.', 1)[-1] in self.ASSERTION_CLASSES:
+                    for name in ([member] if member else self.ASSERTIONS):
+                        if name in self.ASSERTIONS:
+                            add(name, node.path)
+            elif not node.wildcard:
+                class_name = node.path.rsplit('.', 1)[-1]
+                if class_name in self.ASSERTION_CLASSES:
+                    for member in self.ASSERTIONS:
+                        add(f'{class_name}.{member}', node.path)
+        return orders
+
+    def _check_class(self, tree) -> Tuple[Any, set]:
+        """Ensure the file is a single plain test class; return it and its driver field names."""
+        classes = [node for _, node in tree.filter(javalang.tree.ClassDeclaration)]
+        if len(tree.types) != 1 or len(classes) != 1:
+            raise UnmappedConstruct('file does not contain exactly one class')
+
+        class_node = classes[0]
+        if class_node.extends or class_node.implements:
+            raise UnmappedConstruct('class has a superclass or interfaces')
+        if class_node.constructors:
+            raise UnmappedConstruct('class has constructors')
+
+        driver_names = {'driver'}
+        for field in class_node.fields:
+            if field.type.name not in self.IGNORED_FIELD_TYPES:
+                raise UnmappedConstruct(f'field of type {field.type.name}')
+            if field.type.name in self.DRIVER_TYPES:
+                driver_names.update(declarator.name for declarator in field.declarators)
+
+        has_test = False
+        for method in class_node.methods:
+            hooks = [self.HOOKS[a.name] for a in method.annotations if a.name in self.HOOKS]
+            if len(hooks) != 1:
+                raise UnmappedConstruct(f'method {method.name} is not a single test or hook')
+            has_test = has_test or hooks[0] == 'test'
+
+        if not has_test:
+            raise UnmappedConstruct('class has no @Test methods')
+
+        return class_node, driver_names
+
+
+class _MethodGenerator:
+    """Convert a single method body; one instance per method."""
+
+    def __init__(self, rules: RuleConverter, driver_names: set, assertion_orders: Dict[str, Optional[str]]):
+        self.rules = rules
+        self.driver_names = driver_names
+        self.assertion_orders = assertion_orders
+        self.locators = set()
+        self.values = set()
+
+    def generate(self, method) -> str:
+        """Return the Playwright block for method, or '' for a hook that becomes a no-op."""
+        annotation = next(a for a in method.annotations if a.name in self.rules.HOOKS)
+        hook = self.rules.HOOKS[annotation.name]
+
+        if method.parameters:
+            raise UnmappedConstruct('method has parameters')
+
+        lines = []
+        for statement in method.body or []:
+            lines.extend(self._statement(statement))
+
+        body = ''.join(f'  {line}\n' for line in lines)
+
+        if hook == 'test':
+            title = self._test_title(annotation, method.name)
+            return f"test('{title}', async ({{ page }}) => {{\n{body}}});"
+
+        if not lines:
+            return ''
+        if hook in ('test.beforeAll', 'test.afterAll'):
+            raise UnmappedConstruct('page actions in a class-level hook')
+        return f"{hook}(async ({{ page }}) => {{\n{body}}});"
+
+    def _test_title(self, annotation, default: str) -> str:
+        """Use @Test(description = "...") as the title when present."""
+        element = annotation.element
+        if element is None:
+            return default
+        if not isinstance(element, list):
+            raise UnmappedConstruct('unsupported @Test value')
+
+        title = default
+        for pair in element:
+            if pair.name not in self.rules.TEST_ELEMENTS:
+                raise UnmappedConstruct(f'@Test({pair.name} = ...)')
+            if pair.name == 'description':
+                title = _string_content(pair.value)
+        return title
+
+    # Statements
+
+    def _statement(self, statement) -> List[str]:
+        """Convert one statement into zero or more lines of Playwright code."""
+        if isinstance(statement, javalang.tree.StatementExpression):
+            expression = statement.expression
+
+            if isinstance(expression, javalang.tree.Assignment):
+                if self._is_driver_creation(expression):
+                    return []
+                raise UnmappedConstruct('assignment')
+
+            if isinstance(expression, javalang.tree.MethodInvocation):
+                code, kind = self._invocation(expression)
+                return [] if kind == 'noop' else [f'{code};']
+
+        if isinstance(statement, javalang.tree.LocalVariableDeclaration):
+            if statement.type.name in self.rules.DRIVER_TYPES:
+                raise UnmappedConstruct('local WebDriver variable')
+
+            lines = []
+            for declarator in statement.declarators:
+                if declarator.initializer is None:
+                    raise UnmappedConstruct('uninitialized local variable')
+                code, kind = self._expression(declarator.initializer)
+                if kind == 'locator':
+                    self.locators.add(declarator.name)
+                elif kind == 'value':
+                    self.values.add(declarator.name)
+                else:
+                    raise UnmappedConstruct(f'local variable {declarator.name}')
+                lines.append(f'const {declarator.name} = {code};')
+            return lines
+
+        raise UnmappedConstruct(type(statement).__name__)
+
+    def _is_driver_creation(self, assignment) -> bool:
+        """driver = new ChromeDriver() is handled by Playwright's page fixture."""
+        target = assignment.expressionl
+        return (
+            assignment.type == '='
+            and isinstance(target, javalang.tree.MemberReference)
+            and target.member in self.driver_names
+            and isinstance(assignment.value, javalang.tree.ClassCreator)
+        )
+
+    # Expressions
+
+    def _expression(self, node) -> Tuple[str, str]:
+        """
+        Convert an expression.
+
+        Returns:
+            (code, kind) where kind is 'value', 'locator' or 'noop'
+        """
+        if isinstance(node, javalang.tree.BinaryOperation):
+            left, _ = self._expression(node.operandl)
+            right, _ = self._expression(node.operandr)
+            operator = {'==': '===', '!=': '!=='}.get(node.operator, node.operator)
+            return f'{_operand(left)} {operator} {_operand(right)}', 'value'
+
+        if isinstance(node, javalang.tree.Literal):
+            code, kind = _literal(node.value), 'value'
+        elif isinstance(node, javalang.tree.MemberReference):
+            code, kind = self._reference(node)
+        elif isinstance(node, javalang.tree.MethodInvocation):
+            code, kind = self._invocation(node)
+        else:
+            raise UnmappedConstruct(type(node).__name__)
+
+        if node.postfix_operators:
+            raise UnmappedConstruct('postfix operator')
+        if node.selectors and not isinstance(node, javalang.tree.MethodInvocation):
+            raise UnmappedConstruct('call on literal or field')
+        for operator in reversed(node.prefix_operators or []):
+            if operator not in ('!', '-'):
+                raise UnmappedConstruct(f'prefix operator {operator}')
+            code, kind = f'{operator}{_operand(code)}', 'value'
+
+        return code, kind
+
+    def _reference(self, node) -> Tuple[str, str]:
+        """Local variable reference."""
+        if node.qualifier:
+            raise UnmappedConstruct(f'reference {node.qualifier}.{node.member}')
+        if node.member in self.locators:
+            return node.member, 'locator'
+        if node.member in self.values:
+            return node.member, 'value'
+        raise UnmappedConstruct(f'reference to {node.member}')
+
+    def _invocation(self, node) -> Tuple[str, str]:
+        """Convert a (possibly chained) method invocation."""
+        steps = [node]
+        for selector in node.selectors or []:
+            if not isinstance(selector, javalang.tree.MethodInvocation):
+                raise UnmappedConstruct('field access in call chain')
+            steps.append(selector)
+
+        root = node.qualifier or ''
+
+        if (root in self.rules.ASSERTION_CLASSES or not root) and node.member in self.rules.ASSERTIONS:
+            if len(steps) > 1:
+                raise UnmappedConstruct('call chained on assertion')
+            return self._assertion(node), 'value'
+
+        if root == 'Thread' and node.member == 'sleep' and len(steps) == 1:
+            return f'await page.waitForTimeout({self._argument(node, 0)})', 'value'
+
+        if root in self.driver_names:
+            code, kind = 'page', 'driver'
+        elif root in self.locators:
+            code, kind = root, 'locator'
+        else:
+            raise UnmappedConstruct(f'call to {root + "." if root else ""}{node.member}()')
+
+        for step in steps:
+            code, kind = self._step(code, kind, step)
+
+        if kind in ('driver', 'navigate'):
+            raise UnmappedConstruct('bare WebDriver reference')
+        return code, 'value' if kind == 'awaited' else kind
+
+    def _step(self, code: str, kind: str, step) -> Tuple[str, str]:
+        """Apply one call of a chain to the expression built so far."""
+        member = step.member
+
+        if kind == 'noop':
+            return '', 'noop'
+
+        if kind == 'driver':
+            if member == 'get':
+                return f'await page.goto({self._argument(step, 0)})', 'awaited'
+            if member == 'navigate' and not step.arguments:
+                return code, 'navigate'
+            if member == 'getCurrentUrl' and not step.arguments:
+                return 'page.url()', 'value'
+            if member == 'getTitle' and not step.arguments:
+                return 'await page.title()', 'awaited'
+            if member == 'findElement':
+                return f'page.{self._by(step)}', 'locator'
+            if member in ('quit', 'close', 'manage'):
+                return '', 'noop'
+
+        elif kind == 'navigate':
+            if member in self.rules.NAVIGATION:
+                arguments = self._arguments(step, 1 if member == 'to' else 0)
+                return f'await page.{self.rules.NAVIGATION[member]}({arguments})', 'awaited'
+
+        elif kind == 'locator':
+            if member == 'findElement':
+                return f'{code}.{self._by(step)}', 'locator'
+            if member == 'submit' and not step.arguments:
+                return f"await {code}.press('Enter')", 'awaited'
+            if member in self.rules.ELEMENT_ACTIONS:
+                expected = 1 if member in ('sendKeys', 'getAttribute') else 0
+                arguments = self._arguments(step, expected)
+                return f'await {code}.{self.rules.ELEMENT_ACTIONS[member]}({arguments})', 'awaited'
+
+        raise UnmappedConstruct(f'{member}()')
+
+    def _by(self, step) -> str:
+        """Convert findElement(By.xxx("value")) into a Playwright locator call."""
+        if len(step.arguments or []) != 1:
+            raise UnmappedConstruct('findElement arguments')
+
+        by = step.arguments[0]
+        if (not isinstance(by, javalang.tree.MethodInvocation) or by.qualifier != 'By'
+                or by.selectors or by.member not in self.rules.LOCATORS
+                or len(by.arguments) != 1):
+            raise UnmappedConstruct('non-literal locator')
+
+        method, prefix, suffix, extra = self.rules.LOCATORS[by.member]
+        value = _string_content(by.arguments[0])
+        return f"{method}('{prefix}{value}{suffix}'{extra})"
+
+    def _assertion(self, node) -> str:
+        """Assert.xxx(...) -> expect(actual[, message]).matcher(expected), in the framework's argument order."""
+        name = f'{node.qualifier}.{node.member}' if node.qualifier else node.member
+        order = self.assertion_orders.get(name)
+        if order is None:
+            # Without a known framework, the expected and actual values cannot be told apart
+            raise UnmappedConstruct(f'{name} of an unknown assertion framework')
+
+        matcher, compared = self.rules.ASSERTIONS[node.member]
+        arguments = [self._expression(argument)[0] for argument in node.arguments or []]
+        if len(arguments) not in (compared, compared + 1):
+            raise UnmappedConstruct(f'{node.member} arguments')
+
+        message = None
+        if len(arguments) > compared:
+            message = arguments.pop(0) if order == 'message_first' else arguments.pop()
+        if compared == 2 and order != 'actual':
+            arguments.reverse()
+
+        subject = arguments[0] if message is None else f'{arguments[0]}, {message}'
+        expected = arguments[1] if compared == 2 else ''
+        return f'expect({subject}).{matcher}({expected})'
+
+    def _argument(self, step, index: int) -> str:
+        """Convert one argument of a call that takes exactly index + 1 arguments."""
+        if len(step.arguments or []) != index + 1:
+            raise UnmappedConstruct(f'{step.member}() arguments')
+        return self._expression(step.arguments[index])[0]
+
+    def _arguments(self, step, expected: int) -> str:
+        """Convert all arguments of a call that takes exactly `expected` arguments."""
+        if len(step.arguments or []) != expected:
+            raise UnmappedConstruct(f'{step.member}() arguments')
+        return ', '.join(self._expression(argument)[0] for argument in step.arguments)
+
+
+def _operand(code: str) -> str:
+    """Parenthesize awaited expressions used as operands."""
+    return f'({code})' if code.startswith('await ') else code
+
+
+def _literal(value: str) -> str:
+    """Convert a Java literal to its JS/TS equivalent."""
+    if value.startswith('"'):
+        return f"'{_escape(value[1:-1])}'"
+    if value.startswith("'"):
+        return f"'{_escape(value[1:-1])}'"
+    if value[:1].isdigit() and value[-1:] in ('L', 'l', 'F', 'f', 'D', 'd') and not value.lower().startswith('0x'):
+        return value[:-1]
+    return value
+
+
+def _string_content(node) -> str:
+    """Escaped content of a string literal, for embedding in a single-quoted JS string."""
+    if not isinstance(node, javalang.tree.Literal) or not node.value.startswith('"'):
+        raise UnmappedConstruct('non-literal string')
+    return _escape(node.value[1:-1])
+
+
+def _escape(java_content: str) -> str:
+    """Re-escape Java string content for a single-quoted JS string."""
+    result = []
+    i = 0
+    while i < len(java_content):
+        char = java_content[i]
+        if char == '\\' and i + 1 < len(java_content):
+            pair = java_content[i:i + 2]
+            result.append('"' if pair == '\\"' else pair)
+            i += 2
+            continue
+        result.append("\\'" if char == "'" else char)
+        i += 1
+    return ''.join(result)
+
+
+if __name__ == '__main__':
+    from tools.java_parser import JavaParser
+
+    sample = '''
+import org.openqa.selenium.By;
+import org.openqa.selenium.WebDriver;
+import org.openqa.selenium.chrome.ChromeDriver;
+import org.testng.Assert;
+import org.testng.annotations.*;
+
+public class LoginTest {
+    private WebDriver driver;
+
+    @BeforeMethod
+    public void setUp() {
+        driver = new ChromeDriver();
+        driver.get("https://example.com/login");
+    }
+
+    @Test
+    public void testLogin() {
+        driver.findElement(By.id("username")).sendKeys("admin");
+        driver.findElement(By.id("password")).sendKeys("secret");
+        driver.findElement(By.id("login")).click();
+        String welcome = driver.findElement(By.id("welcome")).getText();
+        Assert.assertEquals(welcome, "Welcome, admin!");
+    }
+
+    @AfterMethod
+    public void tearDown() {
+        driver.quit();
+    }
+}
+'''
+
+    parser = JavaParser(sample, 'LoginTest.java')
+    metadata = parser.parse()
+    rules = RuleConverter('typescript')
+    plan = rules.plan(parser.tree, metadata)
+    print(rules.render(plan))
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tool: Source Classifier
+Classifies Java files as Selenium tests, page objects, helpers or
+irrelevant from their imports and a few tokens, without parsing them.
+Layer 3: Deterministic Tool
+"""
+
+import re
+
+from tools.java_parser import JavaParser
+
+
+_IMPORT = re.compile(r'^\s*import\s+(?:static\s+)?([\w.]+(?:\.\*)?)\s*;', re.MULTILINE)
+_CLASS_NAME = re.compile(r'\b(?:class|interface|enum|record)\s+(\w+)')
+_TEST_ANNOTATION = re.compile(r'@(?:Test|ParameterizedTest|RepeatedTest)\b')
+_PAGE_TOKEN = re.compile(r'@FindBy\b|@FindBys\b|\bPageFactory\b')
+_PAGE_SUFFIXES = ('Page', 'Screen', 'Component', 'Section', 'Dialog', 'Modal')
+
+
+class SourceClassifier:
+    """
+    What a Java file is, decided from its imports and a handful of regexes
+    (microseconds per file, against milliseconds for a javalang parse):
+
+    - 'test': imports TestNG/JUnit and declares @Test methods
+    - 'page_object': imports Selenium/Appium and uses @FindBy/PageFactory
+      or is named like a page (LoginPage, CartScreen, ...)
+    - 'helper': any other file importing Selenium, Appium, TestNG or JUnit,
+      e.g. base tests, driver factories, wait utilities, listeners
+    - 'irrelevant': none of the above, e.g. DTOs, enums, plain utilities
+
+    Only the first three are worth parsing and converting.
+    """
+
+    TEST = 'test'
+    PAGE_OBJECT = 'page_object'
+    HELPER = 'helper'
+    IRRELEVANT = 'irrelevant'
+
+    CATEGORIES = (TEST, PAGE_OBJECT, HELPER, IRRELEVANT)
+
+    BROWSER_IMPORTS = tuple(JavaParser.SELENIUM_IMPORTS) + ('io.appium',)
+    FRAMEWORK_IMPORTS = ('org.testng', 'org.junit')
+
+    @classmethod
+    def classify(cls, java_source: str) -> str:
+        """
+        Category of a Java source.
+
+        Args:
+            java_source: Java source code
+
+        Returns:
+            One of CATEGORIES
+        """
+        imports = _IMPORT.findall(java_source)
+        browser = any(path.startswith(cls.BROWSER_IMPORTS) for path in imports)
+        framework = any(path.startswith(cls.FRAMEWORK_IMPORTS) for path in imports)
+
+        if framework and _TEST_ANNOTATION.search(java_source):
+            return cls.TEST
+        if browser:
+            name = _CLASS_NAME.search(java_source)
+            if _PAGE_TOKEN.search(java_source) or (name and name.group(1).endswith(_PAGE_SUFFIXES)):
+                return cls.PAGE_OBJECT
+        if browser or framework:
+            return cls.HELPER
+        return cls.IRRELEVANT
+
+    @classmethod
+    def classify_file(cls, file_path: str) -> str:
+        """Category of a Java file (see classify)."""
+        with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
+            return cls.classify(f.read())
+
+
+if __name__ == '__main__':
+    import sys
+
+    for path in sys.argv[1:]:
+        print(f"{SourceClassifier.classify_file(path):<12} {path}")
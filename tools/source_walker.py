@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tool: Source Walker
+Lazily walks a source tree for Java files, applying include/exclude globs
+and classifying each file (tools/source_classifier.py) before it reaches
+the parser, so that irrelevant files can be skipped.
+Layer 3: Deterministic Tool
+"""
+
+import fnmatch
+import os
+from typing import Callable, Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from tools.source_classifier import SourceClassifier
+
+
+# Build output, dependencies and VCS metadata never hold sources to convert
+DEFAULT_EXCLUDES = (
+    '**/.git/**', '**/.hg/**', '**/.svn/**', '**/.idea/**', '**/.gradle/**',
+    '**/node_modules/**', '**/target/**', '**/build/**',
+)
+
+
+class SourceWalker:
+    """
+    Iterable over the .java files under a root, in sorted order, one
+    directory at a time: memory stays flat however large the tree is.
+
+    Paths are matched relative to the root with '/' separators. A file is
+    yielded when it matches an include glob (all files without includes)
+    and no exclude glob; excluded directories are not descended into.
+    Each such file is classified and counted in stats; files of a category
+    in skip are passed to on_skip instead of being yielded.
+
+    Iterating again walks the tree again.
+    """
+
+    def __init__(self, root: str, include: Optional[Sequence[str]] = None,
+                 exclude: Optional[Sequence[str]] = None,
+                 skip: Collection[str] = (SourceClassifier.IRRELEVANT,),
+                 on_skip: Optional[Callable[[str, str], None]] = None):
+        """
+        Args:
+            root: Directory to walk
+            include: Globs a file must match one of, e.g. 'src/test/**'
+            exclude: Globs of files and directories to leave out, on top of DEFAULT_EXCLUDES
+            skip: SourceClassifier categories not to yield (empty: yield every file)
+            on_skip: Called with (path, category) for every skipped file
+        """
+        self.root = root
+        self.include = list(include or [])
+        self.exclude = list(DEFAULT_EXCLUDES) + list(exclude or [])
+        self.skip = set(skip)
+        self.on_skip = on_skip
+        self.stats = self._new_stats()
+
+    def __iter__(self) -> Iterator[str]:
+        for path, category in self.classified():
+            if category not in self.skip:
+                yield path
+            elif self.on_skip is not None:
+                self.on_skip(path, category)
+
+    def classified(self) -> Iterator[Tuple[str, str]]:
+        """(path, category) of every file that passes the globs, skipped or not."""
+        self.stats = self._new_stats()
+        yield from self._walk(self.root, '')
+
+    def _walk(self, directory: str, relative: str) -> Iterator[Tuple[str, str]]:
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda entry: entry.name)
+        except OSError:
+            return
+
+        for entry in entries:
+            path = relative + entry.name
+            if entry.is_dir(follow_symlinks=False):
+                if not _matches(path + '/', self.exclude):
+                    yield from self._walk(entry.path, path + '/')
+            elif entry.name.endswith('.java') and entry.is_file():
+                self.stats['found'] += 1
+                if (self.include and not _matches(path, self.include)) or _matches(path, self.exclude):
+                    self.stats['excluded'] += 1
+                    continue
+                category = SourceClassifier.classify_file(entry.path)
+                self.stats[category] += 1
+                yield entry.path, category
+
+    @staticmethod
+    def _new_stats() -> Dict[str, int]:
+        return dict({'found': 0, 'excluded': 0}, **{category: 0 for category in SourceClassifier.CATEGORIES})
+
+
+def _matches(path: str, patterns: List[str]) -> bool:
+    """fnmatch, where a leading '**/' also matches at the root."""
+    return any(
+        fnmatch.fnmatchcase(path, pattern)
+        or (pattern.startswith('**/') and fnmatch.fnmatchcase(path, pattern[3:]))
+        for pattern in patterns
+    )
+
+
+if __name__ == '__main__':
+    import sys
+
+    walker = SourceWalker(sys.argv[1] if len(sys.argv) > 1 else '.')
+    for path, category in walker.classified():
+        print(f"{category:<12} {path}")
+    print(', '.join(f"{count} {name}" for name, count in walker.stats.items()), file=sys.stderr)
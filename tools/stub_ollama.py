@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Tool: Stub Ollama Server
+Local stand-in for the Ollama HTTP API with configurable latency and token
+rate, so benchmarks measure the converter instead of the model.
+Layer 3: Deterministic Tool
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List
+
+
+class StubOllamaServer:
+    """
+    Serves /api/generate (streaming and not) and /api/tags.
+    Each generation waits `latency` seconds, then produces `tokens` tokens at
+    `tokens_per_second`. At most `parallel` generations run at once, like
+    OLLAMA_NUM_PARALLEL; the rest queue.
+    """
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, latency: float = 0.2,
+                 tokens_per_second: float = 200.0, tokens: int = 120, parallel: int = 4):
+        """
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            latency: Seconds before the first token (prompt evaluation)
+            tokens_per_second: Generation speed
+            tokens: Tokens per response
+            parallel: Generations served concurrently
+        """
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.tokens = tokens
+        self.requests = 0
+        self.busy_seconds = 0.0
+        self._slots = threading.Semaphore(parallel)
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self) -> 'StubOllamaServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Requests served and seconds spent generating (summed over requests)."""
+        with self._lock:
+            return {'requests': self.requests, 'busy_seconds': self.busy_seconds}
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.busy_seconds = 0.0
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def generate(self, request: Dict[str, Any]):
+        """Yield response pieces at the configured pace."""
+        with self._slots:
+            started = time.perf_counter()
+            time.sleep(self.latency)
+            pieces = response_pieces(request.get('prompt', ''), self.tokens)
+            interval = 1.0 / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+            for piece in pieces:
+                if interval:
+                    time.sleep(interval)
+                yield piece
+            with self._lock:
+                self.requests += 1
+                self.busy_seconds += time.perf_counter() - started
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path in ('/api/tags', '/api/tags/'):
+                    self._json({'models': [{'name': 'codellama:latest', 'model': 'codellama:latest'}]})
+                elif self.path == '/api/version':
+                    self._json({'version': 'stub'})
+                else:
+                    self._json({'error': 'not found'}, 404)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                if self.path != '/api/generate':
+                    self._json({'error': 'not found'}, 404)
+                    return
+
+                prompt_tokens = len(request.get('prompt', '')) // 4
+                model = request.get('model', 'codellama')
+                if request.get('stream', True):
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'application/x-ndjson')
+                    self.send_header('Transfer-Encoding', 'chunked')
+                    self.end_headers()
+                    count = 0
+                    for piece in stub.generate(request):
+                        count += 1
+                        self._chunk({'model': model, 'response': piece, 'done': False})
+                    self._chunk({'model': model, 'response': '', 'done': True,
+                                 'prompt_eval_count': prompt_tokens, 'eval_count': count})
+                    self.wfile.write(b'0\r\n\r\n')
+                else:
+                    pieces = list(stub.generate(request))
+                    self._json({'model': model, 'response': ''.join(pieces), 'done': True,
+                                'prompt_eval_count': prompt_tokens, 'eval_count': len(pieces)})
+
+            def _json(self, payload, status=200):
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _chunk(self, payload):
+                data = json.dumps(payload).encode('utf-8') + b'\n'
+                self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+                self.wfile.flush()
+
+        return Handler
+
+
+def response_pieces(prompt: str, tokens: int) -> List[str]:
+    """
+    A fenced, syntactically plausible Playwright response of about `tokens`
+    tokens. Method prompts get bare test blocks; file prompts a whole file.
+    """
+    names = re.findall(r'public\s+void\s+(\w+)\s*\(', prompt) or ['converted']
+    steps = max(1, tokens // (len(names) * 8))
+    # Carry the string literals of the Java code through, as a model would
+    java = re.search(r'```java\n(.*?)\n```', prompt, re.DOTALL)
+    literals = list(dict.fromkeys(re.findall(r'"([^"\\\n]*)"', java.group(1) if java else '')))
+    blocks = []
+    for name in names:
+        body = ''.join(f"  await page.locator('#{name}-{step}').click();\n" for step in range(steps))
+        body += ''.join(f"  await page.fill('#{name}', {_js_string(literal)});\n" for literal in literals)
+        literals = []
+        blocks.append(f"test('{name}', async ({{ page }}) => {{\n{body}}});")
+
+    if 'Original Java methods' in prompt:
+        code = '\n\n'.join(blocks)
+    else:
+        indented = '\n\n'.join('  ' + block.replace('\n', '\n  ') for block in blocks)
+        code = (
+            "import { test, expect } from '@playwright/test';\n\n"
+            "test.describe('Converted', () => {\n" + indented + "\n});"
+        )
+
+    # Split on whitespace boundaries, keeping the whitespace, as a tokenizer would
+    return re.findall(r'\s*\S+', f'```typescript\n{code}\n```')
+
+
+def _js_string(text: str) -> str:
+    """Single-quoted JS string literal of text."""
+    return "'" + text.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def main():
+    """CLI entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run a stub Ollama server')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=11435, help='Port (default: 11435)')
+    parser.add_argument('--latency', type=float, default=0.2, help='Seconds to first token (default: 0.2)')
+    parser.add_argument('--tokens-per-second', type=float, default=200.0, help='Generation speed (default: 200)')
+    parser.add_argument('--tokens', type=int, default=120, help='Tokens per response (default: 120)')
+    parser.add_argument('--parallel', type=int, default=4, help='Concurrent generations (default: 4)')
+    args = parser.parse_args()
+
+    server = StubOllamaServer(args.host, args.port, args.latency, args.tokens_per_second,
+                              args.tokens, args.parallel)
+    print(f"Stub Ollama listening on {server.url} (set OLLAMA_HOST={server.url})")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Tool: Web Server
+Production serving for the web UI (app.py): a multi-threaded WSGI server
+(waitress), or several gunicorn worker processes, with graceful shutdown
+that lets in-flight conversions finish.
+Layer 3: Deterministic Tool
+"""
+
+import _thread
+import json
+import signal
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+class DrainingMiddleware:
+    """
+    WSGI middleware counting requests in flight, until their response body
+    (e.g. a conversion streamed as Server-Sent Events) has been sent.
+
+    Once drain() is called, new requests are answered with 503, except the
+    paths in `exempt` (health checks and metrics keep working while the
+    server drains).
+    """
+
+    def __init__(self, app: Callable, exempt: Iterable[str] = ('/api/health', '/metrics')):
+        """
+        Args:
+            app: WSGI application
+            exempt: Paths still served while draining
+        """
+        self.app = app
+        self.exempt = set(exempt)
+        self.draining = False
+        self._in_flight = 0
+        self._idle = threading.Condition()
+
+    def __call__(self, environ: Dict[str, Any], start_response: Callable):
+        if self.draining and environ.get('PATH_INFO') not in self.exempt:
+            body = json.dumps({'success': False, 'error': 'Server is shutting down'}).encode('utf-8')
+            start_response('503 Service Unavailable', [
+                ('Content-Type', 'application/json'),
+                ('Content-Length', str(len(body))),
+                ('Retry-After', '5'),
+            ])
+            return [body]
+
+        with self._idle:
+            self._in_flight += 1
+        try:
+            return _Tracked(self.app(environ, start_response), self._finished)
+        except BaseException:
+            self._finished()
+            raise
+
+    @property
+    def in_flight(self) -> int:
+        with self._idle:
+            return self._in_flight
+
+    def drain(self, timeout: float) -> bool:
+        """
+        Refuse new requests and wait for the ones in flight.
+
+        Returns:
+            False if requests were still running after timeout seconds
+        """
+        self.draining = True
+        with self._idle:
+            return self._idle.wait_for(lambda: self._in_flight == 0, timeout)
+
+    def _finished(self):
+        with self._idle:
+            self._in_flight -= 1
+            if self._in_flight == 0:
+                self._idle.notify_all()
+
+
+class _Tracked:
+    """Response body that reports once when the server closes it."""
+
+    def __init__(self, body: Iterable[bytes], on_close: Callable[[], None]):
+        self.body = body
+        self.on_close = on_close
+        self.closed = False
+
+    def __iter__(self):
+        return iter(self.body)
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            if hasattr(self.body, 'close'):
+                self.body.close()
+        finally:
+            self.on_close()
+
+
+def serve(app: Callable, host: str = '0.0.0.0', port: int = 5000, threads: int = 32,
+          workers: int = 1, worker_class: str = 'gthread', drain_timeout: float = 120.0,
+          on_drained: Optional[Callable[[float], None]] = None,
+          on_started: Optional[Callable[[], None]] = None):
+    """
+    Serve a WSGI app until SIGTERM or SIGINT, then drain and return.
+
+    One worker runs waitress in this process: `threads` requests are served
+    concurrently, and a conversion waiting for the LLM only holds its thread
+    (the backends bound what actually reaches the model). More workers run
+    gunicorn with that many processes of `threads` threads each; worker_class
+    'gevent' serves requests on greenlets instead (requires gevent).
+
+    On shutdown, new requests get 503 while running ones get up to
+    drain_timeout seconds to finish; on_drained is then called with the
+    seconds left, e.g. to let background jobs finish. A second signal stops
+    at once.
+
+    Args:
+        app: WSGI application
+        host: Interface to bind
+        port: Port to bind
+        threads: Concurrent requests per worker
+        workers: Worker processes (more than one requires gunicorn)
+        worker_class: gunicorn worker class ('gthread', 'gevent', ...)
+        drain_timeout: Seconds in-flight requests get to finish on shutdown
+        on_drained: Called (in each worker) with the remaining drain seconds
+        on_started: Called (in each worker) before it serves, e.g. to start
+            background threads, which do not survive gunicorn's fork
+    """
+    if workers > 1:
+        _serve_gunicorn(app, host, port, threads, workers, worker_class, drain_timeout, on_drained, on_started)
+    else:
+        _serve_waitress(app, host, port, threads, drain_timeout, on_drained, on_started)
+
+
+def _serve_waitress(app, host, port, threads, drain_timeout, on_drained, on_started):
+    try:
+        from waitress import create_server
+    except ImportError:
+        raise RuntimeError('Serving requires waitress: pip install waitress') from None
+
+    middleware = DrainingMiddleware(app)
+    server = create_server(middleware, host=host, port=port, threads=threads,
+                           connection_limit=max(100, threads * 4), ident='converter')
+
+    def drain():
+        deadline = time.monotonic() + drain_timeout
+        if not middleware.drain(drain_timeout):
+            print(f"{middleware.in_flight} requests still running after {drain_timeout:.0f}s")
+        if on_drained is not None:
+            on_drained(max(0.0, deadline - time.monotonic()))
+        # Lands in stop() below, which now ends the server loop
+        _thread.interrupt_main()
+
+    def stop(signum, frame):
+        if middleware.draining:
+            raise KeyboardInterrupt
+        print(f"Shutting down: waiting up to {drain_timeout:.0f}s for "
+              f"{middleware.in_flight} requests in flight")
+        # The server loop keeps running meanwhile: streamed responses still need it
+        threading.Thread(target=drain, name='drain', daemon=True).start()
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"Serving on http://{host}:{port} (waitress, {threads} threads)")
+    if on_started is not None:
+        on_started()
+    try:
+        server.run()
+    finally:
+        server.close()
+
+
+def _serve_gunicorn(app, host, port, threads, workers, worker_class, drain_timeout, on_drained, on_started):
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        raise RuntimeError('More than one worker requires gunicorn: pip install gunicorn') from None
+
+    def post_worker_init(worker):
+        if on_started is not None:
+            on_started()
+
+    def worker_exit(server, worker):
+        # gunicorn has already waited up to graceful_timeout for requests
+        if on_drained is not None:
+            on_drained(drain_timeout)
+
+    options = {
+        'bind': f'{host}:{port}',
+        'workers': workers,
+        'threads': threads,
+        'worker_class': worker_class,
+        'graceful_timeout': int(drain_timeout),
+        # Conversions outlive the default 30s; the backends enforce their own timeouts
+        'timeout': max(120, int(drain_timeout)),
+        'post_worker_init': post_worker_init,
+        'worker_exit': worker_exit,
+    }
+
+    class Application(BaseApplication):
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    Application().run()